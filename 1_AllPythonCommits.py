@@ -1,11 +1,53 @@
-from pydriller import Repository
+from RepoMirrorCache import repository_name, use_mirror
+from ExtractionProfiles import COMMIT_ATTRIBUTES, FILE_ATTRIBUTES, profile_attributes
+from PathFilter import PYTHON_FILES, PathFilter, traverse_matching_commits
+from RunProfiler import configure_logging
 import csv
+import logging
 import os
 
 # Replace the URL with the actual GitHub repository URL
 repo_url = 'https://github.com/apache/airflow.git'
 output_folder = 'path/to/output_folder'
 
+# Fields of the exported rows, in column order
+FIELDNAMES = [
+    'hash', 'author_name', 'author_email', 'committer_name', 'committer_email',
+    'author_date', 'author_timezone', 'committer_date', 'committer_timezone',
+    'branches', 'in_main_branch', 'merge', 'modified_files',
+    'project_name', 'project_path', 'old_path', 'new_path', 'filename', 'diff', 'diff_parsed',
+    'added_lines', 'deleted_lines', 'source_code', 'source_code_before',
+    'methods', 'methods_before', 'changed_methods'
+]
+
+# Columns the bulk export leaves out by default: the lizard method analysis of both file
+# versions and the parsed diff are by far the most expensive to compute
+EXPENSIVE_FIELDS = ['diff_parsed', 'methods', 'methods_before', 'changed_methods']
+DEFAULT_EXPORT_FIELDS = [field for field in FIELDNAMES if field not in EXPENSIVE_FIELDS]
+
+# Which fields the bulk export computes: None keeps DEFAULT_EXPORT_FIELDS; 'metadata-only',
+# 'sources' or 'full' (see ExtractionProfiles.py) pick a profile, 'full' being every column
+# like the per-row export, and export_fields picks individual columns instead
+extraction_profile = None
+export_fields = None
+
+# Exported paths (git pathspec rules, see PathFilter.py), e.g. exclude_globs = ['tests/', '*/migrations/*']
+include_globs = ['*.py']
+exclude_globs = []
+
+# Write everything through one buffered writer instead of reopening the CSV per row
+bulk_export = False
+
+# Bulk export settings: rows per write and commits between progress lines
+batch_size = 1000
+progress_interval = 500
+write_buffer_size = 1024 * 1024
+
+# Logging level of the run (see RunProfiler.py)
+log_level = 'INFO'
+
+logger = logging.getLogger('AllPythonCommits')
+
 def replace_none_values(data):
     # Replace None values in data dictionary with N/A (NULL Value)
     for key, value in data.items():
@@ -20,15 +62,7 @@ def save_commit_data_to_csv(commit_data):
         # If the file doesn't exist, create and write the header
         mode = 'w'
     with open(output_filename, mode, newline='', encoding='utf-8') as csvfile:
-        fieldnames = [
-            'hash', 'author_name', 'author_email', 'committer_name', 'committer_email',
-            'author_date', 'author_timezone', 'committer_date', 'committer_timezone',
-            'branches', 'in_main_branch', 'merge', 'modified_files',
-            'project_name', 'project_path', 'old_path', 'new_path', 'filename', 'diff', 'diff_parsed',
-            'added_lines', 'deleted_lines', 'source_code', 'source_code_before',
-            'methods', 'methods_before', 'changed_methods'
-        ]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
         if mode == 'w':
             writer.writeheader()
 
@@ -36,60 +70,116 @@ def save_commit_data_to_csv(commit_data):
             data = replace_none_values(data)
             writer.writerow(data)
 
-def extract_commit_data(commit):
-    commit_data = []
-    if commit.modified_files:
-        for modification in commit.modified_files:
-            try:
-                if modification.filename.endswith('.py'):
-                    print(f"==> Extract commit data in file path: '{modification.filename}' with Commit SHA: '{commit.hash}'")
-                    data = {
-                        'hash': commit.hash,
-                        'author_name': commit.author.name,
-                        'author_email': commit.author.email,
-                        'committer_name': commit.committer.name,
-                        'committer_email': commit.committer.email,
-                        'author_date': commit.author_date,
-                        'author_timezone': commit.author_timezone,
-                        'committer_date': commit.committer_date,
-                        'committer_timezone': commit.committer_timezone,
-                        'branches': ", ".join(commit.branches),
-                        'in_main_branch': commit.in_main_branch,
-                        'merge': commit.merge,
-                        'modified_files': modification.new_path,
-                        'project_name': commit.project_name,
-                        'project_path': commit.project_path,
-                        'old_path': modification.old_path,
-                        'new_path': modification.new_path,
-                        'filename': modification.filename,
-                        'diff': modification.diff,
-                        'diff_parsed': modification.diff_parsed,
-                        'added_lines': modification.added_lines,
-                        'deleted_lines': modification.deleted_lines,
-                        'source_code': modification.source_code,
-                        'source_code_before': modification.source_code_before,
-                        'methods': modification.methods,
-                        'methods_before': modification.methods_before,
-                        'changed_methods': modification.changed_methods,
-                    }
-                    commit_data.append(data)
-                    print(f"data: '{data}'")
-                    save_commit_data_to_csv([data])  # Save the commit data immediately after extraction
-            except Exception as e:
-                print(f"Error processing commit '{commit.hash}': {str(e)}")
-                continue
+def profile_fields(profile):
+    """Columns of FIELDNAMES computed by an extraction profile, in column order."""
+    attributes = profile_attributes(profile)
+    return [field for field in FIELDNAMES if field in attributes]
+
+def project_fields(repo_url):
+    """
+    Project columns of the rows mined from `repo_url`. PyDriller takes them from
+    the directory it mines, which is the mirror rather than the repository.
+    """
+    return {
+        'project_name': repository_name(repo_url),
+        'project_path': os.path.abspath(repo_url) if os.path.isdir(repo_url) else repo_url,
+    }
+
+def extract_rows(commit, fields=FIELDNAMES, path_filter=PYTHON_FILES, project=None):
+    """
+    Builds one row per modified file passing `path_filter` (by default the .py
+    files) with only the given fields. Commit-level fields are computed once per
+    commit; those in `project` (see `project_fields`) are taken from it instead.
+    """
+    project = project or {}
+    rows = []
+    if not commit.modified_files:
+        return rows
+
+    commit_values = None
+    for modification in commit.modified_files:
+        try:
+            if path_filter.matches_file(modification):
+                if commit_values is None:
+                    commit_values = {field: project[field] if field in project else COMMIT_ATTRIBUTES[field](commit)
+                                     for field in fields if field in COMMIT_ATTRIBUTES}
+                data = dict(commit_values)
+                for field in fields:
+                    if field in FILE_ATTRIBUTES:
+                        data[field] = FILE_ATTRIBUTES[field](modification)
+                rows.append(replace_none_values(data))
+        except Exception as e:
+            logger.error(f"Error processing commit '{commit.hash}': {e}")
+            continue
+    return rows
+
+def extract_commit_data(commit, project=None):
+    commit_data = extract_rows(commit, project=project)
+    for data in commit_data:
+        print(f"==> Extract commit data in file path: '{data['filename']}' with Commit SHA: '{commit.hash}'")
+    if commit_data:
+        save_commit_data_to_csv(commit_data)  # Save the commit data immediately after extraction
     return commit_data
 
+def export_commits(commits, output_filename, fields=None, batch_size=batch_size, progress_interval=progress_interval,
+                   path_filter=PYTHON_FILES, project=None):
+    """
+    Bulk export: writes the rows of all commits through one open, buffered
+    DictWriter, in batches of `batch_size` rows, and logs progress counts
+    every `progress_interval` commits. Only the columns in `fields` are
+    computed; by default those of `export_fields` or of `extraction_profile`,
+    or DEFAULT_EXPORT_FIELDS when neither is set.
+    Returns the number of rows written.
+    """
+    if fields is None:
+        fields = export_fields or (profile_fields(extraction_profile) if extraction_profile else DEFAULT_EXPORT_FIELDS)
+    fields = list(fields)
+    unknown = [field for field in fields if field not in FIELDNAMES]
+    if unknown:
+        raise ValueError(f"Unknown export fields: {', '.join(unknown)}")
+
+    commit_count = row_count = 0
+    batch = []
+    with open(output_filename, 'w', newline='', encoding='utf-8', buffering=write_buffer_size) as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fields)
+        writer.writeheader()
+
+        for commit in commits:
+            batch.extend(extract_rows(commit, fields, path_filter, project))
+            commit_count += 1
+            if len(batch) >= batch_size:
+                writer.writerows(batch)
+                row_count += len(batch)
+                batch = []
+            if commit_count % progress_interval == 0:
+                logger.info(f"Exported {row_count + len(batch)} rows from {commit_count} commits")
+
+        writer.writerows(batch)
+        row_count += len(batch)
+
+    logger.info(f"Exported {row_count} rows from {commit_count} commits to {output_filename}")
+    return row_count
+
 def main():
     # Create the output folder if it doesn't exist
     os.makedirs(output_folder, exist_ok=True)
 
-    for commit in Repository(repo_url).traverse_commits():
-        extract_commit_data(commit)
+    # Mine from the local mirror, fetched instead of re-cloned on every run
+    # Commits touching no exported path are skipped by git before any diff is loaded
+    path_filter = PathFilter(include_globs, exclude_globs)
+    project = project_fields(repo_url)
+    with use_mirror(repo_url) as source:
+        commits = traverse_matching_commits(source, path_filter)
+        if bulk_export:
+            export_commits(commits, os.path.join(output_folder, 'all_python_commits.csv'), path_filter=path_filter, project=project)
+        else:
+            for commit in commits:
+                extract_commit_data(commit, project)
 
     print(f"All Python commits in Apache Airflow are recorded in 'all_python_commits.csv'")
 
 if __name__ == '__main__':
+    configure_logging(log_level)
     try:
         main()
     except Exception as e:
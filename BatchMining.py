@@ -0,0 +1,212 @@
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from RepoMirrorCache import cached_mirror, use_mirror
+from RunProfiler import configure_logging
+from TrialPyDriller import extract_data, repository_key, safe_delete_directory, use_mirror_cache
+
+# Repository manifest (xlsx or csv with a URL column) and batch settings
+manifest_path = 'DataPyPI.xlsx'
+status_file_path = 'PythonCommits_data/batch_status.json'
+max_concurrent_jobs = 4  # Global cap on repositories mined at the same time
+workers_per_repo = 1  # Worker processes inside each job (see extract_data)
+job_timeout = 6 * 60 * 60  # Seconds before a job is terminated
+kill_grace_period = 10  # Seconds a terminated job gets to exit before it is killed
+max_retries = 2
+poll_interval = 1.0
+
+# Logging level of the batch run (see RunProfiler.py)
+log_level = 'INFO'
+
+logger = logging.getLogger('BatchMining')
+
+def read_manifest(path):
+    """
+    Reads repository URLs from an xlsx or csv manifest.
+    Returns a list of (url, commit count or None), the count coming from an
+    optional `Commits` column.
+    """
+    if path.endswith(('.xlsx', '.xls')):
+        manifest = pd.read_excel(path)
+    else:
+        manifest = pd.read_csv(path)
+
+    columns = {column.strip().lower(): column for column in manifest.columns if isinstance(column, str)}
+    if 'url' not in columns:
+        raise ValueError(f"Manifest {path} has no URL column")
+    urls = manifest[columns['url']]
+    counts = manifest[columns['commits']] if 'commits' in columns else [None] * len(manifest)
+
+    repos = {}
+    for url, count in zip(urls, counts):
+        if isinstance(url, str) and url.strip():
+            repos.setdefault(url.strip(), None if pd.isna(count) else int(count))
+    return list(repos.items())
+
+def count_commits(repo_url):
+    """
+    Counts the commits of a repository, or returns None on failure.
+    An existing mirror is counted as it is (without fetching), otherwise a
+    temporary treeless bare clone is made: mirroring every repository of the
+    manifest just to count it would churn the mirror cache before mining starts.
+    """
+    if use_mirror_cache and cached_mirror(repo_url) is not None:
+        try:
+            with use_mirror(repo_url, offline=True) as mirror_path:
+                result = subprocess.run(['git', '-C', mirror_path, 'rev-list', '--count', 'HEAD'],
+                                        check=True, capture_output=True, text=True)
+            return int(result.stdout.strip())
+        except (subprocess.SubprocessError, OSError, RuntimeError, ValueError):
+            pass  # Evicted in the meantime, count from a temporary clone
+
+    directory = tempfile.mkdtemp(prefix='count_')
+    try:
+        subprocess.run(['git', 'clone', '--quiet', '--bare', '--filter=tree:0', repo_url, directory],
+                       check=True, capture_output=True, timeout=600)
+        result = subprocess.run(['git', '-C', directory, 'rev-list', '--count', 'HEAD'],
+                                check=True, capture_output=True, text=True)
+        return int(result.stdout.strip())
+    except (subprocess.SubprocessError, OSError, ValueError):
+        return None
+    finally:
+        safe_delete_directory(directory)
+
+def load_status(path):
+    """Loads the status of a previous batch run, if any."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as status_file:
+        return json.load(status_file)
+
+def save_status(path, status):
+    """Writes the batch status atomically."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as status_file:
+        json.dump(status, status_file, indent=4)
+    os.replace(f"{path}.tmp", path)
+
+def run_job(repo_url, workers):
+    """
+    Process entry point of a single mining job. The job leads its own process
+    group, so its worker and git processes can be stopped with it.
+    """
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    extract_data(repo_url, workers=workers, incremental=True)
+
+def stop_job(process):
+    """Terminates a job together with the processes it started."""
+    if not hasattr(os, 'killpg'):
+        # Windows has no process groups to signal, taskkill walks the process tree
+        subprocess.run(['taskkill', '/T', '/F', '/PID', str(process.pid)], capture_output=True)
+        process.join()
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        process.terminate()  # Stopped before it became a group leader
+    process.join(kill_grace_period)
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    process.join()
+
+def run_batch(manifest=manifest_path, status_path=status_file_path, max_jobs=max_concurrent_jobs,
+              workers=workers_per_repo, timeout=job_timeout, retries=max_retries, count_missing=True):
+    """
+    Mines every repository of the manifest with at most `max_jobs` jobs at once.
+    Jobs are ordered by commit count, largest first, so the longest jobs do
+    not end up running alone at the end. A job that fails or exceeds `timeout`
+    seconds is retried up to `retries` times. Progress is kept in a status
+    file keyed by owner and name (see TrialPyDriller.repository_key), like
+    the outputs of the jobs; repositories already done in a previous run are
+    skipped. URLs naming the same repository are mined once.
+    """
+    status = load_status(status_path)
+    repos = {}
+    for url, count in read_manifest(manifest):
+        repos.setdefault(repository_key(url), (url, count))
+    for key, (url, _) in repos.items():
+        if key not in status and url in status:
+            status[key] = status.pop(url)  # Status files of earlier runs were keyed by URL
+
+    unknown = [url for key, (url, count) in repos.items() if count is None and status.get(key, {}).get('commits') is None]
+    counted = {}
+    if count_missing and unknown:
+        logger.info(f"Counting commits of {len(unknown)} repositories...")
+        with ThreadPoolExecutor(max_workers=max_jobs * 4) as executor:
+            counted = dict(zip(unknown, executor.map(count_commits, unknown)))
+
+    for key, (url, count) in repos.items():
+        entry = status.setdefault(key, {'status': 'pending', 'attempts': 0})
+        entry['url'] = url
+        entry['commits'] = count if count is not None else counted.get(url, entry.get('commits'))
+        if entry['status'] != 'done':
+            entry['status'] = 'pending'
+            entry['attempts'] = 0
+    save_status(status_path, status)
+
+    queue = sorted((key for key in repos if status[key]['status'] == 'pending'),
+                   key=lambda key: status[key]['commits'] or 0, reverse=True)
+    running = {}  # key -> (process, started)
+
+    while queue or running:
+        while queue and len(running) < max_jobs:
+            key = queue.pop(0)
+            url = status[key]['url']
+            process = multiprocessing.Process(target=run_job, args=(url, workers), daemon=False)
+            process.start()
+            running[key] = (process, time.monotonic())
+            status[key].update(status='running', attempts=status[key]['attempts'] + 1,
+                               started_at=datetime.now().isoformat())
+            logger.info(f"Started {url} (attempt {status[key]['attempts']})")
+            save_status(status_path, status)
+
+        time.sleep(poll_interval)
+
+        for key, (process, started) in list(running.items()):
+            elapsed = time.monotonic() - started
+            if process.is_alive() and elapsed <= timeout:
+                continue
+
+            if process.is_alive():
+                stop_job(process)
+                error = f"timed out after {timeout}s"
+            else:
+                process.join()
+                error = None if process.exitcode == 0 else f"exit code {process.exitcode}"
+
+            del running[key]
+            entry = status[key]
+            url = entry['url']
+            entry.update(finished_at=datetime.now().isoformat(), elapsed=round(elapsed, 1))
+            if error is None:
+                entry.update(status='done', error=None)
+                logger.info(f"Done {url} in {elapsed:.0f}s")
+            elif entry['attempts'] <= retries:
+                entry.update(status='pending', error=error)
+                queue.append(key)
+                logger.warning(f"Retrying {url}: {error}")
+            else:
+                entry.update(status='failed', error=error)
+                logger.warning(f"Failed {url}: {error}")
+            save_status(status_path, status)
+
+    states = [entry['status'] for entry in status.values()]
+    logger.info(f"Batch finished: {states.count('done')} done, {states.count('failed')} failed, "
+                f"{states.count('pending')} pending")
+
+if __name__ == "__main__":
+    configure_logging(log_level)
+    run_batch()
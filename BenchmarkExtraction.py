@@ -0,0 +1,137 @@
+import json
+import os
+import random
+import subprocess
+import time
+
+from pydriller import Repository
+
+from ExtractionProfiles import COMMIT_ATTRIBUTES, FILE_ATTRIBUTES, PROFILES
+
+# Local fixture repository, created on the first run
+fixture_path = 'BenchmarkFixture'
+fixture_commits = 200
+fixture_files = 10
+fixture_seed = 42
+
+# Where the timings are written
+report_path = 'extraction_benchmark.json'
+
+FIXTURE_ENV = {
+    'GIT_AUTHOR_NAME': 'Fixture Author', 'GIT_AUTHOR_EMAIL': 'author@example.com',
+    'GIT_COMMITTER_NAME': 'Fixture Committer', 'GIT_COMMITTER_EMAIL': 'committer@example.com',
+}
+
+def generate_module(rng, functions):
+    """Source of a small Python module with `functions` functions, so lizard has methods to find."""
+    lines = []
+    for number in range(functions):
+        lines.append(f"def function_{number}(values):")
+        lines.append(f"    total = {rng.randint(0, 100)}")
+        lines.append("    for value in values:")
+        lines.append(f"        if value > {rng.randint(0, 50)}:")
+        lines.append("            total += value")
+        lines.append("    return total")
+        lines.append("")
+    return "\n".join(lines)
+
+def create_fixture_repo(path=fixture_path, commits=fixture_commits, files=fixture_files, seed=fixture_seed):
+    """
+    Creates a deterministic repository of `commits` commits, each rewriting
+    a few of `files` Python modules and sometimes a non-Python file, on two branches.
+    """
+    if os.path.isdir(os.path.join(path, '.git')):
+        return path
+
+    rng = random.Random(seed)
+    env = {**os.environ, **FIXTURE_ENV}
+    os.makedirs(path, exist_ok=True)
+
+    def git(*args):
+        subprocess.run(['git', '-C', path, *args], check=True, capture_output=True, env=env)
+
+    git('init', '--quiet', '--initial-branch=main')
+    for number in range(commits):
+        for file_number in rng.sample(range(files), k=min(files, rng.randint(1, 3))):
+            with open(os.path.join(path, f"module_{file_number}.py"), 'w', encoding='utf-8') as module:
+                module.write(generate_module(rng, rng.randint(2, 8)))
+        if rng.random() < 0.2:
+            with open(os.path.join(path, 'NOTES.txt'), 'a', encoding='utf-8') as notes:
+                notes.write(f"Commit {number}\n")
+        git('add', '-A')
+        git('commit', '--quiet', '-m', f"Commit {number}")
+        if number == commits // 2:
+            git('branch', 'feature')
+    return path
+
+def traverse(repo_path, commit_attributes=(), file_attributes=(), list_files=True):
+    """
+    Mines the repository once, computing the given attributes for every commit
+    and, with `list_files`, for every modified .py file.
+    """
+    started = time.perf_counter()
+    for commit in Repository(repo_path).traverse_commits():
+        for attribute in commit_attributes:
+            COMMIT_ATTRIBUTES[attribute](commit)
+        if not list_files:
+            continue
+        for modification in commit.modified_files:
+            if modification.filename.endswith('.py'):
+                for attribute in file_attributes:
+                    FILE_ATTRIBUTES[attribute](modification)
+    return time.perf_counter() - started
+
+def benchmark_attributes(repo_path, repeats=3):
+    """
+    Times each attribute on its own. The cost of a commit attribute is the
+    best traversal time with it minus the best bare traversal time; the cost
+    of `modified_files` is that of listing the files, which diffs every commit
+    against its parent. The other file attributes are timed on top of that
+    listing, so the diff-derived ones (`diff`, the line counts) show only
+    what they add to the diff already made.
+    """
+    baseline = min(traverse(repo_path, list_files=False) for _ in range(repeats))
+    listed = min(traverse(repo_path) for _ in range(repeats))
+    costs = {}
+    for attribute in COMMIT_ATTRIBUTES:
+        costs[attribute] = min(traverse(repo_path, commit_attributes=[attribute], list_files=False) for _ in range(repeats)) - baseline
+    for attribute in FILE_ATTRIBUTES:
+        if attribute == 'modified_files':
+            costs[attribute] = listed - baseline
+            continue
+        costs[attribute] = min(traverse(repo_path, file_attributes=[attribute]) for _ in range(repeats)) - listed
+    return baseline, costs
+
+def benchmark_profiles(repo_path, repeats=3):
+    """Times a traversal computing all the attributes of each profile."""
+    timings = {}
+    for profile, attributes in PROFILES.items():
+        commit_attributes = [attribute for attribute in COMMIT_ATTRIBUTES if attribute in attributes]
+        file_attributes = [attribute for attribute in FILE_ATTRIBUTES if attribute in attributes]
+        timings[profile] = min(traverse(repo_path, commit_attributes, file_attributes) for _ in range(repeats))
+    return timings
+
+def main():
+    repo_path = create_fixture_repo()
+    commit_count = int(subprocess.run(['git', '-C', repo_path, 'rev-list', '--count', 'HEAD'],
+                                      check=True, capture_output=True, text=True).stdout)
+
+    baseline, costs = benchmark_attributes(repo_path)
+    profiles = benchmark_profiles(repo_path)
+
+    print(f"Fixture: {commit_count} commits, traversal baseline {baseline:.2f}s")
+    print(f"{'Attribute':<20}{'Total (s)':>12}{'Per commit (ms)':>18}")
+    for attribute, cost in sorted(costs.items(), key=lambda item: item[1], reverse=True):
+        print(f"{attribute:<20}{cost:>12.3f}{cost / commit_count * 1000:>18.2f}")
+    print()
+    print(f"{'Profile':<20}{'Total (s)':>12}{'Per commit (ms)':>18}")
+    for profile, total in profiles.items():
+        print(f"{profile:<20}{total:>12.3f}{total / commit_count * 1000:>18.2f}")
+
+    with open(report_path, 'w', encoding='utf-8') as report_file:
+        json.dump({'commits': commit_count, 'baseline': baseline, 'attributes': costs, 'profiles': profiles},
+                  report_file, indent=4)
+    print(f"Timings written to {report_path}")
+
+if __name__ == '__main__':
+    main()
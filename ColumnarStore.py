@@ -0,0 +1,157 @@
+import os
+import shutil
+import uuid
+from datetime import datetime
+from urllib.parse import quote
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is only needed for the columnar output
+    pa = None
+
+# Root directories of the partitioned Parquet datasets
+commits_dataset_dir = 'Columnar/commits'
+competency_dataset_dir = 'Columnar/competency'
+
+PARTITION_COLUMNS = ['ProjectName', 'AuthorID']
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("The columnar output needs pyarrow, install it with: pip install pyarrow")
+
+def commits_schema():
+    """Typed schema of the commit table written by TrialPyDriller.extract_data."""
+    _require_pyarrow()
+    return pa.schema([
+        ('CommitHash', pa.string()),
+        ('ProjectName', pa.string()),
+        ('AuthorID', pa.string()),
+        ('AuthorDate', pa.timestamp('s', tz='UTC')),
+        ('AuthorTimezone', pa.string()),
+        ('ModifiedFilename', pa.string()),
+        ('ChangeType', pa.dictionary(pa.int8(), pa.string())),
+        ('AddedLines', pa.int32()),
+        ('DeletedLines', pa.int32()),
+        ('SourceCodeBeforeFilePath', pa.string()),
+        ('SourceCodeFilePath', pa.string()),
+        ('OldPath', pa.string()),
+        ('NewPath', pa.string()),
+        ('AuthorLocalOffset', pa.string()),
+    ])
+
+def competency_schema():
+    """Typed schema of the per-commit competency table, one row per level."""
+    _require_pyarrow()
+    return pa.schema([
+        ('CommitHash', pa.string()),
+        ('ProjectName', pa.string()),
+        ('AuthorID', pa.string()),
+        ('AuthorDate', pa.timestamp('s')),
+        ('Level', pa.dictionary(pa.int8(), pa.string())),
+        ('After', pa.int64()),
+        ('Before', pa.int64()),
+        ('Difference', pa.int64()),
+    ])
+
+def write_partitioned(table, root, replace_projects=False):
+    """
+    Appends a table to a dataset partitioned by project and author
+    (hive layout: ProjectName=<project>/AuthorID=<author>/part-*.parquet).
+    With `replace_projects` the existing partitions of the written projects are replaced.
+    """
+    pq.write_to_dataset(
+        table, root,
+        partition_cols=PARTITION_COLUMNS,
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior='delete_matching' if replace_projects else 'overwrite_or_ignore',
+    )
+
+def export_commits_csv(csv_file_path, root=commits_dataset_dir):
+    """
+    Converts a PythonCommits_data/<owner>.<name>_data.csv file into the typed,
+    partitioned commit dataset, replacing the project's previous export.
+    """
+    _require_pyarrow()
+    schema = commits_schema()
+    # Dates are written in UTC without an offset; parse them naive, the cast adds the zone
+    column_types = {field.name: field.type for field in schema if field.name != 'ChangeType'}
+    column_types['AuthorDate'] = pa.timestamp('s')
+    table = pa_csv.read_csv(
+        csv_file_path,
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types,
+            timestamp_parsers=['%Y-%m-%d %H:%M:%S'],
+            strings_can_be_null=True,
+        ),
+    )
+    table = table.select(schema.names).cast(schema)
+    write_partitioned(table, root, replace_projects=True)
+
+class CompetencyParquetWriter:
+    """
+    Buffers per-commit summaries and writes them to the partitioned competency
+    dataset in batches of `batch_rows` rows. Used as `summary_writer` by
+    TrialPyCEFR.generate_summary_files and by ProcessData.
+    A run replaces the projects it writes: the existing partitions of a
+    project are deleted the first time one of its rows is flushed, so running
+    the aggregation again does not duplicate its rows.
+    """
+
+    def __init__(self, root=competency_dataset_dir, batch_rows=100_000):
+        _require_pyarrow()
+        self.root = root
+        self.batch_rows = batch_rows
+        self.schema = competency_schema()
+        self.columns = {name: [] for name in self.schema.names}
+        self.written_projects = set()
+
+    def write_summary(self, commit_hash, project_name, author_id, author_date_format, time_format, after_sum, before_sum, diff):
+        author_date = datetime.strptime(f"{author_date_format}{time_format}", "%Y%m%d%H%M%S")
+        for level in sorted(set(after_sum) | set(before_sum)):
+            self.columns['CommitHash'].append(commit_hash)
+            self.columns['ProjectName'].append(project_name)
+            self.columns['AuthorID'].append(author_id)
+            self.columns['AuthorDate'].append(author_date)
+            self.columns['Level'].append(level)
+            self.columns['After'].append(after_sum.get(level, 0))
+            self.columns['Before'].append(before_sum.get(level, 0))
+            self.columns['Difference'].append(diff.get(level, 0))
+        if len(self.columns['CommitHash']) >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.columns['CommitHash']:
+            return
+        for project_name in set(self.columns['ProjectName']) - self.written_projects:
+            # Hive layout, every author partition of the project is below this directory
+            # (pyarrow percent-encodes partition values in directory names)
+            shutil.rmtree(os.path.join(self.root, f"ProjectName={quote(project_name, safe='')}"), ignore_errors=True)
+            self.written_projects.add(project_name)
+        write_partitioned(pa.table(self.columns, schema=self.schema), self.root)
+        self.columns = {name: [] for name in self.schema.names}
+
+    def close(self):
+        self.flush()
+
+def read_dataset(root, columns=None, filters=None):
+    """
+    Loads a partitioned dataset into a pandas DataFrame, reading only `columns`.
+    `filters` use the pyarrow form, e.g. [('ProjectName', '=', 'pydriller'),
+    ('AuthorDate', '>=', datetime(2023, 1, 1))]; filters on ProjectName and
+    AuthorID skip whole partitions, the others are pushed down to row groups.
+    """
+    _require_pyarrow()
+    if not os.path.exists(root):
+        raise FileNotFoundError(f"No columnar dataset at {root}")
+    table = pq.read_table(root, columns=columns, filters=filters, partitioning='hive')
+    return table.to_pandas()
+
+def read_competency(columns=None, filters=None, root=competency_dataset_dir):
+    """Loads the competency table, see `read_dataset`."""
+    return read_dataset(root, columns, filters)
+
+def read_commits(columns=None, filters=None, root=commits_dataset_dir):
+    """Loads the commit table, see `read_dataset`."""
+    return read_dataset(root, columns, filters)
@@ -0,0 +1,235 @@
+import json
+import logging
+import math
+import os
+import sqlite3
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from CompetencyStore import PERIOD_EXPRESSIONS, ROLLUP_PERIODS, CompetencyStore, RollupStore
+from RunProfiler import configure_logging
+
+# Data sources: the full store answers every period and date range, the
+# rollups only months and weeks. The first one that exists is used.
+competency_store_path = 'CompetencyScore/competency.sqlite'
+rollup_store_path = 'CompetencyScore/rollups.sqlite'
+
+host = '127.0.0.1'
+port = 8050
+max_points = 200  # Bins sent per series; longer series are merged server-side
+query_cache_size = 256
+
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+
+logger = logging.getLogger('CompetencyDashboard')
+METRICS = {'after': 2, 'before': 3, 'difference': 4, 'commits': 5}
+
+def downsample(labels, values, max_points):
+    """
+    Merges consecutive bins into at most `max_points` bins by summing them.
+    Each merged bin is labelled with its first period.
+    """
+    max_points = max(1, max_points)
+    if len(labels) <= max_points:
+        return labels, values
+    size = math.ceil(len(labels) / max_points)
+    merged_labels = [labels[start] for start in range(0, len(labels), size)]
+    merged_values = {level: [sum(series[start:start + size]) for start in range(0, len(series), size)]
+                     for level, series in values.items()}
+    return merged_labels, merged_values
+
+class DashboardData:
+    """
+    Answers the dashboard queries from a CompetencyStore or a RollupStore.
+    Results are cached per query; the cache key includes the modification
+    time of the database, so new commits are picked up without a restart.
+    """
+
+    def __init__(self, competency_path=competency_store_path, rollup_path=rollup_store_path, cache_size=query_cache_size):
+        if os.path.exists(competency_path):
+            self.path, self.store = competency_path, CompetencyStore(competency_path)
+            self.periods = list(PERIOD_EXPRESSIONS)
+        elif os.path.exists(rollup_path):
+            self.path, self.store = rollup_path, RollupStore(rollup_path)
+            self.periods = list(ROLLUP_PERIODS)
+        else:
+            raise FileNotFoundError(f"Neither {competency_path} nor {rollup_path} exists")
+        self._projects = lru_cache(maxsize=cache_size)(self._query_projects)
+        self._authors = lru_cache(maxsize=cache_size)(self._query_authors)
+        self._series = lru_cache(maxsize=cache_size)(self._query_series)
+
+    def version(self):
+        """Changes whenever the database (or its write-ahead log) is written."""
+        return max(os.path.getmtime(path) for path in (self.path, f"{self.path}-wal") if os.path.exists(path))
+
+    def _query_projects(self, version):
+        return self.store.projects()
+
+    def _query_authors(self, version, project_name):
+        return self.store.authors(project_name)
+
+    def _query_series(self, version, project_name, author_id, start, end, period, metric, max_points):
+        if period not in self.periods:
+            raise ValueError(f"Unknown period {period!r}, expected one of: {', '.join(self.periods)}")
+        if isinstance(self.store, CompetencyStore):
+            rows = self.store.level_aggregates(project_name, author_id, start, end, period=period)
+        else:
+            rows = self.store.rollups(project_name, period, author_id, start, end)
+
+        labels = sorted({row[0] for row in rows})
+        positions = {label: position for position, label in enumerate(labels)}
+        values = {level: [0] * len(labels) for level in LEVELS}
+        for row in rows:
+            if row[1] in values:
+                values[row[1]][positions[row[0]]] = row[METRICS[metric]]
+
+        bins = len(labels)
+        labels, values = downsample(labels, values, max_points)
+        return {'period': period, 'metric': metric, 'bins': bins, 'labels': labels, 'series': values}
+
+    def projects(self):
+        return self._projects(self.version())
+
+    def authors(self, project_name):
+        return self._authors(self.version(), project_name)
+
+    def series(self, project_name, author_id=None, start=None, end=None, period='month', metric='after', max_points=max_points):
+        return self._series(self.version(), project_name, author_id, start, end, period, metric, max_points)
+
+    def close(self):
+        self.store.close()
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Code Competency Over Time</title>
+<script src="/plotly.min.js"></script>
+<style>body { font-family: sans-serif; margin: 1em; } label { margin-right: 1em; }</style>
+</head>
+<body>
+<h2>Visualization of Developer's Code Competency Over Time</h2>
+<div>
+  <label>Project <select id="project"></select></label>
+  <label>Author <select id="author"><option value="">All authors</option></select></label>
+  <label>From <input id="start" type="date"></label>
+  <label>To <input id="end" type="date"></label>
+  <label>Period <select id="period">__PERIODS__</select></label>
+  <label>Value <select id="metric">__METRICS__</select></label>
+</div>
+<p id="status"></p>
+<div id="chart" style="height: 600px;"></div>
+<script>
+const field = id => document.getElementById(id);
+async function getJson(path, params) {
+  const response = await fetch(path + '?' + new URLSearchParams(params || {}));
+  const body = await response.json();
+  if (!response.ok) throw new Error(body.error);
+  return body;
+}
+async function loadAuthors() {
+  const authors = await getJson('/api/authors', {project: field('project').value});
+  field('author').replaceChildren(new Option('All authors', ''), ...authors.map(author => new Option(author)));
+}
+async function draw() {
+  const params = {project: field('project').value, period: field('period').value, metric: field('metric').value,
+                  max_points: Math.max(20, Math.floor(field('chart').clientWidth / 5))};
+  for (const name of ['author', 'start', 'end']) if (field(name).value) params[name] = field(name).value;
+  try {
+    const data = await getJson('/api/series', params);
+    const traces = Object.entries(data.series).map(([level, values]) =>
+      ({x: data.labels, y: values, name: level, type: 'scatter', mode: 'lines+markers'}));
+    Plotly.react('chart', traces, {xaxis: {title: data.period}, yaxis: {title: data.metric}});
+    field('status').textContent = `${data.labels.length} of ${data.bins} bins`;
+  } catch (error) {
+    field('status').textContent = error.message;
+  }
+}
+(async () => {
+  const projects = await getJson('/api/projects');
+  field('project').replaceChildren(...projects.map(project => new Option(project)));
+  field('project').onchange = async () => { await loadAuthors(); draw(); };
+  for (const name of ['author', 'start', 'end', 'period', 'metric']) field(name).onchange = draw;
+  await loadAuthors();
+  draw();
+})();
+</script>
+</body>
+</html>
+"""
+
+@lru_cache(maxsize=1)
+def plotly_js():
+    """plotly.js as shipped with the installed plotly package, served locally so the page works offline."""
+    from plotly.offline import get_plotlyjs
+    return get_plotlyjs().encode('utf-8')
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    data = None  # DashboardData, set by serve()
+
+    def send_payload(self, payload, content_type, status=200):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_json(self, body, status=200):
+        self.send_payload(json.dumps(body).encode('utf-8'), 'application/json', status)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        try:
+            if url.path == '/':
+                options = lambda names: ''.join(f"<option>{name}</option>" for name in names)
+                page = PAGE.replace('__PERIODS__', options(self.data.periods)).replace('__METRICS__', options(METRICS))
+                self.send_payload(page.encode('utf-8'), 'text/html; charset=utf-8')
+            elif url.path == '/plotly.min.js':
+                try:
+                    self.send_payload(plotly_js(), 'application/javascript; charset=utf-8')
+                except ImportError:
+                    self.send_json({'error': "plotly is not installed"}, status=503)
+            elif url.path == '/api/projects':
+                self.send_json(self.data.projects())
+            elif url.path == '/api/authors':
+                self.send_json(self.data.authors(query['project']))
+            elif url.path == '/api/series':
+                self.send_json(self.data.series(
+                    query['project'], query.get('author'), query.get('start'), query.get('end'),
+                    query.get('period', 'month'), query.get('metric', 'after'),
+                    max(1, min(int(query.get('max_points', max_points)), max_points))))
+            else:
+                self.send_json({'error': f"Not found: {url.path}"}, status=404)
+        except (KeyError, ValueError, TypeError) as e:
+            self.send_json({'error': f"Bad request: {e}"}, status=400)
+        except sqlite3.Error as e:
+            logger.error(f"Query {self.path} failed: {e}")
+            self.send_json({'error': f"Database error: {e}"}, status=500)
+        except Exception as e:
+            logger.exception(f"Query {self.path} failed")
+            self.send_json({'error': f"Internal error: {e}"}, status=500)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(competency_path=competency_store_path, rollup_path=rollup_store_path, host=host, port=port):
+    """
+    Serves the dashboard until interrupted. The page only receives the
+    aggregated, downsampled bins of the selected project, author, range and period.
+    """
+    DashboardHandler.data = DashboardData(competency_path, rollup_path)
+    server = HTTPServer((host, port), DashboardHandler)
+    logger.info(f"Dashboard on http://{host}:{port}/ (data from {DashboardHandler.data.path})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        DashboardHandler.data.close()
+
+if __name__ == '__main__':
+    configure_logging()
+    serve()
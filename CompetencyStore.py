@@ -0,0 +1,318 @@
+import sqlite3
+from datetime import datetime
+
+# Expressions that map an author_date ('YYYY-MM-DD HH:MM:SS') to its period
+PERIOD_EXPRESSIONS = {
+    'day': "strftime('%Y-%m-%d', author_date)",
+    'week': "strftime('%Y-W%W', author_date)",
+    'month': "strftime('%Y-%m', author_date)",
+    'quarter': "strftime('%Y', author_date) || '-Q' || ((CAST(strftime('%m', author_date) AS INTEGER) + 2) / 3)",
+    'year': "strftime('%Y', author_date)",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commits (
+    commit_id INTEGER PRIMARY KEY,
+    commit_hash TEXT NOT NULL,
+    project_name TEXT NOT NULL,
+    author_id TEXT NOT NULL,
+    author_date TEXT NOT NULL,
+    UNIQUE (project_name, commit_hash)
+);
+CREATE INDEX IF NOT EXISTS commits_project_author_date ON commits (project_name, author_id, author_date);
+CREATE INDEX IF NOT EXISTS commits_project_date ON commits (project_name, author_date);
+
+CREATE TABLE IF NOT EXISTS level_counts (
+    commit_id INTEGER NOT NULL REFERENCES commits (commit_id),
+    level TEXT NOT NULL,
+    after INTEGER NOT NULL,
+    before INTEGER NOT NULL,
+    difference INTEGER NOT NULL,
+    PRIMARY KEY (commit_id, level)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    commit_id INTEGER NOT NULL REFERENCES commits (commit_id),
+    file_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    UNIQUE (commit_id, file_name)
+);
+
+CREATE TABLE IF NOT EXISTS file_levels (
+    file_id INTEGER NOT NULL REFERENCES files (file_id),
+    level TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (file_id, level)
+) WITHOUT ROWID;
+"""
+
+def format_author_date(author_date_format, time_format):
+    """Converts the YYYYMMDD / HHMMSS pair of the summaries into an SQLite date string."""
+    return datetime.strptime(f"{author_date_format}{time_format}", "%Y%m%d%H%M%S").strftime("%Y-%m-%d %H:%M:%S")
+
+def build_where(project_name=None, author_id=None, start=None, end=None, level=None):
+    """Builds the WHERE clause of a query; a bare 'YYYY-MM-DD' end date includes that whole day."""
+    if end is not None and len(end) == 10:
+        end = f"{end} 23:59:59"
+    conditions, parameters = [], []
+    for condition, value in (('project_name = ?', project_name), ('author_id = ?', author_id),
+                             ('author_date >= ?', start), ('author_date <= ?', end), ('level = ?', level)):
+        if value is not None:
+            conditions.append(condition)
+            parameters.append(value)
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ''), parameters
+
+class CompetencyStore:
+    """
+    Embedded SQLite store of commits, analyzed files and level counts, indexed
+    on (project, author_id, author_date). It implements the `summary_writer`
+    interface of the aggregation scripts, and answers per-period queries
+    without reading any JSON file.
+    """
+
+    def __init__(self, path, batch_size=10_000):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.batch_size = batch_size
+        self.pending = 0
+
+    def _commit_id(self, commit_hash, project_name, author_id, author_date):
+        self.connection.execute(
+            "INSERT INTO commits (commit_hash, project_name, author_id, author_date) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (project_name, commit_hash) DO UPDATE SET author_id = excluded.author_id, author_date = excluded.author_date",
+            (commit_hash, project_name, author_id, author_date))
+        (commit_id,) = self.connection.execute(
+            "SELECT commit_id FROM commits WHERE project_name = ? AND commit_hash = ?",
+            (project_name, commit_hash)).fetchone()
+        return commit_id
+
+    def _written(self):
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.connection.commit()
+            self.pending = 0
+
+    def write_summary(self, commit_hash, project_name, author_id, author_date_format, time_format, after_sum, before_sum, diff):
+        """
+        Stores the before/after/difference level counts of one commit. A
+        commit written again keeps only the levels of its new summary.
+        """
+        commit_id = self._commit_id(commit_hash, project_name, author_id, format_author_date(author_date_format, time_format))
+        # In the same transaction as the inserts, so readers never see the commit without levels
+        self.connection.execute("DELETE FROM level_counts WHERE commit_id = ?", (commit_id,))
+        self.connection.executemany(
+            "INSERT INTO level_counts VALUES (?, ?, ?, ?, ?)",
+            [(commit_id, level, after_sum.get(level, 0), before_sum.get(level, 0), diff.get(level, 0))
+             for level in set(after_sum) | set(before_sum)])
+        self._written()
+
+    def write_files(self, commit_hash, project_name, author_id, author_date_format, time_format, files):
+        """
+        Stores the level counts of the analyzed files of one commit, given as
+        (file_name, status, levels). A commit written again keeps only its new files.
+        """
+        commit_id = self._commit_id(commit_hash, project_name, author_id, format_author_date(author_date_format, time_format))
+        self.connection.execute(
+            "DELETE FROM file_levels WHERE file_id IN (SELECT file_id FROM files WHERE commit_id = ?)", (commit_id,))
+        self.connection.execute("DELETE FROM files WHERE commit_id = ?", (commit_id,))
+        for file_name, status, levels in files:
+            file_id = self.connection.execute(
+                "INSERT INTO files (commit_id, file_name, status) VALUES (?, ?, ?)", (commit_id, file_name, status)).lastrowid
+            self.connection.executemany(
+                "INSERT INTO file_levels VALUES (?, ?, ?)",
+                [(file_id, level, count) for level, count in levels.items()])
+        self._written()
+
+    def level_aggregates(self, project_name=None, author_id=None, start=None, end=None, period='month', level=None):
+        """
+        Sums the After/Before/Difference counts per period and level.
+        `start` and `end` are inclusive 'YYYY-MM-DD[ HH:MM:SS]' bounds on the author date.
+        Returns a list of (period, level, after, before, difference, commits).
+        """
+        where, parameters = build_where(project_name=project_name, author_id=author_id, start=start, end=end, level=level)
+        return self.connection.execute(f"""
+            SELECT {PERIOD_EXPRESSIONS[period]} AS period, level,
+                   SUM(after), SUM(before), SUM(difference), COUNT(DISTINCT commit_id)
+            FROM commits JOIN level_counts USING (commit_id)
+            {where}
+            GROUP BY period, level
+            ORDER BY period, level
+        """, parameters).fetchall()
+
+    def author_trend(self, project_name, author_id, level, period='month'):
+        """Per-period totals of one level for one author, e.g. an author's C2 trend."""
+        return self.level_aggregates(project_name, author_id, period=period, level=level)
+
+    def commit_levels(self, project_name=None, start=None):
+        """
+        Yields (commit_hash, project_name, author_id, author_date, levels) in
+        author date order, `levels` mapping each level to (after, before, difference).
+        """
+        where, parameters = build_where(project_name=project_name, start=start)
+        rows = self.connection.execute(f"""
+            SELECT commit_id, commit_hash, project_name, author_id, author_date, level, after, before, difference
+            FROM commits JOIN level_counts USING (commit_id)
+            {where}
+            ORDER BY author_date, commit_id
+        """, parameters)
+        current_id, current, levels = None, None, {}
+        for commit_id, commit_hash, commit_project, author_id, author_date, level, after, before, difference in rows:
+            if commit_id != current_id:
+                if current is not None:
+                    yield (*current, levels)
+                current_id, current, levels = commit_id, (commit_hash, commit_project, author_id, author_date), {}
+            levels[level] = (after, before, difference)
+        if current is not None:
+            yield (*current, levels)
+
+    def projects(self):
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT project_name FROM commits ORDER BY project_name")]
+
+    def authors(self, project_name):
+        return [row[0] for row in self.connection.execute(
+            "SELECT DISTINCT author_id FROM commits WHERE project_name = ? ORDER BY author_id", (project_name,))]
+
+    def commits(self, project_name=None, start=None, end=None):
+        """Lists (commit_hash, project_name, author_id, author_date) of the commits in a date range."""
+        where, parameters = build_where(project_name=project_name, start=start, end=end)
+        return self.connection.execute(
+            f"SELECT commit_hash, project_name, author_id, author_date FROM commits {where} ORDER BY author_date",
+            parameters).fetchall()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    project_name TEXT NOT NULL,
+    period_type TEXT NOT NULL,
+    period TEXT NOT NULL,
+    author_id TEXT NOT NULL,
+    level TEXT NOT NULL,
+    after INTEGER NOT NULL,
+    before INTEGER NOT NULL,
+    difference INTEGER NOT NULL,
+    commits INTEGER NOT NULL,
+    PRIMARY KEY (project_name, period_type, period, author_id, level)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS rolled_up_levels (
+    project_name TEXT NOT NULL,
+    commit_hash TEXT NOT NULL,
+    author_id TEXT NOT NULL,
+    author_date TEXT NOT NULL,
+    level TEXT NOT NULL,
+    after INTEGER NOT NULL,
+    before INTEGER NOT NULL,
+    difference INTEGER NOT NULL,
+    PRIMARY KEY (project_name, commit_hash, level)
+) WITHOUT ROWID;
+"""
+
+# Buckets maintained by RollupStore, formatted like PERIOD_EXPRESSIONS
+ROLLUP_PERIODS = {
+    'month': '%Y-%m',
+    'week': '%Y-W%W',
+}
+
+class RollupStore:
+    """
+    Monthly and weekly After/Before/Difference totals per project, author and
+    level, updated as each commit summary is written. It implements the
+    `summary_writer` interface, so the aggregation scripts feed it alongside
+    their regular output, and charts read a few rows per period instead of
+    every commit. The contribution of each commit is kept per level, so a
+    summary written again (e.g. after re-analysis) replaces the earlier one
+    instead of being counted twice.
+    """
+
+    def __init__(self, path, batch_size=10_000):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(ROLLUP_SCHEMA)
+        self.batch_size = batch_size
+        self.pending = 0
+
+    def write_summary(self, commit_hash, project_name, author_id, author_date_format, time_format, after_sum, before_sum, diff):
+        """
+        Adds one commit to the buckets of its author date. If the commit was
+        added before, its previous contribution is subtracted first.
+        """
+        author_date = f"{author_date_format}{time_format}"
+        contribution = sorted((author_id, author_date, level, after_sum.get(level, 0), before_sum.get(level, 0), diff.get(level, 0))
+                              for level in set(after_sum) | set(before_sum))
+        previous = sorted(self.connection.execute(
+            "SELECT author_id, author_date, level, after, before, difference FROM rolled_up_levels "
+            "WHERE project_name = ? AND commit_hash = ?", (project_name, commit_hash)))
+        if previous == contribution:
+            return
+
+        if previous:
+            self._add(project_name, previous, -1)
+            self.connection.execute("DELETE FROM rolled_up_levels WHERE project_name = ? AND commit_hash = ?",
+                                    (project_name, commit_hash))
+            self.connection.execute("DELETE FROM rollups WHERE project_name = ? AND commits = 0", (project_name,))
+        self._add(project_name, contribution, 1)
+        self.connection.executemany("INSERT INTO rolled_up_levels VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                    [(project_name, commit_hash, *row) for row in contribution])
+
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.connection.commit()
+            self.pending = 0
+
+    def _add(self, project_name, contribution, sign):
+        """Adds (sign 1) or subtracts (sign -1) rolled_up_levels rows to the buckets of their author date."""
+        rows = []
+        for author_id, author_date, level, after, before, difference in contribution:
+            date = datetime.strptime(author_date, "%Y%m%d%H%M%S")
+            for period_type, period_format in ROLLUP_PERIODS.items():
+                rows.append((project_name, period_type, date.strftime(period_format), author_id, level,
+                             sign * after, sign * before, sign * difference, sign))
+        self.connection.executemany(
+            "INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (project_name, period_type, period, author_id, level) DO UPDATE SET "
+            "after = after + excluded.after, before = before + excluded.before, "
+            "difference = difference + excluded.difference, commits = commits + excluded.commits",
+            rows)
+
+    def rollups(self, project_name, period_type='month', author_id=None, start=None, end=None):
+        """
+        Returns (period, level, after, before, difference, commits) per period
+        and level, for one author or summed over all authors of the project
+        (of all projects when `project_name` is None).
+        `start` and `end` are inclusive 'YYYY-MM-DD' dates, applied to whole periods.
+        """
+        period_format = ROLLUP_PERIODS[period_type]
+        conditions, parameters = ['period_type = ?'], [period_type]
+        for condition, value in (('project_name = ?', project_name), ('author_id = ?', author_id)):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        for condition, date in (('period >= ?', start), ('period <= ?', end)):
+            if date is not None:
+                conditions.append(condition)
+                parameters.append(datetime.strptime(date[:10], '%Y-%m-%d').strftime(period_format))
+        return self.connection.execute(f"""
+            SELECT period, level, SUM(after), SUM(before), SUM(difference), SUM(commits)
+            FROM rollups
+            WHERE {' AND '.join(conditions)}
+            GROUP BY period, level
+            ORDER BY period, level
+        """, parameters).fetchall()
+
+    def projects(self):
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT project_name FROM rollups ORDER BY project_name")]
+
+    def authors(self, project_name):
+        return [row[0] for row in self.connection.execute(
+            "SELECT DISTINCT author_id FROM rollups WHERE project_name = ? ORDER BY author_id", (project_name,))]
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
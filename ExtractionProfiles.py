@@ -0,0 +1,63 @@
+# Declarative extraction profiles shared by the mining scripts.
+# A profile is the set of PyDriller attributes a run computes; PyDriller
+# evaluates attributes lazily, so anything outside the profile costs nothing.
+# Listing the modified files is the exception: PyDriller gets them from a
+# patch diff against the parent, so every file attribute, even a path, pays
+# for the diff of the whole commit; `diff` and the line counts then come cheap.
+# Run BenchmarkExtraction.py to see what each attribute costs on a fixture repository.
+
+# How each attribute is computed, from the commit or from the modified file
+COMMIT_ATTRIBUTES = {
+    'hash': lambda commit: commit.hash,
+    'author_name': lambda commit: commit.author.name,
+    'author_email': lambda commit: commit.author.email,
+    'committer_name': lambda commit: commit.committer.name,
+    'committer_email': lambda commit: commit.committer.email,
+    'author_date': lambda commit: commit.author_date,
+    'author_timezone': lambda commit: commit.author_timezone,
+    'committer_date': lambda commit: commit.committer_date,
+    'committer_timezone': lambda commit: commit.committer_timezone,
+    'branches': lambda commit: ", ".join(commit.branches),
+    'in_main_branch': lambda commit: commit.in_main_branch,
+    'merge': lambda commit: commit.merge,
+    'project_name': lambda commit: commit.project_name,
+    'project_path': lambda commit: commit.project_path,
+}
+FILE_ATTRIBUTES = {
+    'modified_files': lambda modification: modification.new_path,
+    'old_path': lambda modification: modification.old_path,
+    'new_path': lambda modification: modification.new_path,
+    'filename': lambda modification: modification.filename,
+    'change_type': lambda modification: modification.change_type.name,
+    'diff': lambda modification: modification.diff,
+    'diff_parsed': lambda modification: modification.diff_parsed,
+    'added_lines': lambda modification: modification.added_lines,
+    'deleted_lines': lambda modification: modification.deleted_lines,
+    'source_code': lambda modification: modification.source_code,
+    'source_code_before': lambda modification: modification.source_code_before,
+    'methods': lambda modification: modification.methods,
+    'methods_before': lambda modification: modification.methods_before,
+    'changed_methods': lambda modification: modification.changed_methods,
+}
+
+METADATA_ATTRIBUTES = frozenset([
+    'hash', 'author_name', 'author_email', 'committer_name', 'committer_email',
+    'author_date', 'author_timezone', 'committer_date', 'committer_timezone', 'merge',
+    'project_name', 'project_path', 'modified_files', 'old_path', 'new_path', 'filename', 'change_type',
+])
+
+PROFILES = {
+    # Commit and file metadata only: no source blobs or method analysis and no branch
+    # lookups, but the file list still costs a diff of each commit (see above)
+    'metadata-only': METADATA_ATTRIBUTES,
+    # Adds both file versions and the line-level diff
+    'sources': METADATA_ATTRIBUTES | {'source_code', 'source_code_before', 'diff', 'added_lines', 'deleted_lines'},
+    # Everything, including branch membership and the lizard method analysis
+    'full': frozenset(COMMIT_ATTRIBUTES) | frozenset(FILE_ATTRIBUTES),
+}
+
+def profile_attributes(profile):
+    """Returns the attributes computed by a profile name."""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown extraction profile {profile!r}, expected one of: {', '.join(PROFILES)}")
+    return PROFILES[profile]
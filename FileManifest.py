@@ -0,0 +1,171 @@
+import mmap
+import os
+import re
+import struct
+from collections import namedtuple
+
+# Directory of the per-repository manifests written by TrialPyDriller.extract_data
+manifest_dir = 'FileManifest'
+
+MAGIC = b'PYFM'
+VERSION = 1
+
+# Header: magic, version, record size, length of the project name, then the name itself
+HEADER = struct.Struct('<4sHHI')
+# Record: commit SHA-1, author id, author date (YYYYMMDD), author time (HHMMSS), after flag, file index
+RECORD = struct.Struct('<20s8sIIBI')
+
+STATUSES = ('before', 'after')
+
+# Snapshot file names in manifest mode: <repository key>.<file id>.py
+MANIFEST_NAME_PATTERN = re.compile(r'^(?P<key>.+)\.(?P<file_id>\d+)\.py$')
+
+FileRecord = namedtuple('FileRecord', ['project_name', 'commit_hash', 'author_id', 'author_date_format',
+                                       'time_format', 'status', 'index'])
+
+def manifest_path(key, directory=manifest_dir):
+    """Path of the manifest of a repository, named by its key (see TrialPyDriller.repository_key)."""
+    return os.path.join(directory, f"{key}.manifest")
+
+def manifest_file_name(key, file_id):
+    """Name of the snapshot file of a manifest entry."""
+    return f"{key}.{file_id}.py"
+
+def parse_manifest_file_name(file_name):
+    """Returns (key, file_id) of a manifest snapshot name, or None for any other name."""
+    match = MANIFEST_NAME_PATTERN.match(os.path.basename(file_name))
+    if match is None:
+        return None
+    return match.group('key'), int(match.group('file_id'))
+
+def parse_legacy_file_name(file_name):
+    """
+    Splits a name written by TrialPyDriller.format_filename into
+    (project_name, author_id, author_date_format, time_format, status),
+    or returns None when it does not have the expected structure.
+    """
+    parts = file_name.split('_')
+    if len(parts) < 7:
+        return None
+    return parts[1], parts[2], parts[3], parts[4], parts[5]
+
+class FileManifestWriter:
+    """
+    Appends fixed-width metadata records to a repository manifest. The id of a
+    file is its record number, so readers find it with a single offset
+    computation. Opening an existing manifest continues its numbering.
+    The manifest is found again through the key in its snapshot file names
+    (see `file_name`); `project_name` is what readers report for its records.
+    """
+
+    def __init__(self, path, project_name):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.key = os.path.basename(path)[:-len('.manifest')]
+        self.project_name = project_name
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            name = project_name.encode('utf-8')
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, len(name)) + name)
+        self.header_size = HEADER.size + len(project_name.encode('utf-8'))
+        self.next_id = (self.file.tell() - self.header_size) // RECORD.size
+
+    def add(self, commit_hash, author_id, author_date, status, index):
+        """Records one snapshot file and returns its id. `author_date` is the commit's (local) author date."""
+        self.file.write(RECORD.pack(
+            bytes.fromhex(commit_hash), author_id.encode('ascii'),
+            int(author_date.strftime('%Y%m%d')), int(author_date.strftime('%H%M%S')),
+            STATUSES.index(status), index or 0))
+        file_id = self.next_id
+        self.next_id += 1
+        return file_id
+
+    def file_name(self, file_id):
+        """Name of the snapshot file of an id returned by `add`."""
+        return manifest_file_name(self.key, file_id)
+
+    def flush(self):
+        self.file.flush()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+class FileManifest:
+    """Read-only, memory-mapped view of a repository manifest."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, name_length = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{path} is not a version {VERSION} file manifest")
+        self.project_name = self.map[HEADER.size:HEADER.size + name_length].decode('utf-8')
+        self.header_size = HEADER.size + name_length
+
+    def __len__(self):
+        return (len(self.map) - self.header_size) // RECORD.size
+
+    def __getitem__(self, file_id):
+        if not 0 <= file_id < len(self):
+            raise IndexError(f"File id {file_id} is not in the manifest of {self.project_name}")
+        commit_hash, author_id, author_date, author_time, after, index = \
+            RECORD.unpack_from(self.map, self.header_size + file_id * RECORD.size)
+        return FileRecord(self.project_name, commit_hash.hex(), author_id.decode('ascii'),
+                          f"{author_date:08d}", f"{author_time:06d}", STATUSES[after], index)
+
+    def columns(self, file_ids):
+        """
+        Looks up many ids at once. Returns a dict of lists keyed like
+        ProcessData.FILENAME_COLUMNS, read through a numpy view of the records.
+        """
+        import numpy as np
+        records = np.frombuffer(self.map, offset=self.header_size, count=len(self), dtype=np.dtype({
+            'names': ['commit_hash', 'author_id', 'author_date', 'author_time', 'after', 'index'],
+            'formats': ['S20', 'S8', '<u4', '<u4', 'u1', '<u4'],
+            'offsets': [0, 20, 28, 32, 36, 37],
+            'itemsize': RECORD.size,
+        }))[np.asarray(file_ids, dtype=np.int64)]
+        return {
+            'CommitHash': [commit_hash.hex() for commit_hash in records['commit_hash']],
+            'ProjectName': [self.project_name] * len(records),
+            'AuthorID': records['author_id'].astype(str).tolist(),
+            'AuthorDate': [f"{author_date:08d}" for author_date in records['author_date'].tolist()],
+            'AuthorTime': [f"{author_time:06d}" for author_time in records['author_time'].tolist()],
+            'CommitType': [STATUSES[after] for after in records['after'].tolist()],
+        }
+
+    def close(self):
+        self.map.close()
+
+class ManifestIndex:
+    """
+    Resolves analyzed file names to their metadata. Manifest snapshot names
+    are looked up by id in the manifest their key names, opened on first use;
+    any other name is parsed with the legacy underscore layout.
+    """
+
+    def __init__(self, directory=manifest_dir):
+        self.directory = directory
+        self.manifests = {}
+
+    def manifest(self, key):
+        manifest = self.manifests.get(key)
+        if manifest is None:
+            manifest = self.manifests[key] = FileManifest(manifest_path(key, self.directory))
+        return manifest
+
+    def metadata(self, file_name):
+        """Returns (project_name, author_id, author_date_format, time_format, status), or None."""
+        manifest_name = parse_manifest_file_name(file_name)
+        if manifest_name is None:
+            return parse_legacy_file_name(file_name)
+        key, file_id = manifest_name
+        record = self.manifest(key)[file_id]
+        return record.project_name, record.author_id, record.author_date_format, record.time_format, record.status
+
+    def close(self):
+        for manifest in self.manifests.values():
+            manifest.close()
+        self.manifests = {}
@@ -0,0 +1,65 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library decoder
+    orjson = None
+
+def loads_json(raw):
+    """Decodes JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def read_bytes(path):
+    with open(path, 'rb') as file:
+        return file.read()
+
+def _parse_entry(parse, stream_parse, path, raw):
+    """Parses one file in a worker process, from its bytes or, when they were not read, from its path."""
+    if raw is None:
+        return stream_parse(path)
+    return parse(path.stem, raw)
+
+def ingest_json_files(json_files, parse, write, read_workers=8, parse_workers=os.cpu_count(), window=256,
+                      stream_parse=None, streaming_threshold=None):
+    """
+    Reads JSON files with a thread pool and parses them with a process pool.
+    `parse(stem, raw_bytes)` runs in the worker processes and must be a
+    module-level function; `write(result)` runs in this process for every
+    result that is not None, in sorted file order. Files are handled in
+    windows of `window`, the next window being read while the current one
+    is parsed.
+    Files larger than `streaming_threshold` bytes are not read here: the
+    worker calls `stream_parse(path)` (also module-level) on them instead,
+    so they never have to fit in memory whole.
+    """
+    if stream_parse is not None and streaming_threshold is not None:
+        def read(path):
+            return None if os.path.getsize(path) > streaming_threshold else read_bytes(path)
+    else:
+        read = read_bytes
+
+    json_files = sorted(json_files)
+    windows = [json_files[start:start + window] for start in range(0, len(json_files), window)]
+    if not windows:
+        return 0
+
+    count = 0
+    with ThreadPoolExecutor(max_workers=read_workers) as readers, \
+         ProcessPoolExecutor(max_workers=parse_workers) as parsers:
+        next_contents = readers.map(read, windows[0])
+        for index, batch in enumerate(windows):
+            contents = list(next_contents)
+            if index + 1 < len(windows):
+                next_contents = readers.map(read, windows[index + 1])
+
+            chunksize = max(1, len(batch) // (4 * parse_workers))
+            for result in parsers.map(_parse_entry, repeat(parse), repeat(stream_parse), batch, contents, chunksize=chunksize):
+                if result is not None:
+                    write(result)
+                    count += 1
+    return count
@@ -0,0 +1,247 @@
+import ast
+import hashlib
+import logging
+import os
+import pickle
+from collections import OrderedDict
+
+from PyCEFREngine import analyze_sources, matching_statements, segment_text, source_lines, statement_position, sum_levels
+
+logger = logging.getLogger('ParseCache')
+
+# Bounds of the in-memory tiers
+parse_cache_size = 512  # Parsed trees
+segment_cache_size = 100_000  # Level counts of top-level statements
+snapshot_cache_size = 10_000  # Latest snapshot per path
+
+def source_hash(source):
+    return hashlib.sha256(source.encode('utf-8', 'surrogatepass')).hexdigest()
+
+class LRU(OrderedDict):
+    """OrderedDict that drops its least recently used entries beyond `max_entries`."""
+
+    def __init__(self, max_entries):
+        super().__init__()
+        self.max_entries = max_entries
+
+    def lookup(self, key):
+        value = self.get(key)
+        if value is not None:
+            self.move_to_end(key)
+        return value
+
+    def store(self, key, value):
+        self[key] = value
+        self.move_to_end(key)
+        while len(self) > self.max_entries:
+            self.popitem(last=False)
+
+class Snapshot:
+    """Lines of an analyzed source and the (start, start column, end, end column, segment key) of its top-level statements."""
+
+    __slots__ = ('lines', 'statements')
+
+    def __init__(self, lines, statements):
+        self.lines = lines
+        self.statements = statements
+
+class ParseCache:
+    """
+    Parsed syntax trees keyed by source content hash, kept in a bounded LRU
+    and optionally pickled under `disk_dir`, plus PyCEFR's level counts of
+    each top-level statement keyed by the hash of its exact text. The
+    statements of a file not seen before are analyzed together in one run of
+    `analyzer` (by default PyCEFREngine.analyze_sources), and a file's counts
+    are the sum of its statements' counts. Statements are only analyzed
+    when their counts are needed, so `analyze_change` runs PyCEFR on the
+    statements around the edit alone.
+
+    `analyze` also remembers the latest snapshot analyzed under a key (the
+    file path). The next snapshot of that path, or of its new path after a
+    rename, is compared with it: top-level statements in the unchanged
+    leading and trailing lines keep their counts, and only the lines in
+    between are parsed and analyzed. If those lines do not parse on their own
+    (the edit spans a statement boundary) the whole source is parsed.
+    """
+
+    def __init__(self, disk_dir=None, max_trees=parse_cache_size, max_segments=segment_cache_size, max_snapshots=snapshot_cache_size,
+                 analyzer=analyze_sources):
+        self.disk_dir = disk_dir
+        self.analyzer = analyzer
+        self.trees = LRU(max_trees)
+        self.segments = LRU(max_segments)
+        self.snapshots = LRU(max_snapshots)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.reused_statements = 0
+        self.visited_statements = 0
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.pickle")
+
+    def parse(self, source, key=None):
+        """Returns the syntax tree of `source`; raises SyntaxError or ValueError like ast.parse."""
+        key = key or source_hash(source)
+        tree = self.trees.lookup(key)
+        if tree is not None:
+            self.hits += 1
+            return tree
+
+        if self.disk_dir is not None and os.path.exists(self._disk_path(key)):
+            try:
+                with open(self._disk_path(key), 'rb') as tree_file:
+                    tree = pickle.load(tree_file)
+                self.disk_hits += 1
+            except (OSError, pickle.UnpicklingError, EOFError):
+                tree = None
+        if tree is None:
+            self.misses += 1
+            tree = ast.parse(source)
+            if self.disk_dir is not None:
+                self._write_tree(key, tree)
+        self.trees.store(key, tree)
+        return tree
+
+    def _write_tree(self, key, tree):
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary_path = f"{path}.{os.getpid()}.tmp"
+            with open(temporary_path, 'wb') as tree_file:
+                pickle.dump(tree, tree_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, path)
+        except (OSError, RecursionError) as e:
+            logger.warning(f"Failed to store parsed tree {key}: {e}")
+
+    def _statements(self, tree, lines, offset=0):
+        """Positions and segment keys of the top-level statements of `tree`, parsed from `lines` after `offset` lines."""
+        statements = []
+        for node in tree.body:
+            start, start_col, end, end_col = statement_position(node)
+            segment_key = source_hash(segment_text(lines, start + offset, start_col, end + offset, end_col))
+            statements.append((start + offset, start_col, end + offset, end_col, segment_key))
+        return statements
+
+    def _count(self, statements, lines, pycefr_dir):
+        """
+        Level counts of `statements` of `lines`. Segments analyzed before
+        reuse their counts, the others are analyzed in one batch.
+        """
+        known, pending = {}, {}
+        for start, start_col, end, end_col, segment_key in statements:
+            levels = self.segments.lookup(segment_key)
+            if levels is not None:
+                known[segment_key] = levels
+                self.reused_statements += 1
+            elif segment_key not in pending:
+                pending[segment_key] = segment_text(lines, start, start_col, end, end_col)
+        if pending:
+            for segment_key, levels in self.analyzer(pending, pycefr_dir).items():
+                # Segments parse on their own, so no result means PyCEFR found nothing to count in them
+                known[segment_key] = levels or {}
+                self.segments.store(segment_key, known[segment_key])
+            self.visited_statements += len(pending)
+        return [known[statement[4]] for statement in statements]
+
+    def _incremental(self, lines, previous):
+        """
+        Statements of `lines` reusing those of `previous` in the common leading
+        and trailing lines; None when the changed lines do not parse on their
+        own, even with the statements around them.
+        """
+        old_lines = previous.lines
+        limit = min(len(old_lines), len(lines))
+        prefix = 0
+        while prefix < limit and old_lines[prefix] == lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old_lines[-1 - suffix] == lines[-1 - suffix]:
+            suffix += 1
+
+        shift = len(lines) - len(old_lines)
+        statements = previous.statements
+        head_count = sum(1 for statement in statements if statement[2] <= prefix)
+        tail_count = sum(1 for statement in statements if statement[0] > len(old_lines) - suffix)
+
+        # The first try keeps every statement outside the changed lines; the second also re-parses the
+        # statements next to them, e.g. when lines were added at the end of the block of the one before
+        for widen in (0, 1):
+            head_count, tail_count = max(head_count - widen, 0), max(tail_count - widen, 0)
+            # Statements sharing a line with the gap are parsed with it
+            while head_count and head_count < len(statements) and statements[head_count][0] == statements[head_count - 1][2]:
+                head_count -= 1
+            while tail_count and tail_count < len(statements) and statements[-tail_count][0] == statements[-tail_count - 1][2]:
+                tail_count -= 1
+
+            head = statements[:head_count]
+            tail = [(start + shift, start_col, end + shift, end_col, segment_key)
+                    for start, start_col, end, end_col, segment_key in statements[len(statements) - tail_count:]]
+            gap_start = head[-1][2] if head else 0  # Last line before the gap
+            gap_end = tail[0][0] - 1 if tail else len(lines)  # Last line of the gap
+            try:
+                gap_tree = ast.parse(''.join(lines[gap_start:gap_end]))
+            except (SyntaxError, ValueError):
+                continue
+            return head + self._statements(gap_tree, lines, gap_start) + tail
+        return None
+
+    def _snapshot(self, source, key=None, previous_key=None):
+        """
+        Lines and top-level statements of `source`, or None if it does not
+        parse. With a `key` the snapshot is remembered under it; the snapshot
+        last remembered under `previous_key` (by default `key`) is the
+        predecessor whose unchanged statements are reused.
+        """
+        lines = source_lines(source)
+        previous = self.snapshots.lookup(previous_key or key) if (previous_key or key) is not None else None
+
+        statements = None
+        if previous is not None and previous.lines != lines:
+            statements = self._incremental(lines, previous)
+        elif previous is not None:
+            statements = previous.statements
+            self.hits += 1
+        if statements is None:
+            try:
+                statements = self._statements(self.parse(source), lines)
+            except (SyntaxError, ValueError):
+                return None
+
+        snapshot = Snapshot(lines, statements)
+        if key is not None:
+            self.snapshots.store(key, snapshot)
+        return snapshot
+
+    def analyze(self, source, key=None, previous_key=None, pycefr_dir=None):
+        """Returns the level counts of `source`, or None if it does not parse; `key` and `previous_key` as in `_snapshot`."""
+        snapshot = self._snapshot(source, key, previous_key)
+        return None if snapshot is None else sum_levels(self._count(snapshot.statements, snapshot.lines, pycefr_dir))
+
+    def analyze_change(self, before, after, hunks, pycefr_dir=None):
+        """
+        Returns the level counts of the top-level statements a diff touches
+        in the two versions of a file. `before` and `after` are (source, key,
+        previous_key) triples, None for a version the file does not have, and
+        `hunks` the diff between them (see PyCEFREngine.diff_hunks). Both
+        versions count the same code around the edit (see
+        PyCEFREngine.matching_statements), so the difference of the two
+        counts is the whole-file difference. A missing or unparsable version
+        counts as None.
+        """
+        snapshots = [None if version is None else self._snapshot(*version) for version in (before, after)]
+        lines = [snapshot.lines if snapshot else [] for snapshot in snapshots]
+        spans = [[(start, end) for start, _, end, _, _ in snapshot.statements] if snapshot else [] for snapshot in snapshots]
+        selected = matching_statements(lines[0], spans[0], lines[1], spans[1], hunks)
+        return tuple(None if snapshot is None else
+                     sum_levels(self._count([snapshot.statements[index] for index in indexes], snapshot.lines, pycefr_dir))
+                     for snapshot, indexes in zip(snapshots, selected))
+
+    def stats(self):
+        return {
+            'tree_hits': self.hits,
+            'tree_disk_hits': self.disk_hits,
+            'tree_misses': self.misses,
+            'reused_statements': self.reused_statements,
+            'visited_statements': self.visited_statements,
+        }
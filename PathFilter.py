@@ -0,0 +1,123 @@
+import os
+import subprocess
+import tempfile
+from fnmatch import fnmatchcase
+
+from pydriller import Git
+
+from RepoMirrorCache import remove_mirror
+
+WILDCARDS = '*?['
+
+class PathFilter:
+    """
+    Include/exclude patterns on repository paths, applied both by git (as
+    pathspecs, to skip commits touching no matching path before PyDriller
+    loads any diff) and per modified file.
+    Patterns follow git's default pathspec rules: `*` also matches `/`, so
+    '*.py' matches Python files at any depth, and a pattern without wildcards
+    matches that file or everything below that directory ('tests/', 'migrations').
+    """
+
+    def __init__(self, include=('*.py',), exclude=()):
+        self.include = list(include)
+        self.exclude = list(exclude)
+
+    def _match(self, path, pattern):
+        if any(character in pattern for character in WILDCARDS):
+            return fnmatchcase(path, pattern)
+        directory = pattern.rstrip('/')
+        return path == directory or path.startswith(f"{directory}/")
+
+    def matches(self, path):
+        """Whether a repository path (as in ModifiedFile.new_path/old_path) passes the filter."""
+        if path is None:
+            return False
+        path = path.replace('\\', '/')
+        return (any(self._match(path, pattern) for pattern in self.include)
+                and not any(self._match(path, pattern) for pattern in self.exclude))
+
+    def matches_file(self, modified_file):
+        """Whether a PyDriller ModifiedFile passes the filter, by its new path or, if deleted, its old path."""
+        return self.matches(modified_file.new_path or modified_file.old_path)
+
+    def pathspecs(self):
+        return [*self.include, *(f":(exclude){pattern}" for pattern in self.exclude)]
+
+    def commit_graph(self, repo_path, mined=()):
+        """
+        Lists (commit, parents) for the commits of a local repository that touch
+        a matching path, parents before children, leaving out `mined` commits
+        and their ancestors. Parents are rewritten to the nearest listed
+        ancestors. --full-history keeps side-branch commits that default
+        history simplification would drop.
+        """
+        result = subprocess.run(['git', '-C', repo_path, 'log', '--reverse', '--topo-order', '--full-history', '--parents', '--format=%H %P',
+                                 'HEAD', *(f"^{commit_hash}" for commit_hash in mined), '--', *self.pathspecs()],
+                                check=True, capture_output=True, text=True)
+        return [(hashes[0], hashes[1:]) for hashes in map(str.split, result.stdout.splitlines()) if hashes]
+
+    def commit_hashes(self, repo_path, mined=()):
+        """The commits of `commit_graph`, parents before children."""
+        return [commit_hash for commit_hash, _ in self.commit_graph(repo_path, mined)]
+
+# The filter the miners used before patterns were configurable
+PYTHON_FILES = PathFilter()
+
+class MinedFrontier:
+    """
+    The tips of the commits traversed so far: each traversed commit is a tip
+    or an ancestor of one. As the traversal lists parents before children,
+    excluding the tips and their ancestors resumes it exactly where it stopped,
+    whatever branches were merged in the meantime.
+    """
+
+    def __init__(self, tips=()):
+        self.tips = set(tips)
+
+    def add(self, commit_hash, parents):
+        self.tips.difference_update(parents)
+        self.tips.add(commit_hash)
+
+def traverse_matching_commits(source, path_filter=PYTHON_FILES, frontier=None):
+    """
+    Traverses the commits of `source` that touch a path of `path_filter`,
+    parents before children. With a `frontier` the commits it already holds
+    (and their ancestors) are skipped, and each commit is added to it when
+    yielded. git selects the commits, so PyDriller never loads the diffs of
+    the others. A remote URL is first cloned into a temporary bare
+    repository, removed once the traversal ends.
+    """
+    if not os.path.isdir(source):
+        return traverse_remote_commits(source, path_filter, frontier)
+    return traverse_local_commits(source, path_filter, frontier)
+
+def traverse_local_commits(repo_path, path_filter=PYTHON_FILES, frontier=None):
+    graph = path_filter.commit_graph(repo_path, frontier.tips if frontier is not None else ())
+    if not graph:
+        return
+    git = Git(repo_path)
+    try:
+        for commit_hash, parents in graph:
+            commit = git.get_commit(commit_hash)
+            # Added before the caller processes it: a checkpoint taken after processing includes it
+            if frontier is not None:
+                frontier.add(commit_hash, parents)
+            yield commit
+    finally:
+        git.clear()
+
+def traverse_remote_commits(repo_url, path_filter=PYTHON_FILES, frontier=None):
+    """
+    Clones `repo_url` and traverses it like a local repository. PyDriller's own
+    remote traversal with from_commit follows only the ancestry path from a
+    commit, missing side branches that forked before it and merged after it.
+    """
+    directory = tempfile.mkdtemp(prefix='traverse_')
+    try:
+        # Named after the repository, PyDriller derives the project name from the path
+        clone_path = os.path.join(directory, repo_url.rstrip('/').split('/')[-1].removesuffix('.git') or 'repo')
+        subprocess.run(['git', 'clone', '--quiet', '--bare', repo_url, clone_path], check=True)
+        yield from traverse_local_commits(clone_path, path_filter, frontier)
+    finally:
+        remove_mirror(directory)
@@ -1,78 +1,189 @@
 import pandas as pd
 import os
 import json
+import logging
 from collections import defaultdict
+from ColumnarStore import CompetencyParquetWriter, read_competency
+from SummaryWriter import JsonLinesSummaryWriter, write_summary
+from CompetencyStore import CompetencyStore, RollupStore
+from TrajectoryEngine import TrajectoryEngine
+from FileManifest import ManifestIndex, MANIFEST_NAME_PATTERN
+from RunProfiler import RunProfiler, configure_logging
 
-# Load the CSV file
+# Logging level and optional per-stage cProfile/tracemalloc capture; the run report goes to RunReports (see RunProfiler.py)
+log_level = 'INFO'
+profile_functions = False
+trace_memory = False
+
+logger = logging.getLogger('ProcessData')
+profiler = RunProfiler('ProcessData', cprofile=profile_functions, trace_memory=trace_memory)
+
+# Input: 'pycefr' reads PyCEFR's data.csv; 'parquet' reloads the competency dataset
+# written with output_format = 'parquet' (see ColumnarStore.py) to write it in
+# another format, reading only the summary columns of the projects in
+# input_projects (None for all) and of the commits since input_since
+input_format = 'pycefr'
+input_projects = None
+input_since = None  # e.g. datetime(2023, 1, 1)
+
+# PyCEFR's output CSV
 file_path = 'C:/Users/rujip/Desktop/SP2023-Greeedhub/pycefr/data.csv'  # Update this to your actual file path
-data = pd.read_csv(file_path)
-
-# Function to parse the file name and extract components
-def parse_filename(file_name):
-    parts = file_name.split('_')
-    commit_hash = parts[0]
-    project_name = parts[1]
-    author_id = parts[2]
-    author_date = parts[3]
-    author_time = parts[4]
-    commit_type = parts[5]  # "after" or "before"
-    return commit_hash, project_name, author_id, author_date, author_time, commit_type
-
-# Dictionary for scores
-scores_dict = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
-
-# Process each row in the DataFrame
-for index, row in data.iterrows():
-    commit_hash, project_name, author_id, author_date, author_time, commit_type = parse_filename(row['File Name'])
-    level = row['Level']
-    displacement = row['Displacement']
-    
-    # Update scores
-    scores_dict[(commit_hash, project_name, author_id, author_date, author_time)][commit_type][level] += displacement
+
+# Components packed into the file name by TrialPyDriller.format_filename
+FILENAME_COLUMNS = ['CommitHash', 'ProjectName', 'AuthorID', 'AuthorDate', 'AuthorTime', 'CommitType']
+COMMIT_KEY_COLUMNS = FILENAME_COLUMNS[:5]
+
+# File manifests written by TrialPyDriller, for files named <owner>.<name>.<file id>.py
+file_index = ManifestIndex('C:/Users/rujip/Desktop/SP2023-Greeedhub/FileManifest')
+
+# Function to split the file names into component columns in one vectorized pass.
+# Manifest file names are joined on their id instead of being split.
+def parse_filenames(file_names):
+    parts = file_names.str.split('_', n=len(FILENAME_COLUMNS), expand=True)
+    parts = parts.iloc[:, :len(FILENAME_COLUMNS)]
+    parts = parts.reindex(columns=range(len(FILENAME_COLUMNS)))
+    parts.columns = FILENAME_COLUMNS  # CommitType is "after" or "before"
+
+    manifest_names = file_names.str.extract(MANIFEST_NAME_PATTERN)
+    manifest_names = manifest_names[manifest_names['file_id'].notna()]
+    for key, group in manifest_names.groupby('key', sort=False):
+        columns = file_index.manifest(key).columns(group['file_id'].astype(int))
+        parts.loc[group.index, FILENAME_COLUMNS] = pd.DataFrame(columns, index=group.index)
+    return parts
+
+# Rebuilds the scores of the summaries stored in the competency dataset
+def stored_scores(competency):
+    scores = defaultdict(lambda: defaultdict(dict))
+    author_dates = pd.to_datetime(competency['AuthorDate'])
+    keys = zip(competency['CommitHash'], competency['ProjectName'].astype(str), competency['AuthorID'].astype(str),
+               author_dates.dt.strftime('%Y%m%d'), author_dates.dt.strftime('%H%M%S'))
+    for key, level, after, before in zip(keys, competency['Level'].astype(str), competency['After'].tolist(), competency['Before'].tolist()):
+        scores[key]['after'][level] = after
+        scores[key]['before'][level] = before
+    return scores
+
+# Sum the displacement per (commit, after/before, level) with a single groupby.
+# sort=False keeps first-appearance order, so commits and levels are emitted in the same order as before.
+def aggregate_scores(data):
+    components = parse_filenames(data['File Name'])
+    totals = pd.concat([components, data[['Level', 'Displacement']]], axis=1) \
+        .groupby(FILENAME_COLUMNS + ['Level'], sort=False, dropna=False)['Displacement'].sum()
+
+    # Dictionary for scores
+    scores = defaultdict(lambda: defaultdict(dict))
+
+    for key, displacement in zip(totals.index.tolist(), totals.tolist()):
+        commit_hash, project_name, author_id, author_date, author_time, commit_type, level = key
+        scores[(commit_hash, project_name, author_id, author_date, author_time)][commit_type][level] = displacement
+    return scores
+
+# Loads the input rows: PyCEFR's CSV or, for input_format = 'parquet', the competency dataset
+def load_input():
+    if input_format == 'parquet':
+        # Partition filters skip other projects' files, the date filter is pushed down to row groups
+        filters = []
+        if input_projects is not None:
+            filters.append(('ProjectName', 'in', list(input_projects)))
+        if input_since is not None:
+            filters.append(('AuthorDate', '>=', input_since))
+        return read_competency(columns=['CommitHash', 'ProjectName', 'AuthorID', 'AuthorDate', 'Level', 'After', 'Before'],
+                               filters=filters or None)
+    return pd.read_csv(file_path, usecols=['File Name', 'Level', 'Displacement'])
+
+# Output format: 'files' (one CSV and JSON per commit), 'jsonl' (one JSON Lines
+# file per project, see SummaryWriter.py), 'parquet' (see ColumnarStore.py)
+# or 'sqlite' (see CompetencyStore.py)
+output_format = 'files'
 
 # Base directory for output
 base_dir = 'C:/Users/rujip/Desktop/SP2023-Greeedhub/CompetencyScore'  # Update this to your desired output path
 csv_dir = os.path.join(base_dir, 'CSV')
 json_dir = os.path.join(base_dir, 'JSON')
 
-# Ensure base directories exist
-os.makedirs(csv_dir, exist_ok=True)
-os.makedirs(json_dir, exist_ok=True)
-
-# Process and write data for each commit
-for key, scores in scores_dict.items():
-    commit_hash, project_name, author_id, author_date, author_time = key
-    after_scores = scores['after']
-    before_scores = scores.get('before', {})
-    difference_scores = {level: after_scores.get(level, 0) - before_scores.get(level, 0) for level in set(after_scores) | set(before_scores)}
-
-    # File names
-    filename_suffix = f"{commit_hash}_summary_{author_date}_{author_time}"
-    csv_filename = os.path.join(csv_dir, project_name, author_id, f"{filename_suffix}.csv")
-    json_filename = os.path.join(json_dir, project_name, author_id, f"{filename_suffix}.json")
-    
-    # Ensure directories for files exist
-    os.makedirs(os.path.dirname(csv_filename), exist_ok=True)
-    os.makedirs(os.path.dirname(json_filename), exist_ok=True)
-    
-    # CSV data
-    csv_data = []
-    for level in difference_scores:
-        csv_data.append([commit_hash, project_name, author_id, author_date, author_time, level, after_scores.get(level, 0), before_scores.get(level, 0), difference_scores[level]])
-    pd.DataFrame(csv_data, columns=["CommitHash", "ProjectName", "AuthorID", "AuthorDateFormat", "AuthorTimeFormat", "Level", "After", "Before", "Difference"]).to_csv(csv_filename, index=False)
-    
-    # JSON data
-    json_data = {
-        "CommitHash": commit_hash,
-        "ProjectName": project_name,
-        "AuthorID": author_id,
-        "AuthorDateFormat": author_date,
-        "AuthorTimeFormat": author_time,
-        "Levels": {
-            "After": after_scores,
-            "Before": before_scores,
-            "Difference": difference_scores
-        }
-    }
-    with open(json_filename, 'w') as f_json:
-        json.dump(json_data, f_json, indent=4)
+# Keep monthly/weekly rollups per project and author for VisualizeCompOverTime (see CompetencyStore.RollupStore)
+maintain_rollups = True
+
+# Keep per-author rolling-window trajectories up to date (see TrajectoryEngine.py)
+maintain_trajectories = False
+
+def main():
+    configure_logging(log_level)
+    if output_format == 'parquet' and input_format == 'parquet':
+        raise ValueError("The competency dataset is already the input, choose another output_format")
+    with profiler.stage('load'):
+        data = load_input()
+        profiler.count('rows', len(data))
+    with profiler.stage('aggregate'):
+        scores_dict = stored_scores(data) if input_format == 'parquet' else aggregate_scores(data)
+
+    # Ensure base directories exist
+    os.makedirs(csv_dir, exist_ok=True)
+    os.makedirs(json_dir, exist_ok=True)
+
+    if output_format == 'parquet':
+        summary_writer = CompetencyParquetWriter()
+    elif output_format == 'jsonl':
+        summary_writer = JsonLinesSummaryWriter(base_dir, time_key='AuthorTimeFormat')
+    elif output_format == 'sqlite':
+        summary_writer = CompetencyStore(os.path.join(base_dir, 'competency.sqlite'))
+    else:
+        summary_writer = None
+
+    rollup_store = RollupStore(os.path.join(base_dir, 'rollups.sqlite')) if maintain_rollups else None
+    trajectory_engine = TrajectoryEngine.load(os.path.join(base_dir, 'trajectories.pickle')) if maintain_trajectories else None
+
+    # Process and write data for each commit
+    with profiler.stage('write'):
+        for key, scores in scores_dict.items():
+            commit_hash, project_name, author_id, author_date, author_time = key
+            profiler.count('commits')
+            after_scores = scores['after']
+            before_scores = scores.get('before', {})
+            difference_scores = {level: after_scores.get(level, 0) - before_scores.get(level, 0) for level in set(after_scores) | set(before_scores)}
+
+            if write_summary((commit_hash, project_name, author_id, author_date, author_time, after_scores, before_scores, difference_scores),
+                             summary_writer, rollup_store, trajectory_engine):
+                continue
+
+            # File names
+            filename_suffix = f"{commit_hash}_summary_{author_date}_{author_time}"
+            csv_filename = os.path.join(csv_dir, project_name, author_id, f"{filename_suffix}.csv")
+            json_filename = os.path.join(json_dir, project_name, author_id, f"{filename_suffix}.json")
+
+            # Ensure directories for files exist
+            os.makedirs(os.path.dirname(csv_filename), exist_ok=True)
+            os.makedirs(os.path.dirname(json_filename), exist_ok=True)
+
+            # CSV data
+            csv_data = []
+            for level in difference_scores:
+                csv_data.append([commit_hash, project_name, author_id, author_date, author_time, level, after_scores.get(level, 0), before_scores.get(level, 0), difference_scores[level]])
+            pd.DataFrame(csv_data, columns=["CommitHash", "ProjectName", "AuthorID", "AuthorDateFormat", "AuthorTimeFormat", "Level", "After", "Before", "Difference"]).to_csv(csv_filename, index=False)
+
+            # JSON data
+            json_data = {
+                "CommitHash": commit_hash,
+                "ProjectName": project_name,
+                "AuthorID": author_id,
+                "AuthorDateFormat": author_date,
+                "AuthorTimeFormat": author_time,
+                "Levels": {
+                    "After": after_scores,
+                    "Before": before_scores,
+                    "Difference": difference_scores
+                }
+            }
+            with open(json_filename, 'w') as f_json:
+                json.dump(json_data, f_json, indent=4)
+
+    if summary_writer is not None:
+        summary_writer.close()
+    if rollup_store is not None:
+        rollup_store.close()
+    if trajectory_engine is not None:
+        trajectory_engine.close()
+    logger.info(f"Summarized {len(scores_dict)} commits.")
+    profiler.write_report()
+
+if __name__ == "__main__":
+    main()
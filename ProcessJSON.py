@@ -1,13 +1,53 @@
 import json
 import csv
+import logging
 from collections import defaultdict
 from pathlib import Path
 import os
+from SummaryWriter import JsonLinesSummaryWriter, write_summary
+from CompetencyStore import CompetencyStore, RollupStore
+from TrajectoryEngine import TrajectoryEngine
+from ParallelIngest import ingest_json_files, loads_json
+from StreamingJSON import file_levels, iter_file_levels
+from FileManifest import ManifestIndex
+from RunProfiler import RunProfiler, configure_logging
 
 # Define the directories
 pycefr_dir = '/pycefr'  # Path to the PyCEFR scripts
 json_data_dir = os.path.join(pycefr_dir, 'DATA_JSON')  # Where JSON data is stored
 output_dir = '/CompetencyScore'
+file_manifest_dir = '/FileManifest'  # File manifests written by TrialPyDriller
+
+# Resolves analyzed file names (manifest ids or legacy names) to their metadata
+file_index = ManifestIndex(file_manifest_dir)
+
+# Output of generate_summary_files: 'files' (one CSV and JSON per commit),
+# 'jsonl' (one JSON Lines file per project, see SummaryWriter.py)
+# or 'sqlite' (see CompetencyStore.py)
+summary_output = 'files'
+summary_writer = None
+
+# Keep monthly/weekly rollups per project and author for VisualizeCompOverTime (see CompetencyStore.RollupStore)
+maintain_rollups = True
+rollup_store = None
+
+# Keep per-author rolling-window trajectories up to date (see TrajectoryEngine.py)
+maintain_trajectories = False
+trajectory_engine = None
+
+# Worker processes parsing the JSON files (1 processes them one by one)
+ingest_workers = 1
+
+# JSON files larger than this (bytes) are read incrementally instead of loaded whole
+streaming_threshold = 256 * 1024 ** 2
+
+# Logging level and optional per-stage cProfile/tracemalloc capture (see RunProfiler.py)
+log_level = 'INFO'
+profile_functions = False
+trace_memory = False
+
+logger = logging.getLogger('ProcessJSON')
+profiler = RunProfiler('ProcessJSON')
 
 # Ensure output directory exists
 Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -20,41 +60,86 @@ def process_json_files():
     for json_file in Path(json_data_dir).glob('*.json'):
         process_json_file(json_file)
 
+def process_json_files_parallel(read_workers=8, parse_workers=os.cpu_count()):
+    """
+    Processes the JSON files like `process_json_files`, reading them with a
+    thread pool and parsing them with a process pool. Summaries are written in
+    file name order, so the output does not depend on the worker counts.
+    Files larger than `streaming_threshold` are read incrementally by the
+    workers, like in `process_json_file`.
+    """
+    ingest_json_files(Path(json_data_dir).glob('*.json'), aggregate_json_bytes,
+                      lambda summary: generate_summary_files(*summary), read_workers, parse_workers,
+                      stream_parse=aggregate_json_stream, streaming_threshold=streaming_threshold)
+
+def aggregate_json_bytes(commit_hash, raw):
+    """Worker entry point of `process_json_files_parallel`: parses and aggregates one JSON file."""
+    data = loads_json(raw)
+    return aggregate_commit(commit_hash, file_levels(data.get(commit_hash, {})))
+
+def aggregate_json_stream(json_file):
+    """Worker entry point of `process_json_files_parallel` for large files, read incrementally."""
+    return aggregate_commit(json_file.stem, iter_file_levels(json_file, json_file.stem))
+
 def process_json_file(json_file):
     """
     Processes a single JSON file generated by PyCEFR to extract competency levels and 
     generate summary CSV and JSON files.
+    Files larger than `streaming_threshold` are read incrementally, one
+    analyzed file at a time, instead of being loaded whole.
     """
-    with open(json_file) as f:
-        data = json.load(f)
-
     commit_hash = json_file.stem
-    all_files_data = data.get(commit_hash, {})
-    
+    if os.path.getsize(json_file) > streaming_threshold:
+        summary = aggregate_commit(commit_hash, iter_file_levels(json_file, commit_hash))
+    else:
+        with open(json_file) as f:
+            data = json.load(f)
+        summary = aggregate_commit(commit_hash, file_levels(data.get(commit_hash, {})))
+    if summary is not None:
+        generate_summary_files(*summary)
+
+def aggregate_commit(commit_hash, levels_by_file):
+    """
+    Sums the levels of the before and after files of one commit, given as
+    (file_name, Levels) pairs. Returns the `generate_summary_files` arguments, or None when no file name
+    has the expected structure.
+    """
     after_sum, before_sum = defaultdict(int), defaultdict(int)
+    project_name = None
     
-    for file_name, file_content in all_files_data.items():
-        parts = file_name.split('_')
-        if len(parts) < 7:  # Adjusted for time format inclusion
-            print(f"Unexpected filename structure: {file_name}")
+    for file_name, levels in levels_by_file:
+        metadata = file_index.metadata(file_name)
+        if metadata is None:
+            logger.warning(f"Unexpected filename structure: {file_name}")
             continue
         
-        project_name, author_id, author_date_format, time_format, status = parts[1], parts[2], parts[3], parts[4], parts[5]
+        project_name, author_id, author_date_format, time_format, status = metadata
         
-        for level, score in file_content['Levels'].items():
+        for level, score in levels.items():
             if 'after' in status:
                 after_sum[level] += score
             elif 'before' in status:
                 before_sum[level] += score
     
+    if project_name is None:
+        return None
+
     diff = {level: after_sum[level] - before_sum.get(level, 0) for level in set(after_sum) | set(before_sum)}
     
-    generate_summary_files(commit_hash, project_name, author_id, author_date_format, time_format, after_sum, before_sum, diff)
+    return commit_hash, project_name, author_id, author_date_format, time_format, after_sum, before_sum, diff
 
 def generate_summary_files(commit_hash, project_name, author_id, author_date_format, time_format, after_sum, before_sum, diff):
     """
     Generates CSV and JSON summary files for competency levels, including time format.
+    When a `summary_writer` is set the summary goes to it instead.
+    The monthly/weekly rollups and the author trajectories are updated either
+    way when a `rollup_store` / `trajectory_engine` is set.
     """
+    profiler.count('commits')
+    if write_summary((commit_hash, project_name, author_id, author_date_format, time_format, after_sum, before_sum, diff),
+                     summary_writer, rollup_store, trajectory_engine):
+        return
+
     output_csv_dir = os.path.join(output_dir, 'CSV', project_name, author_id)
     output_json_dir = os.path.join(output_dir, 'JSON', project_name, author_id)
     Path(output_csv_dir).mkdir(parents=True, exist_ok=True)
@@ -87,5 +172,30 @@ def generate_summary_files(commit_hash, project_name, author_id, author_date_for
             }
         }, jsonfile, indent=4)
 
-# Call the process_json_files() function if you want to run it immediately
-process_json_files()
+# Call the process_json_files() function if you want to run it immediately.
+# Guarded so that the worker processes of the parallel mode can import this module.
+if __name__ == '__main__':
+    configure_logging(log_level)
+    profiler = RunProfiler('ProcessJSON', cprofile=profile_functions, trace_memory=trace_memory)
+    if summary_output == 'jsonl':
+        summary_writer = JsonLinesSummaryWriter(output_dir)
+    elif summary_output == 'sqlite':
+        summary_writer = CompetencyStore(os.path.join(output_dir, 'competency.sqlite'))
+    if maintain_rollups:
+        rollup_store = RollupStore(os.path.join(output_dir, 'rollups.sqlite'))
+    if maintain_trajectories:
+        trajectory_engine = TrajectoryEngine.load(os.path.join(output_dir, 'trajectories.pickle'))
+    try:
+        with profiler.stage('aggregation'):
+            if ingest_workers > 1:
+                process_json_files_parallel(parse_workers=ingest_workers)
+            else:
+                process_json_files()
+    finally:
+        if summary_writer is not None:
+            summary_writer.close()
+        if rollup_store is not None:
+            rollup_store.close()
+        if trajectory_engine is not None:
+            trajectory_engine.close()
+        profiler.write_report()
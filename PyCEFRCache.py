@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import time
+
+# Default location of the cache database and its disk budget
+cache_path = 'PyCEFRCache/pycefr_cache.sqlite'
+cache_budget = 2 * 1024 ** 3  # Bytes
+
+def content_hash(file_path):
+    """Hashes the content of a file, identical snapshots share the same key."""
+    with open(file_path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+def pycefr_version(pycefr_dir):
+    """Returns the commit of the PyCEFR checkout, results of other versions are not reused."""
+    try:
+        result = subprocess.run(['git', '-C', pycefr_dir, 'rev-parse', 'HEAD'],
+                                check=True, capture_output=True, text=True)
+        return result.stdout.strip()
+    except (subprocess.CalledProcessError, OSError):
+        return 'unknown'
+
+class PyCEFRCache:
+    """
+    Persistent cache of per-file PyCEFR level counts, keyed by file content hash
+    and PyCEFR version. Entries are evicted least recently used first once the
+    database uses more than `budget` bytes. The projects each content hash was seen
+    in are kept apart, so identical files shared by several projects stay cached
+    until no active project references them.
+    """
+
+    def __init__(self, path=cache_path, version='unknown', budget=cache_budget):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.version = version
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path)
+        # Lets evict() return freed pages to the file system (only takes effect on a new database)
+        self.connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS levels (
+                content_hash TEXT NOT NULL,
+                version TEXT NOT NULL,
+                project_name TEXT NOT NULL,
+                levels TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (content_hash, version)
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS levels_last_used ON levels (last_used)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS levels_project ON levels (project_name)")
+        has_members = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'level_projects'").fetchone()
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS level_projects (
+                content_hash TEXT NOT NULL,
+                project_name TEXT NOT NULL,
+                PRIMARY KEY (content_hash, project_name)
+            ) WITHOUT ROWID
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS level_projects_project ON level_projects (project_name)")
+        if not has_members:
+            # Caches written before the table existed only know the last project that stored each hash
+            self.connection.execute("INSERT OR IGNORE INTO level_projects SELECT content_hash, project_name FROM levels")
+        self.connection.commit()
+
+    def get(self, file_hash, project_name=None):
+        """
+        Returns the cached Levels of a content hash, or None on a miss.
+        On a hit the hash is recorded as used by `project_name`, if given.
+        """
+        row = self.connection.execute(
+            "SELECT levels FROM levels WHERE content_hash = ? AND version = ?",
+            (file_hash, self.version)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.connection.execute(
+            "UPDATE levels SET last_used = ? WHERE content_hash = ? AND version = ?",
+            (time.time(), file_hash, self.version))
+        if project_name is not None:
+            self._add_project(file_hash, project_name)
+        return json.loads(row[0])
+
+    def _add_project(self, file_hash, project_name):
+        self.connection.execute("INSERT OR IGNORE INTO level_projects VALUES (?, ?)", (file_hash, project_name))
+
+    def put(self, file_hash, project_name, levels):
+        """Stores the Levels of a content hash, used by `project_name`."""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO levels VALUES (?, ?, ?, ?, ?)",
+            (file_hash, self.version, project_name, json.dumps(levels), time.time()))
+        self._add_project(file_hash, project_name)
+
+    def size(self):
+        """Bytes used by the database, not counting free pages."""
+        (page_count,) = self.connection.execute("PRAGMA page_count").fetchone()
+        (free_pages,) = self.connection.execute("PRAGMA freelist_count").fetchone()
+        (page_size,) = self.connection.execute("PRAGMA page_size").fetchone()
+        return (page_count - free_pages) * page_size
+
+    def evict(self):
+        """
+        Drops least recently used entries until the database fits in `budget`
+        bytes. Returns the number removed.
+        """
+        removed = 0
+        while True:
+            used = self.size()
+            (count,) = self.connection.execute("SELECT COUNT(*) FROM levels").fetchone()
+            if used <= self.budget or count == 0:
+                break
+            # Rows in proportion to the excess; pages are freed unevenly, so this repeats until it fits
+            batch = max(1, int(count * (used - self.budget) / used))
+            self.connection.execute(
+                "DELETE FROM levels WHERE rowid IN (SELECT rowid FROM levels ORDER BY last_used LIMIT ?)",
+                (batch,))
+            self.connection.execute(
+                "DELETE FROM level_projects WHERE content_hash NOT IN (SELECT content_hash FROM levels)")
+            self.connection.commit()
+            removed += min(batch, count)
+        if removed:
+            # executescript steps the pragma to completion; execute would free a single page
+            self.connection.executescript("PRAGMA incremental_vacuum;")
+        return removed
+
+    def prune_projects(self, active_projects):
+        """
+        Forgets the projects that are not in `active_projects` and drops the
+        entries no remaining project uses. Returns the number of entries removed.
+        """
+        active_projects = list(active_projects)
+        placeholders = ', '.join('?' for _ in active_projects)
+        self.connection.execute(
+            f"DELETE FROM level_projects WHERE project_name NOT IN ({placeholders})", active_projects)
+        cursor = self.connection.execute(
+            "DELETE FROM levels WHERE content_hash NOT IN (SELECT content_hash FROM level_projects)")
+        self.connection.commit()
+        return cursor.rowcount
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
@@ -0,0 +1,398 @@
+import io
+import json
+import logging
+import os
+import runpy
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tokenize
+from bisect import bisect_left, bisect_right
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from multiprocessing.util import Finalize
+from pathlib import Path
+
+logger = logging.getLogger('PyCEFREngine')
+
+# Competency levels in ascending order
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+
+# PyCEFR reads and writes its files relative to the working directory, so one script runs at a time per process
+_run_lock = threading.RLock()
+
+def run_script(working_dir, script, *arguments):
+    """
+    Runs a PyCEFR script in this process, like `python <script> <arguments>`
+    started from `working_dir`. The modules it imports from the checkout are
+    unloaded afterwards, so no state carries over from one run to the next.
+    Raises RuntimeError when the script exits with an error status.
+    """
+    working_dir = os.path.abspath(working_dir)
+    with _run_lock:
+        original_dir, original_argv, original_path = os.getcwd(), sys.argv, list(sys.path)
+        loaded_modules = set(sys.modules)
+        os.chdir(working_dir)
+        sys.argv = [script, *arguments]
+        sys.path.insert(0, working_dir)
+        try:
+            runpy.run_path(script, run_name='__main__')
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                raise RuntimeError(f"{script} exited with status {e.code}") from e
+        finally:
+            os.chdir(original_dir)
+            sys.argv = original_argv
+            sys.path[:] = original_path
+            for name in set(sys.modules) - loaded_modules:
+                module_file = getattr(sys.modules[name], '__file__', None) or ''
+                if os.path.abspath(module_file).startswith(working_dir + os.sep):
+                    del sys.modules[name]
+
+@lru_cache(maxsize=None)
+def _prepare_pycefr(pycefr_dir, pid):
+    working_dir = tempfile.mkdtemp(prefix='pycefr_')
+    Finalize(None, shutil.rmtree, args=(working_dir, True), exitpriority=0)
+    shutil.copytree(pycefr_dir, working_dir, dirs_exist_ok=True,
+                    ignore=shutil.ignore_patterns('.git', 'DATA_JSON', 'data.csv'))
+    run_script(working_dir, 'dict.py')
+    return working_dir
+
+def prepare_pycefr(pycefr_dir):
+    """
+    Copies the PyCEFR checkout to a scratch directory of this process, where
+    its outputs cannot collide with those of other processes, and builds the
+    level dictionary there by running dict.py, once per process.
+    Returns the scratch directory, removed when the process exits.
+    """
+    # Keyed by process, so workers forked after the parent prepared its copy make their own
+    return _prepare_pycefr(os.path.abspath(pycefr_dir), os.getpid())
+
+def read_levels(json_dir):
+    """
+    Levels of each file in PyCEFR's DATA_JSON files, by file name without
+    extension. Levels PyCEFR leaves out are filled in with 0.
+    """
+    levels = {}
+    for json_file in Path(json_dir).glob('*.json'):
+        with open(json_file) as f:
+            pending = [json.load(f)]
+        while pending:
+            entries = pending.pop()
+            for name, content in entries.items():
+                if not isinstance(content, dict):
+                    continue
+                if 'Levels' in content:
+                    levels[Path(name).stem] = {**dict.fromkeys(LEVELS, 0), **content['Levels']}
+                else:
+                    pending.append(content)
+    return levels
+
+def _run_pycerfl(pycefr_dir, sources):
+    """
+    Runs pycerfl.py once over `sources` (a list of source texts); returns the
+    Levels by list index. pycerfl.py is a script without an API returning its
+    results: it takes its input from files and reports only in DATA_JSON. So
+    the sources are still written to a Sources directory and the levels read
+    back from DATA_JSON, in this process's scratch copy of the checkout; what
+    running in-process saves is the interpreter start-up and the imports.
+    Runs in one process are serialized by `_run_lock`; parallelism comes
+    from processes, each with its own copy.
+    """
+    working_dir = prepare_pycefr(pycefr_dir)
+    sources_dir = os.path.join(working_dir, 'Sources')
+    with _run_lock:
+        for output in ('DATA_JSON', 'Sources'):
+            shutil.rmtree(os.path.join(working_dir, output), ignore_errors=True)
+        if os.path.exists(os.path.join(working_dir, 'data.csv')):
+            os.remove(os.path.join(working_dir, 'data.csv'))
+        os.makedirs(sources_dir)
+        for index, source in enumerate(sources):
+            # Written like TrialPyDriller.write_code_to_file, so PyCEFR reads the same bytes as in a snapshot
+            with open(os.path.join(sources_dir, f"{index}.py"), 'wb') as file:
+                file.write(source.encode('utf-8', 'surrogatepass'))
+        run_script(working_dir, 'pycerfl.py', 'directory', sources_dir)
+        return read_levels(os.path.join(working_dir, 'DATA_JSON'))
+
+def analyze_sources(sources, pycefr_dir):
+    """
+    Runs PyCEFR's own analysis (pycerfl.py in `directory` mode) in this
+    process over `sources`, a mapping of names to source text. Returns the
+    Levels PyCEFR reports for each name, or None for sources it gave no
+    result for. A failed run is retried source by source, so a source that
+    breaks PyCEFR only loses its own result.
+    """
+    if not sources:
+        return {}
+    names = list(sources)
+    try:
+        levels = _run_pycerfl(pycefr_dir, [sources[name] for name in names])
+    except Exception as e:
+        if len(names) == 1:
+            logger.warning(f"PyCEFR failed on {names[0]}: {e}")
+            return {names[0]: None}
+        logger.warning(f"PyCEFR failed on a batch of {len(names)} sources ({e}), analyzing them one by one")
+        results = {}
+        for name in names:
+            results.update(analyze_sources({name: sources[name]}, pycefr_dir))
+        return results
+    return {name: levels.get(str(index)) for index, name in enumerate(names)}
+
+def analyze_source(source, pycefr_dir):
+    """Returns PyCEFR's level counts of Python source text, or None if it gives no result."""
+    return analyze_sources({'source': source}, pycefr_dir)['source']
+
+def sum_levels(levels_list):
+    """Adds up level counts, e.g. those of the statements of a file."""
+    total = dict.fromkeys(LEVELS, 0)
+    for levels in levels_list:
+        for level, count in levels.items():
+            total[level] = total.get(level, 0) + count
+    return total
+
+def statement_span(node):
+    """First and last line of a top-level statement, including its decorators."""
+    return min([node.lineno] + [decorator.lineno for decorator in getattr(node, 'decorator_list', [])]), node.end_lineno
+
+def statement_position(node):
+    """
+    (start line, start column, end line, end column) of a top-level statement,
+    including its decorators. Statements sharing a line (`import os; import sys`)
+    get only their own columns, which the parser gives as UTF-8 byte offsets.
+    """
+    start, end = statement_span(node)
+    # A decorated statement is compound, so it starts at the beginning of its line
+    start_col = 0 if getattr(node, 'decorator_list', None) else node.col_offset
+    return start, start_col, end, node.end_col_offset
+
+def segment_text(lines, start, start_col, end, end_col):
+    """Text of `lines` from a (line, UTF-8 byte column) position to another, like ast.get_source_segment."""
+    first = lines[start - 1].encode('utf-8', 'surrogatepass')
+    if start == end:
+        return first[start_col:end_col].decode('utf-8', 'surrogatepass')
+    last = lines[end - 1].encode('utf-8', 'surrogatepass')
+    return (first[start_col:].decode('utf-8', 'surrogatepass') + ''.join(lines[start:end - 1])
+            + last[:end_col].decode('utf-8', 'surrogatepass'))
+
+def source_lines(source):
+    """Lines of `source` as the parser numbers them (str.splitlines also breaks on form feeds and other separators)."""
+    return io.StringIO(source, newline='').readlines()
+
+def enclosing_statements(spans, lines):
+    """Indexes of the (start, end) statement spans containing at least one of the sorted line numbers."""
+    return [index for index, (start, end) in enumerate(spans) if bisect_right(lines, end) > bisect_left(lines, start)]
+
+def code_lines(lines, start, end):
+    """
+    Numbers of the lines from `start` to `end` holding code, i.e. not blank
+    or comment-only; the range must begin at a statement. None if it cannot
+    be tokenized.
+    """
+    ignored = (tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER)
+    numbers = set()
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(''.join(lines[start - 1:end])).readline):
+            if token.type not in ignored:
+                numbers.update(range(token.start[0] + start - 1, token.end[0] + start))
+    except (tokenize.TokenError, SyntaxError):
+        return None
+    return numbers
+
+def drop_non_code_lines(lines, spans, changed):
+    """
+    Removes the blank and comment-only lines from the sorted `changed` line
+    numbers of a source split into `lines`, whose top-level statements span
+    `spans`. Only the statements around lines that look like neither code
+    nor strings are tokenized, to tell them from lines inside multi-line strings.
+    """
+    suspect = [line for line in changed
+               if line > len(lines) or lines[line - 1].lstrip().startswith('#') or not lines[line - 1].strip()]
+    if not suspect:
+        return changed
+    dropped = set(suspect)
+    for index in enclosing_statements(spans, suspect):
+        start, end = spans[index]
+        inside = [line for line in suspect if start <= line <= end]
+        code = code_lines(lines, start, end)
+        dropped.difference_update(inside if code is None else code)
+    return [line for line in changed if line not in dropped]
+
+def diff_hunks(diff_parsed):
+    """
+    Rebuilds the hunks of PyDriller's `diff_parsed` as (old start, old end,
+    new start, new end) line ranges. A side without lines ends one line
+    before it starts: a pure insertion goes before old line `old start`, a
+    pure deletion before new line `new start`.
+    """
+    deleted = sorted(line_number for line_number, _ in diff_parsed.get('deleted', []))
+    added = sorted(line_number for line_number, _ in diff_parsed.get('added', []))
+    hunks, offset, next_deleted, next_added = [], 0, 0, 0
+    while next_deleted < len(deleted) or next_added < len(added):
+        # The old line of the next change: a deleted line, or the one the next added line goes before
+        old_start = min(deleted[next_deleted] if next_deleted < len(deleted) else float('inf'),
+                        added[next_added] - offset if next_added < len(added) else float('inf'))
+        old_end = old_start - 1
+        while next_deleted < len(deleted) and deleted[next_deleted] == old_end + 1:
+            old_end, next_deleted = old_end + 1, next_deleted + 1
+        new_start = old_start + offset
+        new_end = new_start - 1
+        while next_added < len(added) and added[next_added] == new_end + 1:
+            new_end, next_added = new_end + 1, next_added + 1
+        hunks.append((old_start, old_end, new_start, new_end))
+        offset += (new_end - new_start) - (old_end - old_start)
+    return hunks
+
+def matching_statements(old_lines, old_spans, new_lines, new_spans, hunks):
+    """
+    Indexes of the top-level statements to count in the old and the new
+    version of a file changed by `hunks` (see `diff_hunks`), whose statements
+    span `old_spans` and `new_spans`. The statements enclosing changed code
+    lines are selected first; then, until nothing is added, each selected
+    statement selects on the other side the statements holding its unchanged
+    lines. Pure insertions and deletions thus select the statement around
+    them on both sides, and the statements left out are the same in both
+    versions. Hunks changing only blank and comment lines are ignored.
+    """
+    old_ends = [old_end for _, old_end, _, _ in hunks]
+    new_ends = [new_end for _, _, _, new_end in hunks]
+    offsets = [0]
+    for old_start, old_end, new_start, new_end in hunks:
+        offsets.append(offsets[-1] + (new_end - new_start) - (old_end - old_start))
+
+    changed = (set(), set())
+    regions = (set(), set())
+    for old_start, old_end, new_start, new_end in hunks:
+        old_changed, new_changed = range(old_start, old_end + 1), range(new_start, new_end + 1)
+        changed[0].update(old_changed)
+        changed[1].update(new_changed)
+        old_code = drop_non_code_lines(old_lines, old_spans, list(old_changed))
+        new_code = drop_non_code_lines(new_lines, new_spans, list(new_changed))
+        if old_code or new_code:
+            regions[0].update(old_code)
+            regions[1].update(new_code)
+
+    def other_side(side, line):
+        """The line of the other version an unchanged line of `side` is."""
+        if side == 0:
+            return line + offsets[bisect_left(old_ends, line)]
+        return line - offsets[bisect_left(new_ends, line)]
+
+    spans = (old_spans, new_spans)
+    expanded = (set(), set())
+    while True:
+        selected = tuple(enclosing_statements(spans[side], sorted(regions[side])) for side in (0, 1))
+        pending = [(side, index) for side in (0, 1) for index in selected[side] if index not in expanded[side]]
+        if not pending:
+            return selected
+        for side, index in pending:
+            expanded[side].add(index)
+            start, end = spans[side][index]
+            regions[1 - side].update(other_side(side, line) for line in range(start, end + 1) if line not in changed[side])
+
+def read_source(file_path):
+    """Returns the text of a Python file, or None if it cannot be read."""
+    try:
+        with open(file_path, encoding='utf-8') as file:
+            return file.read()
+    except (OSError, UnicodeDecodeError) as e:
+        logger.warning(f"Failed to read {file_path}: {e}")
+        return None
+
+def analyze_file(file_path, pycefr_dir):
+    """Returns PyCEFR's level counts of a Python file, or None if it cannot be analyzed."""
+    source = read_source(file_path)
+    return None if source is None else analyze_source(source, pycefr_dir)
+
+def find_shards(directory):
+    """
+    Lists the directories that directly contain Python files, i.e. the
+    <author_id>/<commit> directories of the PythonFiles layout.
+    """
+    shards = []
+    for current_dir, _, file_names in os.walk(directory):
+        if any(file_name.endswith('.py') for file_name in file_names):
+            shards.append(current_dir)
+    return sorted(shards)
+
+def analyze_shard(shard_directory, pycefr_dir, file_names=None):
+    """
+    Analyzes the Python files directly inside one shard directory, or only
+    `file_names` among them, with a single PyCEFR run. Returns the shard, its
+    files in the DATA_JSON shape and the time taken.
+    """
+    started = time.perf_counter()
+    if file_names is None:
+        file_names = [file_name for file_name in os.listdir(shard_directory) if file_name.endswith('.py')]
+    sources = {}
+    for file_name in sorted(file_names):
+        source = read_source(os.path.join(shard_directory, file_name))
+        if source is not None:
+            sources[file_name] = source
+
+    files = {}
+    for file_name, levels in analyze_sources(sources, pycefr_dir).items():
+        if levels is None:
+            logger.warning(f"Skipping file that could not be analyzed: {os.path.join(shard_directory, file_name)}")
+            continue
+        files[file_name] = {'Levels': levels}
+    return shard_directory, files, time.perf_counter() - started
+
+def analyze_directory(directory, pycefr_dir):
+    """
+    Analyzes every Python file under `directory`, one PyCEFR run per shard.
+    Returns results grouped by parent directory (the commit directory of the
+    PythonFiles layout) in the shape of PyCEFR's DATA_JSON output:
+    {group: {file_name: {'Levels': {...}}}}.
+    """
+    results = {}
+    for shard_directory in find_shards(directory):
+        _, files, _ = analyze_shard(shard_directory, pycefr_dir)
+        results.setdefault(os.path.basename(shard_directory), {}).update(files)
+    return results
+
+def analyze_directory_sharded(directory, pycefr_dir, workers=os.cpu_count(), max_in_flight=None, shards=None):
+    """
+    Analyzes `directory` like `analyze_directory`, with one shard per commit
+    directory spread over `workers` processes. `shards` may instead map shard
+    directories to the file names to analyze in them. At most `max_in_flight`
+    shards (default: twice the workers) are queued at a time. Progress and
+    per-shard timings are logged; the merged results use the DATA_JSON shape.
+    """
+    if shards is None:
+        shards = dict.fromkeys(find_shards(directory))
+    max_in_flight = max_in_flight or 2 * workers
+    results = {}
+    timings = []
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        remaining = iter(shards)
+        done_count = 0
+
+        while True:
+            for shard_directory in remaining:
+                pending.add(executor.submit(analyze_shard, shard_directory, pycefr_dir, shards[shard_directory]))
+                if len(pending) >= max_in_flight:
+                    break
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                shard_directory, files, elapsed = future.result()
+                done_count += 1
+                timings.append((elapsed, shard_directory, len(files)))
+                results.setdefault(os.path.basename(shard_directory), {}).update(files)
+                logger.debug(f"[{done_count}/{len(shards)}] {shard_directory}: {len(files)} files in {elapsed:.2f}s")
+
+    total = time.perf_counter() - started
+    analyzed = sum(file_count for _, _, file_count in timings)
+    logger.info(f"Analyzed {analyzed} files in {len(shards)} shards with {workers} workers in {total:.2f}s")
+    for elapsed, shard_directory, file_count in sorted(timings, reverse=True)[:5]:
+        logger.info(f"  slowest shard {shard_directory}: {file_count} files in {elapsed:.2f}s")
+
+    # Merge order does not depend on completion order
+    return {group: dict(sorted(files.items())) for group, files in sorted(results.items())}
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import stat
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+logger = logging.getLogger('RepoMirrorCache')
+
+# Location and disk budget of the mirror cache
+mirror_cache_dir = 'RepoMirrors'
+mirror_cache_budget = 50 * 1024 ** 3  # Bytes
+
+# Never touch the network; only existing mirrors and local repositories are used.
+# Set MINING_OFFLINE=1 in air-gapped environments.
+offline_mode = os.environ.get('MINING_OFFLINE', '') == '1'
+
+def repository_name(repo_url):
+    """
+    Name of a repository as PyDriller reports it when cloning `repo_url`:
+    the last path component without '.git'. Mirrors are named differently
+    (see `mirror_name`), so rows mined from one take their project name from here.
+    """
+    name = repo_url.rstrip('/\\').replace('\\', '/').split('/')[-1]
+    return name[:-len('.git')] if name.endswith('.git') else name
+
+def mirror_name(repo_url):
+    """Directory name of a repository mirror: readable name plus a hash of the URL."""
+    name = re.sub(r'[^A-Za-z0-9._-]+', '_', repo_url.rstrip('/').split('/')[-1]) or 'repo'
+    return f"{name}_{hashlib.sha1(repo_url.encode()).hexdigest()[:10]}"
+
+def directory_size(path):
+    """Total size in bytes of the files under `path`."""
+    total = 0
+    for current_dir, _, file_names in os.walk(path):
+        for file_name in file_names:
+            try:
+                total += os.path.getsize(os.path.join(current_dir, file_name))
+            except OSError:
+                pass
+    return total
+
+def lock_file(file, blocking=True):
+    """
+    Takes an exclusive lock on an open file, held until `unlock_file` or until
+    the process exits. Returns False when `blocking` is off and the lock is held elsewhere.
+    """
+    if os.name == 'nt':
+        file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(0.05)
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+def unlock_file(file):
+    if os.name == 'nt':
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+@contextmanager
+def locked(path):
+    """Holds an exclusive lock on `path` (created if missing), across threads and processes."""
+    with open(path, 'a+b') as file:
+        lock_file(file)
+        try:
+            yield
+        finally:
+            unlock_file(file)
+
+def users_directory(cache_dir, name):
+    """Directory holding one locked file per job currently using a mirror."""
+    return os.path.join(cache_dir, f"{name}.users")
+
+def register_user(cache_dir, name):
+    """
+    Marks a mirror as in use until `release_user` or the end of the process.
+    Called with the index lock held, so eviction never races it.
+    """
+    directory = users_directory(cache_dir, name)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, path = tempfile.mkstemp(prefix=f"{os.getpid()}_", dir=directory)
+    user = os.fdopen(descriptor, 'r+b')
+    lock_file(user)
+    return user, path
+
+def release_user(user):
+    file, path = user
+    unlock_file(file)
+    file.close()
+    try:
+        os.remove(path)
+    except OSError:
+        pass  # Left for `mirror_in_use` to clean up
+
+def mirror_in_use(cache_dir, name):
+    """Whether a job holds the mirror; files left by jobs that died are removed."""
+    directory = users_directory(cache_dir, name)
+    if not os.path.isdir(directory):
+        return False
+    in_use = False
+    for file_name in os.listdir(directory):
+        path = os.path.join(directory, file_name)
+        try:
+            with open(path, 'r+b') as user:
+                if not lock_file(user, blocking=False):
+                    in_use = True
+                    continue
+                unlock_file(user)
+            os.remove(path)
+        except OSError:
+            in_use = True  # Being created or released right now
+    return in_use
+
+def load_index(cache_dir):
+    index_path = os.path.join(cache_dir, 'index.json')
+    if not os.path.exists(index_path):
+        return {}
+    with open(index_path, encoding='utf-8') as index_file:
+        return json.load(index_file)
+
+def save_index(cache_dir, index):
+    index_path = os.path.join(cache_dir, 'index.json')
+    temporary_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary_path, 'w', encoding='utf-8') as index_file:
+        json.dump(index, index_file, indent=4)
+    os.replace(temporary_path, index_path)
+
+def remove_mirror(path):
+    """Deletes a mirror, clearing the read-only flag git sets on pack files."""
+    def onerror(func, failed_path, exc_info):
+        os.chmod(failed_path, stat.S_IWUSR)
+        func(failed_path)
+
+    if os.path.exists(path):
+        shutil.rmtree(path, onerror=onerror)
+
+def evict_mirrors(cache_dir, index, budget, keep):
+    """
+    Removes least recently used mirrors until the cache fits in `budget`,
+    never `keep` nor a mirror another job is mining from. Called with the index lock held.
+    """
+    total = sum(entry['size'] for entry in index.values())
+    for repo_url, entry in sorted(index.items(), key=lambda item: item[1]['last_used']):
+        if total <= budget:
+            break
+        if repo_url == keep or mirror_in_use(cache_dir, entry['name']):
+            continue
+        logger.info(f"Evicting mirror of {repo_url} ({entry['size'] / 1024 ** 2:.0f} MB)")
+        remove_mirror(os.path.join(cache_dir, entry['name']))
+        shutil.rmtree(users_directory(cache_dir, entry['name']), ignore_errors=True)
+        total -= entry['size']
+        del index[repo_url]
+
+def cached_mirror(repo_url, cache_dir=mirror_cache_dir):
+    """Path of the existing mirror of `repo_url`, or None."""
+    path = os.path.join(cache_dir, mirror_name(repo_url))
+    return path if os.path.isdir(path) else None
+
+@contextmanager
+def use_mirror(repo_url, cache_dir=mirror_cache_dir, budget=mirror_cache_budget, offline=None):
+    """
+    Yields a local path to mine `repo_url` from, like `get_mirror`, and keeps
+    the mirror from being evicted by other jobs until the block exits.
+    """
+    if os.path.isdir(repo_url):
+        yield repo_url
+        return
+
+    offline = offline_mode if offline is None else offline
+    os.makedirs(cache_dir, exist_ok=True)
+    index_lock = os.path.join(cache_dir, 'index.lock')
+    name = mirror_name(repo_url)
+    path = os.path.join(cache_dir, name)
+
+    with locked(index_lock):
+        user = register_user(cache_dir, name)
+    try:
+        # One clone or fetch per mirror at a time; other mirrors are not blocked
+        with locked(os.path.join(cache_dir, f"{name}.lock")):
+            if os.path.isdir(path):
+                if not offline:
+                    try:
+                        subprocess.run(['git', '-C', path, 'fetch', '--quiet', '--prune'], check=True)
+                    except subprocess.CalledProcessError as e:
+                        logger.warning(f"Fetching {repo_url} failed, using the cached mirror: {e}")
+            elif offline:
+                raise RuntimeError(f"No cached mirror of {repo_url} and offline mode is enabled")
+            else:
+                logger.info(f"Creating mirror of {repo_url}...")
+                subprocess.run(['git', 'clone', '--quiet', '--mirror', repo_url, path], check=True)
+            size = directory_size(path)
+
+        with locked(index_lock):
+            index = load_index(cache_dir)
+            index[repo_url] = {'name': name, 'last_used': time.time(), 'size': size}
+            evict_mirrors(cache_dir, index, budget, keep=repo_url)
+            save_index(cache_dir, index)
+        yield path
+    finally:
+        release_user(user)
+
+def get_mirror(repo_url, cache_dir=mirror_cache_dir, budget=mirror_cache_budget, offline=None):
+    """
+    Returns a local path to mine `repo_url` from.
+    A local repository path is returned as is. Otherwise a bare mirror is kept
+    per URL: cloned once, then brought up to date with a fetch. When offline
+    (or when the fetch fails) an existing mirror is used as it is.
+    The mirror is not protected from eviction afterwards; jobs mining from it
+    use `use_mirror` instead.
+    """
+    with use_mirror(repo_url, cache_dir, budget, offline) as path:
+        return path
@@ -0,0 +1,167 @@
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# Where the run reports (and cProfile dumps) are written
+report_dir = 'RunReports'
+
+# Functions listed per profiled stage in the human summary
+profile_top_functions = 15
+
+LOG_FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+
+def configure_logging(level='INFO'):
+    """
+    Sets up leveled logging for a script run. Per-commit and per-file messages
+    are logged at DEBUG, progress and summaries at INFO, problems at WARNING.
+    """
+    logging.basicConfig(level=getattr(logging, str(level).upper(), logging.INFO), format=LOG_FORMAT)
+
+class StageStats:
+    """Accumulated time, calls, counters and (optionally) profile and memory peak of one stage."""
+
+    __slots__ = ('seconds', 'calls', 'counters', 'profile', 'peak_memory')
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self.counters = {}
+        self.profile = None
+        self.peak_memory = None
+
+class RunProfiler:
+    """
+    Per-stage timers and counters for one script run.
+
+        with profiler.stage('mine'):
+            ...
+            profiler.count('commits')
+
+    A stage entered several times accumulates its time; stages may nest, and
+    counts go to the innermost open stage. With `cprofile` each outermost
+    stage runs under cProfile (nested stages are part of their parent's
+    profile, cProfile cannot run twice at once); with `trace_memory` the peak
+    traced allocation of each stage is recorded. `write_report` ends the run
+    with a JSON report and a logged summary with rates per second.
+    """
+
+    def __init__(self, name, cprofile=False, trace_memory=False, directory=report_dir):
+        self.name = name
+        self.cprofile = cprofile
+        self.trace_memory = trace_memory
+        self.directory = directory
+        self.started = time.perf_counter()
+        self.stages = {}
+        self._open = []  # [stage name, peak memory seen so far], innermost last
+        self._profiling = False
+        self.logger = logging.getLogger(name)
+
+    def _stats(self, name):
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        return stats
+
+    @contextmanager
+    def stage(self, name):
+        stats = self._stats(name)
+        profile = None
+        if self.cprofile and not self._profiling:
+            profile = stats.profile = stats.profile or cProfile.Profile()
+            self._profiling = True
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            if self._open:
+                self._open[-1][1] = max(self._open[-1][1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self._open.append([name, 0])
+
+        started = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield stats
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._profiling = False
+            stats.seconds += time.perf_counter() - started
+            stats.calls += 1
+            _, peak = self._open.pop()
+            if self.trace_memory:
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                stats.peak_memory = max(stats.peak_memory or 0, peak)
+                # The parent stage saw at least this stage's peak
+                if self._open:
+                    self._open[-1][1] = max(self._open[-1][1], peak)
+                tracemalloc.reset_peak()
+
+    def count(self, counter, amount=1, stage=None):
+        """Adds `amount` to a counter of `stage`, by default the innermost open stage."""
+        stats = self._stats(stage or (self._open[-1][0] if self._open else 'run'))
+        stats.counters[counter] = stats.counters.get(counter, 0) + amount
+
+    def report(self):
+        """The run as a JSON-serializable dictionary."""
+        stages = {}
+        for name, stats in self.stages.items():
+            stages[name] = {
+                'seconds': round(stats.seconds, 6),
+                'calls': stats.calls,
+                'counters': dict(stats.counters),
+                'rates': {counter: round(value / stats.seconds, 3) for counter, value in stats.counters.items() if stats.seconds > 0},
+            }
+            if stats.peak_memory is not None:
+                stages[name]['peak_memory_bytes'] = stats.peak_memory
+        return {
+            'name': self.name,
+            'finished': datetime.now().isoformat(timespec='seconds'),
+            'total_seconds': round(time.perf_counter() - self.started, 6),
+            'stages': stages,
+        }
+
+    def summary(self, report=None):
+        """Human-readable table of a report."""
+        report = report or self.report()
+        lines = [f"{self.name}: {report['total_seconds']:.2f}s",
+                 f"{'Stage':<24}{'Calls':>8}{'Seconds':>11}  Counters"]
+        for name, stage in sorted(report['stages'].items(), key=lambda item: item[1]['seconds'], reverse=True):
+            counters = ', '.join(f"{counter} {value:,} ({stage['rates'][counter]:,.1f}/s)" if counter in stage['rates']
+                                 else f"{counter} {value:,}" for counter, value in stage['counters'].items())
+            if 'peak_memory_bytes' in stage:
+                counters += f"{', ' if counters else ''}peak memory {stage['peak_memory_bytes'] / 1024 ** 2:,.1f} MB"
+            lines.append(f"{name:<24}{stage['calls']:>8}{stage['seconds']:>11.3f}  {counters}")
+        return '\n'.join(lines)
+
+    def write_report(self):
+        """
+        Writes <report_dir>/<name>_<timestamp>.json (and a .prof file per
+        profiled stage, readable with pstats or snakeviz), logs the summary
+        and returns the report path.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        base_path = os.path.join(self.directory, f"{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        report = self.report()
+
+        for name, stats in self.stages.items():
+            if stats.profile is None:
+                continue
+            profile_path = f"{base_path}_{name}.prof"
+            stats.profile.dump_stats(profile_path)
+            report['stages'][name]['profile'] = profile_path
+            text = io.StringIO()
+            pstats.Stats(stats.profile, stream=text).sort_stats('cumulative').print_stats(profile_top_functions)
+            self.logger.debug("Profile of stage %s:\n%s", name, text.getvalue())
+
+        with open(f"{base_path}.json", 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=4)
+        self.logger.info("%s\nReport written to %s.json", self.summary(report), base_path)
+        return f"{base_path}.json"
@@ -0,0 +1,109 @@
+import json
+from json.decoder import scanstring
+
+# Characters read from the file at a time
+read_size = 1024 * 1024
+
+WHITESPACE = ' \t\n\r'
+
+class _Scanner:
+    """Buffered character scanner over a text file, keeping only the unread part in memory."""
+
+    def __init__(self, file):
+        self.file = file
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.file.read(read_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self):
+        """Returns the next non-whitespace character without consuming it ('' at the end of the file)."""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer) or not self._fill():
+                return self.buffer[self.position:self.position + 1]
+
+    def expect(self, character):
+        if self.peek() != character:
+            raise ValueError(f"Expected {character!r} in JSON stream, got {self.peek()!r}")
+        self.position += 1
+
+    def _decode(self, decode):
+        # A value ending at the end of the buffer may continue in the next chunk (numbers)
+        while True:
+            try:
+                value, end = decode()
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def string(self):
+        if self.peek() != '"':
+            raise ValueError(f"Expected a key in JSON stream, got {self.peek()!r}")
+        return self._decode(lambda: scanstring(self.buffer, self.position + 1))
+
+    def value(self):
+        """Decodes a whole JSON value."""
+        self.peek()
+        return self._decode(lambda: self.decoder.raw_decode(self.buffer, self.position))
+
+def _walk(scanner, path, root_key):
+    # Called with the scanner on an object; yields (key, Levels) for every `"Levels": {...}` below it
+    scanner.expect('{')
+    if scanner.peek() == '}':
+        scanner.position += 1
+        return
+    while True:
+        key = scanner.string()
+        scanner.expect(':')
+        in_root = root_key is None or (path[:1] or [key])[0] == root_key
+        if key == 'Levels' and path and in_root:
+            levels = scanner.value()
+            if isinstance(levels, dict):
+                yield path[-1], levels
+        elif scanner.peek() == '{':
+            # Objects outside `root_key` are walked without yielding rather than decoded
+            yield from _walk(scanner, path + [key], root_key)
+        else:
+            scanner.value()
+
+        if scanner.peek() == ',':
+            scanner.position += 1
+        else:
+            scanner.expect('}')
+            return
+
+def iter_file_levels(json_file, root_key=None):
+    """
+    Incrementally reads a PyCEFR JSON result and yields (file_name, Levels)
+    pairs one at a time, for every object holding a `Levels` mapping.
+    With `root_key` (the commit hash of a per-commit result) only the entries
+    below that top-level key are read. Only one file entry is decoded at a
+    time, so memory does not grow with the size of the result file.
+    """
+    with open(json_file, encoding='utf-8') as file:
+        scanner = _Scanner(file)
+        if scanner.peek() != '{':
+            return
+        yield from _walk(scanner, [], root_key)
+
+def file_levels(all_files_data):
+    """Yields the (file_name, Levels) pairs of an already loaded PyCEFR result."""
+    for file_name, file_content in all_files_data.items():
+        yield file_name, file_content['Levels']
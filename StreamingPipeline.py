@@ -0,0 +1,179 @@
+import logging
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse
+
+from PathFilter import PYTHON_FILES, traverse_matching_commits
+
+from ParseCache import ParseCache
+from PyCEFREngine import analyze_sources, diff_hunks
+from TrialPyCEFR import output_dir, pycefr_dir, summarize_commit, use_output_dir
+from TrialPyDriller import format_filename, hash_author_email, repository_key, write_code_to_file
+from RunProfiler import configure_logging
+
+logger = logging.getLogger('StreamingPipeline')
+
+# Maximum number of commits buffered between two stages
+queue_size = 64
+
+# Score only the statements the diff touches in each file instead of the whole files.
+# Their counts are not whole-file counts, so their summaries go to hunk_output_dir.
+hunk_scoped = False
+hunk_output_dir = os.path.join(output_dir, 'HunkScoped')
+
+# Logging level of a run started from the command line
+log_level = 'INFO'
+
+_END = object()
+
+def bounded(stage, maxsize=queue_size):
+    """
+    Runs a generator stage in its own thread and yields its items through a
+    bounded queue. A slow consumer blocks the producer once `maxsize` items
+    are waiting, which keeps memory use flat.
+    """
+    items = queue.Queue(maxsize=maxsize)
+
+    def produce():
+        try:
+            for item in stage:
+                items.put(item)
+            items.put(_END)
+        except BaseException as e:
+            items.put(e)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = items.get()
+        if item is _END:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+def mine_commits(repo_url, write_snapshots=False, path_filter=PYTHON_FILES, hunk_scoped=False):
+    """
+    Yields one record per commit that modifies files passing `path_filter`
+    (by default the Python files), holding the before/after sources in memory.
+    With `write_snapshots` the sources are also written to the PythonFiles
+    tree like `extract_data` does. With `hunk_scoped` each source comes with
+    the diff hunks of its file (see PyCEFREngine.diff_hunks) and the
+    ParseCache keys of its path and of the path it continues, otherwise with
+    None, and the record's 'changes' pair the before and after file names of
+    each modified file (None for a version the file does not have).
+    """
+    project_name = urlparse(repo_url).path.split('/')[-1]
+    python_files_directory = os.path.join('PythonFiles', repository_key(repo_url))
+
+    for commit in traverse_matching_commits(repo_url, path_filter):
+        author_id = hash_author_email(commit.author.email)
+        commit_directory = os.path.join(python_files_directory, author_id, commit.hash)
+        files, changes = [], []
+
+        for index, modified_file in enumerate(commit.modified_files, start=1):
+            if not path_filter.matches_file(modified_file):
+                continue
+            hunks = diff_hunks(modified_file.diff_parsed) if hunk_scoped else None
+            old_key = f"{repo_url}:{modified_file.old_path}" if hunk_scoped and modified_file.old_path else None
+            new_key = f"{repo_url}:{modified_file.new_path}" if hunk_scoped and modified_file.new_path else None
+            file_names = []
+            # The before version continues the last snapshot of the old path, the after version continues the before
+            for suffix, code, key, previous_key in (
+                    ("before", modified_file.source_code_before, old_key, old_key),
+                    ("after", modified_file.source_code, new_key, old_key or new_key)):
+                if code is None:
+                    file_names.append(None)
+                    continue
+                file_name = format_filename(commit.hash, project_name, author_id, commit.author_date, suffix, index)
+                if write_snapshots:
+                    write_code_to_file(commit_directory, file_name, code)
+                files.append((file_name, code, hunks, key, previous_key))
+                file_names.append(file_name)
+            if hunk_scoped and any(file_names):
+                changes.append(tuple(file_names))
+
+        if files:
+            yield {'commit_hash': commit.hash, 'files': files, 'changes': changes}
+
+# Parse cache of an analysis process, following each path from one commit to the next
+parse_cache = None
+
+def analyze_commit(record):
+    """
+    Analyzes the sources of one commit record with PyCEFR, whole in a single
+    run or, for the files with diff hunks, only the top-level statements
+    around them, matched between the two versions of each file. Hunk-scoped
+    sources go through the process's ParseCache, so a snapshot continuing
+    one seen before is parsed only around the edit and PyCEFR runs on the
+    enclosing statements alone.
+    Returns the commit hash and its files in the DATA_JSON shape.
+    """
+    global parse_cache
+    whole_files = {file_name: code for file_name, code, hunks, _, _ in record['files'] if hunks is None}
+    results = analyze_sources(whole_files, pycefr_dir)
+    versions = {file_name: ((code, key, previous_key), hunks) for file_name, code, hunks, key, previous_key in record['files']}
+    for file_names in record.get('changes', ()):
+        if parse_cache is None:
+            parse_cache = ParseCache()
+        before, after = (versions[file_name][0] if file_name else None for file_name in file_names)
+        hunks = versions[file_names[0] or file_names[1]][1]
+        for file_name, levels in zip(file_names, parse_cache.analyze_change(before, after, hunks, pycefr_dir)):
+            if file_name:
+                results[file_name] = levels
+    all_files_data = {file_name: {'Levels': levels} for file_name, levels in results.items() if levels is not None}
+    return record['commit_hash'], all_files_data
+
+def analyze_commits(records, workers=1):
+    """
+    Yields analyzed commits in mining order, analyzed in a pool of `workers`
+    processes with at most twice that many commits in flight. PyCEFR runs
+    from a working directory it switches to, so it never runs in this
+    process, where the mining thread writes snapshots to relative paths.
+    With a single worker every hunk-scoped snapshot finds its predecessor in
+    the worker's ParseCache; with more, only those that reach the same worker.
+    """
+    workers = max(workers, 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for record in records:
+            in_flight.append(executor.submit(analyze_commit, record))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+def aggregate_commits(analyzed_commits):
+    """Generates the before/after/difference summary files of each analyzed commit."""
+    count = 0
+    for commit_hash, all_files_data in analyzed_commits:
+        if all_files_data:
+            summarize_commit(commit_hash, all_files_data)
+            count += 1
+    return count
+
+def run_pipeline(repo_url, workers=1, write_snapshots=False, maxsize=queue_size, hunk_scoped=hunk_scoped):
+    """
+    Mines, analyzes and aggregates a repository as one streaming pipeline.
+    Commits flow between stages through bounded queues; no snapshot files or
+    DATA_JSON files are needed unless `write_snapshots` is set.
+    With `hunk_scoped` the Before/After counts cover only the top-level
+    statements around the edit, the same ones on both sides, so Difference
+    is the whole-file difference while Before and After are not whole-file
+    counts. Those summaries go to hunk_output_dir, apart from the whole-file
+    ones.
+    """
+    if hunk_scoped:
+        use_output_dir(hunk_output_dir)
+    records = bounded(mine_commits(repo_url, write_snapshots, hunk_scoped=hunk_scoped), maxsize)
+    analyzed_commits = bounded(analyze_commits(records, workers), maxsize)
+    count = aggregate_commits(analyzed_commits)
+    logger.info(f"Summarized {count} commits of {repo_url}")
+
+if __name__ == "__main__":
+    configure_logging(log_level)
+    for repo_url in ["https://github.com/ishepard/pydriller"]:
+        logger.info(f"Processing repository: {repo_url}")
+        run_pipeline(repo_url, workers=os.cpu_count())
@@ -0,0 +1,157 @@
+import csv
+import json
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+# Buffer size of each per-project summary file
+write_buffer_size = 1024 * 1024
+
+# Per-project summary files kept open at once; the least recently written is closed beyond this
+max_open_files = 32
+
+logger = logging.getLogger('SummaryWriter')
+
+class JsonLinesSummaryWriter:
+    """
+    Writes all per-commit summaries of a project as JSON Lines into a single
+    buffered file, <output_dir>/JSONL/<project>.jsonl, instead of one CSV and
+    one JSON file per commit. Each line holds the same record as the legacy
+    per-commit JSON file. At most `max_open_files` files are open at a time;
+    a file closed to make room is reopened for appending when its project is
+    written again.
+    Summaries of earlier runs are kept, so incremental or resumed runs add to
+    them. A commit written again replaces its earlier summary: the duplicates
+    are appended, and the file is compacted to the last summary of each commit
+    on `close`. With `append` off, each project file is truncated instead when
+    the run first writes to it.
+    """
+
+    def __init__(self, output_dir, append=True, time_key='TimeFormat', max_open=max_open_files):
+        self.directory = os.path.join(output_dir, 'JSONL')
+        self.mode = 'a' if append else 'w'
+        self.time_key = time_key
+        self.max_open = max(1, max_open)
+        self.files = OrderedDict()
+        self.commits = {}  # Project -> hashes of the commits in its file
+        self.rewritten = set()  # Projects whose file holds a commit more than once
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, project_name):
+        return os.path.join(self.directory, f"{project_name}.jsonl")
+
+    def _file(self, project_name):
+        file = self.files.get(project_name)
+        if file is not None:
+            self.files.move_to_end(project_name)
+            return file
+
+        while len(self.files) >= self.max_open:
+            self.files.popitem(last=False)[1].close()
+        path = self._path(project_name)
+        if project_name in self.commits:
+            mode = 'a'
+        else:
+            mode = self.mode
+            if mode == 'a' and os.path.exists(path):
+                self.commits[project_name] = {record['CommitHash'] for record in read_summaries(path)}
+            else:
+                self.commits[project_name] = set()
+        file = self.files[project_name] = open(path, mode, encoding='utf-8', buffering=write_buffer_size)
+        return file
+
+    def write_summary(self, commit_hash, project_name, author_id, author_date_format, time_format, after_sum, before_sum, diff):
+        record = {
+            'CommitHash': commit_hash,
+            'ProjectName': project_name,
+            'AuthorID': author_id,
+            'AuthorDateFormat': author_date_format,
+            self.time_key: time_format,
+            'Levels': {
+                'After': dict(after_sum),
+                'Before': dict(before_sum),
+                'Difference': dict(diff)
+            }
+        }
+        file = self._file(project_name)
+        if commit_hash in self.commits[project_name]:
+            self.rewritten.add(project_name)
+        self.commits[project_name].add(commit_hash)
+        file.write(json.dumps(record) + '\n')
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+        self.files = OrderedDict()
+        for project_name in self.rewritten:
+            compact_summaries(self._path(project_name))
+        self.rewritten = set()
+
+def write_summary(summary, summary_writer=None, rollup_store=None, trajectory_engine=None):
+    """
+    Sends one commit summary, the `write_summary` arguments as a tuple, to
+    the rollup store and the trajectory engine when they are set, and to the
+    summary writer. Returns False when there is no summary writer, in which
+    case the caller writes the per-commit CSV and JSON files itself.
+    """
+    for writer in (rollup_store, trajectory_engine, summary_writer):
+        if writer is not None:
+            writer.write_summary(*summary)
+    return summary_writer is not None
+
+def read_summaries(jsonl_path):
+    """Yields the summary records of a JSON Lines summary file."""
+    with open(jsonl_path, encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+def compact_summaries(jsonl_path):
+    """
+    Rewrites a JSON Lines summary file with only the last summary of each
+    commit, at the position of its first one.
+    """
+    records = {}
+    for record in read_summaries(jsonl_path):
+        records[record['CommitHash']] = record
+    temporary_path = f"{jsonl_path}.tmp"
+    with open(temporary_path, 'w', encoding='utf-8', buffering=write_buffer_size) as file:
+        for record in records.values():
+            file.write(json.dumps(record) + '\n')
+    os.replace(temporary_path, jsonl_path)
+
+def export_legacy_layout(jsonl_path, output_dir, time_key='TimeFormat'):
+    """
+    Recreates the legacy per-commit layout from a JSON Lines summary file:
+    CSV/<project>/<author_id>/<hash>_summary_<date>_<time>.csv and the
+    matching JSON file, as written by generate_summary_files.
+    """
+    created_dirs = set()
+    count = 0
+    for record in read_summaries(jsonl_path):
+        project_name, author_id = record['ProjectName'], record['AuthorID']
+        after_sum, before_sum, diff = (record['Levels'][key] for key in ('After', 'Before', 'Difference'))
+
+        output_csv_dir = os.path.join(output_dir, 'CSV', project_name, author_id)
+        output_json_dir = os.path.join(output_dir, 'JSON', project_name, author_id)
+        if output_csv_dir not in created_dirs:
+            Path(output_csv_dir).mkdir(parents=True, exist_ok=True)
+            Path(output_json_dir).mkdir(parents=True, exist_ok=True)
+            created_dirs.add(output_csv_dir)
+
+        summary_base = f"{record['CommitHash']}_summary_{record['AuthorDateFormat']}_{record[time_key]}"
+        with open(os.path.join(output_csv_dir, f"{summary_base}.csv"), 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['CommitHash', 'ProjectName', 'AuthorID', 'AuthorDateFormat', time_key, 'Level', 'After', 'Before', 'Difference'])
+            for level in sorted(set(after_sum.keys()).union(before_sum.keys())):
+                writer.writerow([
+                    record['CommitHash'], project_name, author_id, record['AuthorDateFormat'], record[time_key],
+                    level, after_sum.get(level, 0), before_sum.get(level, 0), diff.get(level, 0)
+                ])
+
+        with open(os.path.join(output_json_dir, f"{summary_base}.json"), 'w') as jsonfile:
+            json.dump(record, jsonfile, indent=4)
+        count += 1
+
+    logger.info(f"Exported {count} commit summaries from {jsonl_path}")
@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import pickle
+from bisect import bisect_right
+from collections import deque
+from datetime import datetime, timedelta
+
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+
+# Length of the rolling window behind the level distributions
+window_days = 90
+
+logger = logging.getLogger('TrajectoryEngine')
+
+class AuthorTrajectory:
+    """Running state of one author: window contents and sums, cumulative totals and first appearances."""
+
+    __slots__ = ('window', 'window_sums', 'cumulative', 'first_seen', 'commits', 'last_date')
+
+    def __init__(self):
+        self.window = deque()  # (author_date, after levels), oldest first
+        self.window_sums = dict.fromkeys(LEVELS, 0)
+        self.cumulative = dict.fromkeys(LEVELS, 0)
+        self.first_seen = {}
+        self.commits = 0
+        self.last_date = None
+
+    def add(self, author_date, after_sum, diff, window):
+        self.commits += 1
+        for level, value in diff.items():
+            self.cumulative[level] = self.cumulative.get(level, 0) + value
+        for level, value in after_sum.items():
+            if value > 0 and (level not in self.first_seen or author_date < self.first_seen[level]):
+                self.first_seen[level] = author_date
+
+        if self.last_date is None or author_date >= self.last_date:
+            self.last_date = author_date
+            self.window.append((author_date, after_sum))
+        elif author_date > self.last_date - window:
+            # A late commit inside the window keeps the window ordered by date
+            dates = [date for date, _ in self.window]
+            self.window.insert(bisect_right(dates, author_date), (author_date, after_sum))
+        else:
+            return
+        for level, value in after_sum.items():
+            self.window_sums[level] = self.window_sums.get(level, 0) + value
+
+        start = self.last_date - window
+        while self.window and self.window[0][0] <= start:
+            _, expired = self.window.popleft()
+            for level, value in expired.items():
+                self.window_sums[level] -= value
+
+    def state(self):
+        return (list(self.window), self.window_sums, self.cumulative, self.first_seen, self.commits, self.last_date)
+
+    @classmethod
+    def from_state(cls, state):
+        trajectory = cls()
+        window, trajectory.window_sums, trajectory.cumulative, trajectory.first_seen, trajectory.commits, trajectory.last_date = state
+        trajectory.window = deque(window)
+        return trajectory
+
+class TrajectoryEngine:
+    """
+    Per-author competency trajectories, updated one commit summary at a time:
+    - the level distribution of the commits in a rolling window of `window_days`
+      days ending at the author's latest commit,
+    - the cumulative Difference per level (net constructs the author added),
+    - the first date each level appears in the After counts of the author.
+    It implements the `summary_writer` interface, so the aggregation scripts
+    feed it as commits are summarized. State is kept in a pickle at `path`
+    (plain dicts and tuples, so it loads whichever module saved it) and saved
+    on close, so later runs only add their new commits.
+    A commit already seen is ignored, even when it was analyzed again with
+    other counts: its first contribution stays in the trajectory. After a
+    re-analysis, delete the state file and rebuild it from the competency
+    store (`python TrajectoryEngine.py`).
+    """
+
+    def __init__(self, path=None, window_days=window_days):
+        self.path = path
+        self.window = timedelta(days=window_days)
+        self.authors = {}  # (project_name, author_id) -> AuthorTrajectory
+        self.seen_commits = set()  # (project_name, commit_hash)
+
+    @classmethod
+    def load(cls, path, window_days=window_days):
+        """Loads the state saved at `path`, or starts an empty engine saving there."""
+        if not os.path.exists(path):
+            return cls(path, window_days)
+        with open(path, 'rb') as state_file:
+            state = pickle.load(state_file)
+        if state['window_days'] != window_days:
+            raise ValueError(f"{path} was built with a {state['window_days']} day window, not {window_days}")
+        engine = cls(path, window_days)
+        engine.authors = {key: AuthorTrajectory.from_state(trajectory) for key, trajectory in state['authors'].items()}
+        engine.seen_commits = state['seen_commits']
+        return engine
+
+    def add_commit(self, commit_hash, project_name, author_id, author_date, after_sum, diff):
+        """Adds one commit; `author_date` is a datetime. Returns False for a commit already added."""
+        if (project_name, commit_hash) in self.seen_commits:
+            return False
+        self.seen_commits.add((project_name, commit_hash))
+
+        trajectory = self.authors.get((project_name, author_id))
+        if trajectory is None:
+            trajectory = self.authors[(project_name, author_id)] = AuthorTrajectory()
+        trajectory.add(author_date, dict(after_sum), diff, self.window)
+        return True
+
+    def write_summary(self, commit_hash, project_name, author_id, author_date_format, time_format, after_sum, before_sum, diff):
+        author_date = datetime.strptime(f"{author_date_format}{time_format}", "%Y%m%d%H%M%S")
+        self.add_commit(commit_hash, project_name, author_id, author_date, after_sum, diff)
+
+    def add_from_store(self, store, project_name=None, start=None):
+        """Feeds the commits of a CompetencyStore in author date order. Returns the number of new commits."""
+        added = 0
+        for commit_hash, commit_project, author_id, author_date, levels in store.commit_levels(project_name, start):
+            after_sum = {level: after for level, (after, before, difference) in levels.items()}
+            diff = {level: difference for level, (after, before, difference) in levels.items()}
+            added += self.add_commit(commit_hash, commit_project, author_id,
+                                     datetime.strptime(author_date, "%Y-%m-%d %H:%M:%S"), after_sum, diff)
+        return added
+
+    def _trajectory(self, project_name, author_id):
+        trajectory = self.authors.get((project_name, author_id))
+        if trajectory is None:
+            raise KeyError(f"No commits of author {author_id} in {project_name}")
+        return trajectory
+
+    def window_distribution(self, project_name, author_id):
+        """Share of each level in the After counts of the author's current window."""
+        sums = self._trajectory(project_name, author_id).window_sums
+        total = sum(sums.values())
+        return {level: (value / total if total else 0.0) for level, value in sums.items()}
+
+    def cumulative(self, project_name, author_id):
+        return dict(self._trajectory(project_name, author_id).cumulative)
+
+    def first_appearance(self, project_name, author_id):
+        """Date of the first commit using each level, for the levels the author has used."""
+        first_seen = self._trajectory(project_name, author_id).first_seen
+        return {level: first_seen[level] for level in LEVELS + sorted(set(first_seen) - set(LEVELS)) if level in first_seen}
+
+    def summary(self, project_name, author_id):
+        trajectory = self._trajectory(project_name, author_id)
+        return {
+            'ProjectName': project_name,
+            'AuthorID': author_id,
+            'Commits': trajectory.commits,
+            'LastCommit': trajectory.last_date.strftime("%Y-%m-%d %H:%M:%S"),
+            'WindowDistribution': self.window_distribution(project_name, author_id),
+            'Cumulative': self.cumulative(project_name, author_id),
+            'FirstAppearance': {level: date.strftime("%Y-%m-%d %H:%M:%S")
+                                for level, date in self.first_appearance(project_name, author_id).items()},
+        }
+
+    def author_ids(self, project_name):
+        return sorted(author_id for project, author_id in self.authors if project == project_name)
+
+    def save(self, path=None):
+        """Writes the state atomically to `path` (by default the path it was loaded from)."""
+        path = path or self.path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        state = {
+            'window_days': self.window.days,
+            'authors': {key: trajectory.state() for key, trajectory in self.authors.items()},
+            'seen_commits': self.seen_commits,
+        }
+        with open(f"{path}.tmp", 'wb') as state_file:
+            pickle.dump(state, state_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{path}.tmp", path)
+
+    def close(self):
+        if self.path is not None:
+            self.save()
+
+def write_report(engine, report_path):
+    """Writes one JSON line per author with its current trajectory summary."""
+    with open(report_path, 'w', encoding='utf-8') as report_file:
+        for project_name, author_id in sorted(engine.authors):
+            report_file.write(json.dumps(engine.summary(project_name, author_id)) + '\n')
+
+if __name__ == '__main__':
+    from CompetencyStore import CompetencyStore
+    from RunProfiler import configure_logging
+
+    # Bring the saved state up to date from the competency store and report every author
+    competency_store_path = 'CompetencyScore/competency.sqlite'
+    trajectory_state_path = 'CompetencyScore/trajectories.pickle'
+    configure_logging()
+    engine = TrajectoryEngine.load(trajectory_state_path)
+    store = CompetencyStore(competency_store_path)
+    logger.info(f"Added {engine.add_from_store(store)} new commits for {len(engine.authors)} authors")
+    store.close()
+    engine.close()
+    write_report(engine, 'CompetencyScore/trajectories.jsonl')
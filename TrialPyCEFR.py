@@ -155,21 +155,73 @@
 import subprocess
 import json
 import csv
+import logging
+import queue
+import time
 from collections import defaultdict
+from datetime import datetime, timezone
+from functools import partial
+from multiprocessing.pool import ThreadPool
 from pathlib import Path
 import os
+import shutil
+from PyCEFRCache import PyCEFRCache, content_hash, pycefr_version
+from PyCEFREngine import analyze_directory_sharded, analyze_shard, find_shards
+from ParseCache import ParseCache
+from ColumnarStore import CompetencyParquetWriter, competency_dataset_dir
+from SummaryWriter import JsonLinesSummaryWriter, write_summary
+from CompetencyStore import CompetencyStore, RollupStore
+from TrajectoryEngine import TrajectoryEngine
+from ParallelIngest import ingest_json_files, loads_json
+from StreamingJSON import file_levels, iter_file_levels
+from FileManifest import ManifestIndex
+from RunProfiler import RunProfiler, configure_logging
 
 # Define the directories
 pycefr_dir = 'C:\\Users\\rujip\\Desktop\\SP2023-Greeedhub\\pycefr'  # Path to the PyCEFR scripts
 json_data_dir = os.path.join(pycefr_dir, 'DATA_JSON')  # Where JSON data is stored
+python_files_dir = '../PythonFiles'  # Snapshot tree written by TrialPyDriller, relative to pycefr_dir
+python_blobs_dir = '../PythonBlobs'  # Content-addressed snapshot store, relative to pycefr_dir
+commits_csv_dir = os.path.join(pycefr_dir, '..', 'PythonCommits_data')  # Commit CSVs written by TrialPyDriller
+file_manifest_dir = os.path.join(pycefr_dir, '..', 'FileManifest')  # File manifests written by TrialPyDriller
 output_dir = 'C:\\Users\\rujip\\Desktop\\SP2023-Greeedhub\\CompetencyScore'  # Output directory for CSV and JSON files
 
 # Ensure output directory exists
 Path(output_dir).mkdir(parents=True, exist_ok=True)
 
+# Output of generate_summary_files: 'files' (one CSV and JSON per commit),
+# 'jsonl' (one JSON Lines file per project, see SummaryWriter.py), 'parquet'
+# or 'sqlite' (see CompetencyStore.py)
+summary_output = 'files'
+competency_store_path = os.path.join(output_dir, 'competency.sqlite')
+
+# Set by main() when summaries go to a single writer instead of per-commit files
+summary_writer = None
+
+# Keep monthly/weekly rollups per project and author for VisualizeCompOverTime (see CompetencyStore.RollupStore)
+maintain_rollups = True
+rollup_store_path = os.path.join(output_dir, 'rollups.sqlite')
+rollup_store = None
+
+# Keep per-author rolling-window trajectories up to date (see TrajectoryEngine.py)
+maintain_trajectories = False
+trajectory_state_path = os.path.join(output_dir, 'trajectories.pickle')
+trajectory_engine = None
+
+# Where summaries go: output_dir, or another directory after use_output_dir()
+summary_dir = output_dir
+
 # Define error log file path
 error_log_file = os.path.join(output_dir, 'error_log.txt')
 
+# Resolves analyzed file names (manifest ids or legacy names) to their metadata
+file_index = ManifestIndex(file_manifest_dir)
+
+logger = logging.getLogger('TrialPyCEFR')
+
+# Stage timers and counters of the run (see RunProfiler.py), replaced by the configured one in main()
+profiler = RunProfiler('TrialPyCEFR')
+
 def clone_pycefr_repository():
     """
     Clones the PyCEFR repository from GitHub.
@@ -177,41 +229,346 @@ def clone_pycefr_repository():
     if not Path(pycefr_dir).exists():
         try:
             subprocess.run(['git', 'clone', 'https://github.com/anapgh/pycefr.git', pycefr_dir], check=True)
-            print("PyCEFR repository cloned successfully.")
+            logger.info("PyCEFR repository cloned successfully.")
         except subprocess.CalledProcessError as e:
-            print(f"Error cloning PyCEFR repository: {e}")
+            logger.error(f"Error cloning PyCEFR repository: {e}")
     else:
-        print("PyCEFR repository already exists.")
+        logger.info("PyCEFR repository already exists.")
 
-def run_pycefr_analysis():
+def run_pycefr_analysis(target_directory=python_files_dir, workers=1, batch_size=None):
     """
     Runs the PyCEFR analysis by executing its scripts and generating JSON data.
     Attempts to continue execution even if an error occurs in subprocess calls.
+    With `workers` > 1 the shards (the directories directly containing Python
+    files) are grouped in batches of up to `batch_size` (default
+    `pycefr_batch_size`), fewer when there would not be a batch per worker.
+    `workers` scratch copies of the PyCEFR checkout each take the next batch
+    as soon as they are free and analyze it with one pycerfl.py run; their
+    outputs are merged into pycefr_dir afterwards (see `merge_pycefr_outputs`).
     """
-    original_dir = os.getcwd()
-    os.chdir(pycefr_dir)
-    
-    scripts = [
-        ('python', 'dict.py'),
-        ('python', 'pycerfl.py', 'directory', '../PythonFiles')
-    ]
-    
-    with open(error_log_file, 'a') as error_log:
-        for script_command in scripts:
+    errors = [run_pycefr_script(('python', 'dict.py'))]
+    if workers > 1:
+        shards = find_shards(Path(pycefr_dir, target_directory))
+        batch_size = max(1, min(batch_size or pycefr_batch_size, -(-len(shards) // workers)))
+        batches = [shards[start:start + batch_size] for start in range(0, len(shards), batch_size)]
+        scratch_root = Path(pycefr_dir, '..', 'PyCEFRScratch')
+        shutil.rmtree(scratch_root, ignore_errors=True)
+        scratch_dirs = [scratch_root / f"worker_{worker}" for worker in range(workers)]
+        free_scratch_dirs = queue.Queue()
+        for scratch_dir in scratch_dirs:
+            shutil.copytree(pycefr_dir, scratch_dir, ignore=shutil.ignore_patterns('.git', 'DATA_JSON', 'data.csv'))
+            free_scratch_dirs.put(scratch_dir)
+
+        def run_batch(batch):
+            scratch_dir = free_scratch_dirs.get()
             try:
-                print(f"Executing command: {' '.join(script_command)}")
-                subprocess.run(script_command, check=True)
-            except subprocess.CalledProcessError as e:
-                error_msg = f"Error running {script_command[1]}: {e}."
-                print(error_msg)
-                error_log.write(error_msg + '\n')
-            except UnicodeEncodeError as ue_error:
-                error_msg = f"UnicodeEncodeError: {ue_error}."
-                print(error_msg)
-                error_log.write(error_msg + '\n')
-                error_log.write(f"Occurred in {script_command[1]}\n")
-    
-    os.chdir(original_dir)
+                return run_pycefr_batch(scratch_dir, batch)
+            finally:
+                free_scratch_dirs.put(scratch_dir)
+
+        logger.info(f"Analyzing {len(shards)} shards in {len(batches)} pycerfl.py runs across {workers} workers")
+        with ThreadPool(workers) as pool:
+            for error in pool.imap_unordered(run_batch, batches):
+                errors.append(error)
+        merge_pycefr_outputs(scratch_dirs)
+        shutil.rmtree(scratch_root, ignore_errors=True)
+    else:
+        errors.append(run_pycefr_script(('python', 'pycerfl.py', 'directory', target_directory)))
+
+    with open(error_log_file, 'a') as error_log:
+        for error in filter(None, errors):
+            error_log.write(error)
+
+def run_pycefr_batch(scratch_dir, shards):
+    """
+    Runs pycerfl.py once over a batch of shards from `scratch_dir`, a copy of
+    the PyCEFR checkout, so concurrent runs never write the same DATA_JSON or
+    data.csv. The shard files are linked (or copied, where links are not
+    supported) under Batch/<n>/<shard name>, keeping the directory names PyCEFR
+    groups its results by. Returns the error log lines of a failed run, or None.
+    """
+    started = time.perf_counter()
+    batch_dir = Path(scratch_dir, 'Batch')
+    shutil.rmtree(batch_dir, ignore_errors=True)
+    for number, shard in enumerate(shards):
+        staged_shard = batch_dir / str(number) / Path(shard).name
+        staged_shard.mkdir(parents=True)
+        for file_name in os.listdir(shard):
+            if file_name.endswith('.py'):
+                try:
+                    os.link(os.path.join(shard, file_name), staged_shard / file_name)
+                except OSError:
+                    shutil.copyfile(os.path.join(shard, file_name), staged_shard / file_name)
+    error = run_pycefr_script(('python', 'pycerfl.py', 'directory', os.path.abspath(batch_dir)), scratch_dir)
+    shutil.rmtree(batch_dir, ignore_errors=True)
+    logger.debug(f"{Path(scratch_dir).name}: {len(shards)} shards in {time.perf_counter() - started:.2f}s")
+    return error
+
+def merge_pycefr_outputs(scratch_dirs):
+    """
+    Moves the DATA_JSON files of the scratch workers into json_data_dir (a
+    group analyzed by several workers is merged into one file) and appends
+    their data.csv rows to pycefr_dir's data.csv, like a single run would.
+    """
+    Path(json_data_dir).mkdir(parents=True, exist_ok=True)
+    merged = set()
+    data_csv_path = Path(pycefr_dir, 'data.csv')
+    write_header = not data_csv_path.exists()
+    with open(data_csv_path, 'ab') as data_csv:
+        for scratch_dir in scratch_dirs:
+            for json_file in sorted(Path(scratch_dir, 'DATA_JSON').glob('*.json')):
+                target = Path(json_data_dir, json_file.name)
+                if json_file.name in merged:
+                    with open(target) as f:
+                        data = json.load(f)
+                    with open(json_file) as f:
+                        for group, files in json.load(f).items():
+                            data.setdefault(group, {}).update(files)
+                    with open(target, 'w') as f:
+                        json.dump(data, f, indent=4)
+                else:
+                    os.replace(json_file, target)
+                    merged.add(json_file.name)
+
+            worker_csv_path = Path(scratch_dir, 'data.csv')
+            if not worker_csv_path.exists():
+                continue
+            with open(worker_csv_path, 'rb') as worker_csv:
+                header = worker_csv.readline()
+                if write_header:
+                    data_csv.write(header)
+                    write_header = False
+                shutil.copyfileobj(worker_csv, data_csv)
+
+def run_pycefr_script(script_command, working_dir=None):
+    """
+    Runs one PyCEFR script from `working_dir` (default: pycefr_dir). Returns the error log lines of a
+    failure, or None.
+    """
+    try:
+        logger.info(f"Executing command: {' '.join(script_command)}")
+        subprocess.run(script_command, check=True, cwd=working_dir or pycefr_dir)
+    except subprocess.CalledProcessError as e:
+        error_msg = f"Error running {script_command[1]}: {e}."
+        logger.error(error_msg)
+        return error_msg + '\n'
+    except UnicodeEncodeError as ue_error:
+        error_msg = f"UnicodeEncodeError: {ue_error}."
+        logger.error(error_msg)
+        return error_msg + '\n' + f"Occurred in {script_command[1]}\n"
+    return None
+
+def run_pycefr_analysis_cached(target_directory=python_files_dir, prune_missing_projects=False, workers=1):
+    """
+    Runs the PyCEFR analysis only on files whose content has no cached result.
+    Cache misses are staged once per unique content, analyzed and stored in the
+    cache; the results for the whole tree are then written to DATA_JSON grouped
+    by parent directory (the commit directory of the PythonFiles layout).
+    With `workers` > 1 the misses are staged in that many shards, analyzed by
+    parallel pycerfl.py runs.
+    """
+    root = Path(pycefr_dir, target_directory)
+    staging_dir = Path(pycefr_dir, '..', 'PyCEFRStaging')
+    cache = PyCEFRCache(version=pycefr_version(pycefr_dir))
+
+    file_levels = {}
+    pending = {}  # content hash -> file paths
+
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    shard_dirs = [staging_dir / f"shard_{shard}" for shard in range(workers)] if workers > 1 else [staging_dir]
+    for shard_dir in shard_dirs:
+        shard_dir.mkdir(parents=True)
+
+    for file_path in root.rglob('*.py'):
+        file_hash = content_hash(file_path)
+        levels = cache.get(file_hash, file_path.relative_to(root).parts[0])
+        if levels is not None:
+            file_levels[file_path] = levels
+        elif file_hash in pending:
+            pending[file_hash].append(file_path)
+        else:
+            pending[file_hash] = [file_path]
+            shutil.copyfile(file_path, shard_dirs[len(pending) % len(shard_dirs)] / f"{file_hash}.py")
+
+    logger.info(f"PyCEFR cache: {cache.hits} hits, {len(pending)} unique files to analyze.")
+    profiler.count('cache_hits', cache.hits)
+    profiler.count('cache_misses', len(pending))
+
+    if pending:
+        # PyCEFR names each result file after the directory it analyzed, so the staged results are
+        # the files named after the shards; any other file in json_data_dir is left alone
+        staged_results = [Path(json_data_dir, f"{shard_dir.name}.json") for shard_dir in shard_dirs]
+        for json_file in staged_results:
+            # Left over by an interrupted run
+            json_file.unlink(missing_ok=True)
+        run_pycefr_analysis(os.path.relpath(staging_dir, pycefr_dir), workers)
+
+        staged_levels = {}
+        for json_file in staged_results:
+            if json_file.exists():
+                staged_levels.update(load_file_levels(json_file))
+                json_file.unlink()
+
+        for file_hash, file_paths in pending.items():
+            levels = staged_levels.get(file_hash)
+            if levels is None:
+                logger.warning(f"No PyCEFR result for {file_paths[0]}")
+                continue
+            for project_name in {file_path.relative_to(root).parts[0] for file_path in file_paths}:
+                cache.put(file_hash, project_name, levels)
+            for file_path in file_paths:
+                file_levels[file_path] = levels
+
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+    cache.evict()
+    if prune_missing_projects:
+        cache.prune_projects(entry.name for entry in root.iterdir() if entry.is_dir())
+    cache.close()
+
+    results = defaultdict(dict)
+    for file_path, levels in file_levels.items():
+        results[file_path.parent.name][file_path.name] = {'Levels': levels}
+    write_results_json(results)
+
+def run_pycefr_analysis_sharded(target_directory=python_files_dir, workers=os.cpu_count(), max_in_flight=None, use_cache=False):
+    """
+    Runs PyCEFR in-process (see PyCEFREngine.py) over the tree with one shard
+    per commit directory spread across `workers` processes. Returns the results in the DATA_JSON
+    shape like `run_pycefr_analysis_in_process`; with `use_cache` only files
+    without a PyCEFRCache result are sent to the workers.
+    """
+    root = Path(pycefr_dir, target_directory)
+    if not use_cache:
+        results = analyze_directory_sharded(root, pycefr_dir, workers, max_in_flight)
+        profiler.count('files', sum(len(files) for files in results.values()))
+        return results
+
+    cache = PyCEFRCache(version=pycefr_version(pycefr_dir))
+    results = defaultdict(dict)
+    shards = defaultdict(list)
+    pending = {}  # (commit directory, file name) -> (content hash, project name)
+    for file_path in sorted(root.rglob('*.py')):
+        file_hash = content_hash(file_path)
+        levels = cache.get(file_hash, file_path.relative_to(root).parts[0])
+        if levels is not None:
+            results[file_path.parent.name][file_path.name] = {'Levels': levels}
+        else:
+            shards[str(file_path.parent)].append(file_path.name)
+            pending[file_path.parent.name, file_path.name] = (file_hash, file_path.relative_to(root).parts[0])
+
+    if shards:
+        analyzed = analyze_directory_sharded(root, pycefr_dir, workers, max_in_flight, shards)
+        for group, files in analyzed.items():
+            for file_name, content in files.items():
+                file_hash, project_name = pending[group, file_name]
+                cache.put(file_hash, project_name, content['Levels'])
+                results[group][file_name] = content
+
+    logger.info(f"PyCEFR cache: {cache.hits} hits, {cache.misses} misses.")
+    profiler.count('files', sum(len(files) for files in results.values()))
+    profiler.count('cache_hits', cache.hits)
+    profiler.count('cache_misses', cache.misses)
+    cache.evict()
+    cache.close()
+    return results
+
+def write_results_json(results):
+    """
+    Writes results in the DATA_JSON shape as one JSON file per group
+    (commit directory), the layout `process_json_file` reads.
+    """
+    Path(json_data_dir).mkdir(parents=True, exist_ok=True)
+    for group, files in results.items():
+        with open(os.path.join(json_data_dir, f"{group}.json"), 'w') as jsonfile:
+            json.dump({group: files}, jsonfile, indent=4)
+
+def run_pycefr_analysis_in_process(target_directory=python_files_dir, use_cache=False):
+    """
+    Runs PyCEFR's analysis in this process (see PyCEFREngine.py), one run per
+    commit directory. Returns the results in the DATA_JSON shape without
+    spawning PyCEFR or writing JSON files; with `use_cache` results are
+    shared with PyCEFRCache, like those of `run_pycefr_analysis_cached`.
+    """
+    root = Path(pycefr_dir, target_directory)
+    cache = PyCEFRCache(version=pycefr_version(pycefr_dir)) if use_cache else None
+
+    results = defaultdict(dict)
+    for shard_directory in find_shards(root):
+        project_name = Path(shard_directory).relative_to(root).parts[0]
+        misses = {}  # file name -> content hash, None without a cache
+        for file_path in sorted(Path(shard_directory).glob('*.py')):
+            file_hash = content_hash(file_path) if cache is not None else None
+            levels = cache.get(file_hash, project_name) if cache is not None else None
+            if levels is None:
+                misses[file_path.name] = file_hash
+            else:
+                results[file_path.parent.name][file_path.name] = {'Levels': levels}
+
+        if misses:
+            _, files, _ = analyze_shard(shard_directory, pycefr_dir, list(misses))
+            for file_name, content in files.items():
+                if cache is not None:
+                    cache.put(misses[file_name], project_name, content['Levels'])
+                results[Path(shard_directory).name][file_name] = content
+
+    profiler.count('files', sum(len(files) for files in results.values()))
+    if cache is not None:
+        logger.info(f"PyCEFR cache: {cache.hits} hits, {cache.misses} misses.")
+        profiler.count('cache_hits', cache.hits)
+        profiler.count('cache_misses', cache.misses)
+        cache.evict()
+        cache.close()
+    return results
+
+def run_pycefr_analysis_lineage(disk_dir=None):
+    """
+    Runs the in-process analysis over the snapshots listed in the commit CSVs,
+    in mining order, with a ParseCache (see ParseCache.py). The OldPath/NewPath
+    lineage of each row tells the cache which earlier snapshot a file
+    continues, so only the statements around each edit are parsed again.
+    Returns the results in the DATA_JSON shape like `run_pycefr_analysis_in_process`.
+    """
+    snapshot_root = Path(commits_csv_dir).parent  # CSV paths are relative to the mining directory
+    cache = ParseCache(disk_dir)
+    results = defaultdict(dict)
+    for commits_csv_path in sorted(Path(commits_csv_dir).glob('*_data.csv')):
+        with open(commits_csv_path, newline='', encoding='utf-8') as csv_file:
+            for row in csv.DictReader(csv_file):
+                if 'OldPath' not in row:
+                    raise ValueError(f"{commits_csv_path} has no path lineage, mine it again with TrialPyDriller")
+                old_key = f"{row['ProjectName']}:{row['OldPath']}" if row['OldPath'] else None
+                new_key = f"{row['ProjectName']}:{row['NewPath']}" if row['NewPath'] else None
+                # The before snapshot continues the last snapshot of the old path, the after snapshot continues the before
+                for column, key, previous_key in (('SourceCodeBeforeFilePath', old_key, old_key),
+                                                  ('SourceCodeFilePath', new_key, old_key or new_key)):
+                    if not row[column]:
+                        continue
+                    file_path = snapshot_root / row[column]
+                    try:
+                        source = file_path.read_text(encoding='utf-8')
+                    except (OSError, UnicodeDecodeError) as e:
+                        logger.warning(f"Failed to read {file_path}: {e}")
+                        continue
+                    levels = cache.analyze(source, key, previous_key, pycefr_dir)
+                    if levels is None:
+                        logger.warning(f"Skipping file that could not be analyzed: {file_path}")
+                        continue
+                    results[file_path.parent.name][file_path.name] = {'Levels': levels}
+                    profiler.count('files')
+
+    logger.info(f"Parse cache: {cache.stats()}")
+    for counter, value in cache.stats().items():
+        profiler.count(f"parse_cache_{counter}", value)
+    return results
+
+def process_results(results):
+    """
+    Generates summary files from in-memory results in the DATA_JSON shape,
+    one group per commit directory.
+    """
+    for commit_hash, all_files_data in results.items():
+        summarize_commit(commit_hash, all_files_data)
 
 def process_json_files():
     """
@@ -221,44 +578,207 @@ def process_json_files():
     for json_file in Path(json_data_dir).glob('*.json'):
         process_json_file(json_file)
 
+def process_json_files_parallel(read_workers=8, parse_workers=os.cpu_count()):
+    """
+    Processes the JSON files like `process_json_files`, reading them with a
+    thread pool and parsing them with a process pool. Summaries are written in
+    file name order, so the output does not depend on the worker counts.
+    Files larger than `streaming_threshold` are read incrementally by the
+    workers, like in `process_json_file`.
+    """
+    count = ingest_json_files(Path(json_data_dir).glob('*.json'), aggregate_json_bytes, write_commit_summary,
+                              read_workers, parse_workers,
+                              stream_parse=aggregate_json_stream, streaming_threshold=streaming_threshold)
+    logger.info(f"Summarized {count} commits.")
+
+def aggregate_json_bytes(commit_hash, raw):
+    """Worker entry point of `process_json_files_parallel`: parses and aggregates one JSON file."""
+    data = loads_json(raw)
+    return aggregate_commit(commit_hash, file_levels(data.get(commit_hash, {})))
+
+def aggregate_json_stream(json_file):
+    """Worker entry point of `process_json_files_parallel` for large files, read incrementally."""
+    return aggregate_commit(json_file.stem, iter_file_levels(json_file, json_file.stem))
+
 def process_json_file(json_file):
     """
     Processes a single JSON file generated by PyCEFR to extract competency levels and 
     generate summary CSV and JSON files.
+    Files larger than `streaming_threshold` are read incrementally, one
+    analyzed file at a time, instead of being loaded whole.
     """
+    commit_hash = json_file.stem
+    if os.path.getsize(json_file) > streaming_threshold:
+        summary = aggregate_commit(commit_hash, iter_file_levels(json_file, commit_hash),
+                                   keep_files=isinstance(summary_writer, CompetencyStore))
+        if summary is not None:
+            write_commit_summary(summary)
+        return
+
     with open(json_file) as f:
         data = json.load(f)
 
-    commit_hash = json_file.stem
-    all_files_data = data.get(commit_hash, {})
-    
+    summarize_commit(commit_hash, data.get(commit_hash, {}))
+
+def summarize_commit(commit_hash, all_files_data):
+    """
+    Sums the levels of the before and after files of one commit and
+    generates its summary CSV and JSON files.
+    """
+    summary = aggregate_commit(commit_hash, file_levels(all_files_data))
+    if summary is not None:
+        write_commit_summary(summary)
+
+def aggregate_commit(commit_hash, levels_by_file, keep_files=True):
+    """
+    Sums the levels of the before and after files of one commit, given as
+    (file_name, Levels) pairs. Returns the `generate_summary_files` arguments
+    followed by the list of analyzed files (None without `keep_files`), or
+    None when no file name has the expected structure.
+    """
     after_sum, before_sum = defaultdict(int), defaultdict(int)
+    files = [] if keep_files else None
+    project_name = None
     
-    for file_name, file_content in all_files_data.items():
-        parts = file_name.split('_')
-        if len(parts) < 7:  # Adjusted for time format inclusion
-            print(f"Unexpected filename structure: {file_name}")
+    for file_name, levels in levels_by_file:
+        metadata = file_index.metadata(file_name)
+        if metadata is None:
+            logger.warning(f"Unexpected filename structure: {file_name}")
             continue
         
-        project_name = parts[1]  # Extract project name
-        author_id, author_date_format, time_format, status = parts[2], parts[3], parts[4], parts[5]
+        project_name, author_id, author_date_format, time_format, status = metadata
+        if files is not None:
+            files.append((file_name, status, levels))
         
-        for level, score in file_content['Levels'].items():
+        for level, score in levels.items():
             if 'after' in status:
                 after_sum[level] += score
             elif 'before' in status:
                 before_sum[level] += score
     
+    if project_name is None:
+        return None
+
     diff = {level: after_sum[level] - before_sum.get(level, 0) for level in set(after_sum) | set(before_sum)}
     
-    generate_summary_files(commit_hash, project_name, author_id, author_date_format, time_format, after_sum, before_sum, diff)
+    return commit_hash, project_name, author_id, author_date_format, time_format, after_sum, before_sum, diff, files
+
+def write_commit_summary(summary):
+    """Writes a summary returned by `aggregate_commit`."""
+    *summary_fields, files = summary
+    generate_summary_files(*summary_fields)
+    if files is not None and isinstance(summary_writer, CompetencyStore):
+        summary_writer.write_files(*summary_fields[:5], files)
+
+def load_file_levels(json_file):
+    """
+    Reads a PyCEFR JSON result and returns a mapping of analyzed file name
+    (without extension, the blob SHA for the blob store) to its Levels.
+    """
+    if os.path.getsize(json_file) > streaming_threshold:
+        return {Path(name).stem: levels for name, levels in iter_file_levels(json_file)}
+
+    with open(json_file) as f:
+        data = json.load(f)
+
+    blob_levels = {}
+    pending = [data]
+    while pending:
+        entries = pending.pop()
+        for name, content in entries.items():
+            if not isinstance(content, dict):
+                continue
+            if 'Levels' in content:
+                blob_levels[Path(name).stem] = content['Levels']
+            else:
+                pending.append(content)
+    return blob_levels
+
+def local_author_date(author_date, author_local_offset):
+    """
+    The author's local date of a commit CSV row, from its UTC AuthorDate and
+    the author's AuthorLocalOffset (e.g. '+0200'). CSVs written before the
+    offset was recorded have no such column, so their dates stay in UTC.
+    """
+    utc_date = datetime.strptime(author_date, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+    return utc_date.astimezone(datetime.strptime(author_local_offset or '+0000', '%z').tzinfo)
+
+def process_blob_results(commits_csv_path, blob_levels):
+    """
+    Generates the per-commit summary files from blob store results.
+    Each commit sums the Levels of the blobs its CSV rows point to, so a blob
+    shared by many commits is analyzed only once. The date and time are the
+    author's local ones, like in the snapshot file names (see `local_author_date`).
+    """
+    commits = {}
+    with open(commits_csv_path, newline='', encoding='utf-8') as csv_file:
+        for row in csv.DictReader(csv_file):
+            commit = commits.get(row['CommitHash'])
+            if commit is None:
+                author_date = local_author_date(row['AuthorDate'], row.get('AuthorLocalOffset'))
+                commit = commits[row['CommitHash']] = {
+                    'project_name': row['ProjectName'],
+                    'author_id': row['AuthorID'],
+                    'author_date_format': author_date.strftime('%Y%m%d'),
+                    'time_format': author_date.strftime('%H%M%S'),
+                    'after_sum': defaultdict(int),
+                    'before_sum': defaultdict(int)
+                }
+
+            for column, sums in (('SourceCodeFilePath', commit['after_sum']), ('SourceCodeBeforeFilePath', commit['before_sum'])):
+                if not row[column]:
+                    continue
+                levels = blob_levels.get(Path(row[column]).stem)
+                if levels is None:
+                    logger.warning(f"No PyCEFR result for blob: {row[column]}")
+                    continue
+                for level, score in levels.items():
+                    sums[level] += score
+
+    for commit_hash, commit in commits.items():
+        after_sum, before_sum = commit['after_sum'], commit['before_sum']
+        diff = {level: after_sum[level] - before_sum.get(level, 0) for level in set(after_sum) | set(before_sum)}
+        generate_summary_files(commit_hash, commit['project_name'], commit['author_id'], commit['author_date_format'],
+                               commit['time_format'], after_sum, before_sum, diff)
+
+def process_blob_store():
+    """
+    Processes the PyCEFR results of the blob store against every commit CSV.
+    """
+    blob_levels = {}
+    for json_file in Path(json_data_dir).glob('*.json'):
+        blob_levels.update(load_file_levels(json_file))
+
+    for commits_csv_path in Path(commits_csv_dir).glob('*_data.csv'):
+        process_blob_results(commits_csv_path, blob_levels)
+
+def use_output_dir(directory):
+    """
+    Sends the summaries written by this process, and the stores main() opens,
+    to `directory`, for results that must not mix with the whole-file ones.
+    """
+    global summary_dir, competency_store_path, rollup_store_path, trajectory_state_path, competency_dataset_dir
+    summary_dir = directory
+    competency_store_path = os.path.join(directory, os.path.basename(competency_store_path))
+    rollup_store_path = os.path.join(directory, os.path.basename(rollup_store_path))
+    trajectory_state_path = os.path.join(directory, os.path.basename(trajectory_state_path))
+    competency_dataset_dir = os.path.join(directory, 'Columnar', 'competency')
+    Path(directory).mkdir(parents=True, exist_ok=True)
 
 def generate_summary_files(commit_hash, project_name, author_id, author_date_format, time_format, after_sum, before_sum, diff):
     """
     Generates CSV and JSON summary files for competency levels, including time format.
+    When a `summary_writer` is set the summary goes to it instead.
+    The monthly/weekly rollups and the author trajectories are updated either
+    way when a `rollup_store` / `trajectory_engine` is set.
     """
-    output_csv_dir = os.path.join(output_dir, 'CSV', project_name, author_id)
-    output_json_dir = os.path.join(output_dir, 'JSON', project_name, author_id)
+    profiler.count('commits')
+    if write_summary((commit_hash, project_name, author_id, author_date_format, time_format, after_sum, before_sum, diff),
+                     summary_writer, rollup_store, trajectory_engine):
+        return
+
+    output_csv_dir = os.path.join(summary_dir, 'CSV', project_name, author_id)
+    output_json_dir = os.path.join(summary_dir, 'JSON', project_name, author_id)
     Path(output_csv_dir).mkdir(parents=True, exist_ok=True)
     Path(output_json_dir).mkdir(parents=True, exist_ok=True)
 
@@ -289,17 +809,123 @@ def generate_summary_files(commit_hash, project_name, author_id, author_date_for
             }
         }, jsonfile, indent=4)
 
+# Analyze the content-addressed store written by TrialPyDriller with use_blob_store
+use_blob_store = False
+
+# Reuse cached per-file PyCEFR results (see PyCEFRCache.py)
+use_result_cache = False
+
+# Run PyCEFR's analysis in this process (see PyCEFREngine.py) instead of as subprocesses
+use_in_process_engine = False
+
+# With the in-process analysis, follow the file lineage of the commit CSVs and
+# reuse the unchanged statements of each file's previous snapshot (see ParseCache.py).
+# Parsed trees are also pickled under parse_cache_dir unless it is None.
+use_parse_cache = False
+parse_cache_dir = None
+
+# Parallel shards of the analysis: worker processes of the in-process analysis,
+# or concurrent pycerfl.py runs (1 disables sharding)
+analysis_workers = 1
+
+# Most shards (commit directories) analyzed by one pycerfl.py run when analysis_workers > 1
+pycefr_batch_size = 64
+
+# Worker processes parsing DATA_JSON files (1 processes them one by one)
+ingest_workers = 1
+
+# PyCEFR results larger than this (bytes) are read incrementally instead of loaded whole
+streaming_threshold = 256 * 1024 ** 2
+
+# Logging level ('DEBUG' lists every file) and optional per-stage cProfile/tracemalloc capture.
+# Each run writes its timing report to RunReports (see RunProfiler.py).
+log_level = 'INFO'
+profile_functions = False
+trace_memory = False
+
 def main():
+    global summary_writer, rollup_store, trajectory_engine, profiler
+    configure_logging(log_level)
+    profiler = RunProfiler('TrialPyCEFR', cprofile=profile_functions, trace_memory=trace_memory)
+    if summary_output == 'parquet':
+        summary_writer = CompetencyParquetWriter(competency_dataset_dir)
+    elif summary_output == 'jsonl':
+        summary_writer = JsonLinesSummaryWriter(summary_dir)
+    elif summary_output == 'sqlite':
+        summary_writer = CompetencyStore(competency_store_path)
+    if maintain_rollups:
+        rollup_store = RollupStore(rollup_store_path)
+    if maintain_trajectories:
+        trajectory_engine = TrajectoryEngine.load(trajectory_state_path)
+
+    try:
+        run_analysis_steps()
+    finally:
+        if summary_writer is not None:
+            summary_writer.close()
+            summary_writer = None
+        if rollup_store is not None:
+            rollup_store.close()
+            rollup_store = None
+        if trajectory_engine is not None:
+            trajectory_engine.close()
+            trajectory_engine = None
+        profiler.write_report()
+
+def run_analysis_steps():
+    if use_parse_cache and use_in_process_engine and analysis_workers > 1:
+        raise ValueError("use_parse_cache follows file lineage in mining order; set analysis_workers = 1")
+
     # Step 1: Clone PyCEFR repository
-    clone_pycefr_repository()
+    with profiler.stage('clone_pycefr'):
+        clone_pycefr_repository()
+
+    if use_in_process_engine:
+        target_directory = python_blobs_dir if use_blob_store else python_files_dir
+        with profiler.stage('analysis'):
+            if use_parse_cache:
+                results = run_pycefr_analysis_lineage(parse_cache_dir)
+            elif analysis_workers > 1:
+                results = run_pycefr_analysis_sharded(target_directory, analysis_workers, use_cache=use_result_cache)
+            else:
+                results = run_pycefr_analysis_in_process(target_directory, use_cache=use_result_cache)
+        with profiler.stage('aggregation'):
+            if use_blob_store:
+                blob_levels = {Path(file_name).stem: content['Levels']
+                               for files in results.values() for file_name, content in files.items()}
+                for commits_csv_path in Path(commits_csv_dir).glob('*_data.csv'):
+                    process_blob_results(commits_csv_path, blob_levels)
+            else:
+                process_results(results)
+        logger.info("Analysis and summary generation completed.")
+        return
+
+    if use_result_cache:
+        analyze = partial(run_pycefr_analysis_cached, workers=analysis_workers)
+    else:
+        analyze = partial(run_pycefr_analysis, workers=analysis_workers)
 
-    # Step 2: Run PyCEFR analysis
-    run_pycefr_analysis()
-    
-    # Step 3: Process the JSON files to generate summaries
-    process_json_files()
+    if use_blob_store:
+        # Step 2: Run PyCEFR analysis once per unique blob
+        with profiler.stage('analysis'):
+            analyze(python_blobs_dir)
 
-    print("Analysis and summary generation completed.")
+        # Step 3: Join the blob results with the commit CSVs to generate summaries
+        with profiler.stage('aggregation'):
+            process_blob_store()
+    else:
+        # Step 2: Run PyCEFR analysis
+        with profiler.stage('analysis'):
+            analyze()
+
+        # Step 3: Process the JSON files to generate summaries
+        with profiler.stage('aggregation'):
+            if ingest_workers > 1:
+                process_json_files_parallel(parse_workers=ingest_workers)
+            else:
+                process_json_files()
+
+    logger.info("Analysis and summary generation completed.")
 
 if __name__ == "__main__":
     main()
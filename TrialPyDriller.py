@@ -138,13 +138,34 @@
 # Code for TrialPyDriller.py
 import os
 import csv
+import json
 import hashlib
-from pydriller import Repository
+import logging
+import time
+from pydriller import Git
 from urllib.parse import urlparse
 import shutil
 import stat
-from datetime import datetime, timedelta
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, nullcontext
+from datetime import datetime
 import pytz
+from RepoMirrorCache import use_mirror
+from ColumnarStore import export_commits_csv
+from ExtractionProfiles import PROFILES, profile_attributes
+from PathFilter import PYTHON_FILES, MinedFrontier, PathFilter, traverse_matching_commits
+from FileManifest import FileManifestWriter, manifest_path
+from RunProfiler import RunProfiler, configure_logging
+
+CSV_HEADER = ["CommitHash", "ProjectName", "AuthorID", "AuthorDate", "AuthorTimezone", "ModifiedFilename", "ChangeType", "AddedLines", "DeletedLines", "SourceCodeBeforeFilePath", "SourceCodeFilePath", "OldPath", "NewPath", "AuthorLocalOffset"]
+AUTHOR_EMAIL_HEADER = ["AuthorID", "AuthorEmail"]
+
+logger = logging.getLogger('TrialPyDriller')
+
+# Stage timers and counters of the run (see RunProfiler.py), replaced by the configured one when run as a script
+profiler = RunProfiler('TrialPyDriller')
 
 # Enhanced error handling for directory deletion
 def onerror(func, path, exc_info):
@@ -155,7 +176,7 @@ def onerror(func, path, exc_info):
     If the error is for another reason, it re-raises the error.
     Usage: `shutil.rmtree(path, onerror=onerror)`
     """
-    print(f"Error handling path: {path}")
+    logger.warning(f"Error handling path: {path}")
     if not os.access(path, os.W_OK):
         os.chmod(path, stat.S_IWUSR)
         func(path)
@@ -188,87 +209,470 @@ def write_code_to_file(directory, filename, code):
     try:
         os.makedirs(directory, exist_ok=True)
         file_path = os.path.join(directory, filename)
-        with open(file_path, 'w', newline='', encoding='utf-8') as file:  # Specify encoding as 'utf-8'
-            file.write(code)
+        data = code.encode('utf-8')
+        with open(file_path, 'wb') as file:
+            file.write(data)
+        profiler.count('bytes_written', len(data))
         return file_path
     except Exception as e:
-        print(f"Failed to write file {filename} at {directory}: {e}")
+        logger.error(f"Failed to write file {filename} at {directory}: {e}")
         return None
 
-def extract_data(repo_url):
-    """Extracts data from repository commits and writes to CSV."""
-    parsed_url = urlparse(repo_url)
-    project_name = parsed_url.path.split('/')[-1]
+def git_blob_sha(data):
+    """Computes the git blob SHA-1 of the given bytes."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+def write_code_to_blob_store(store_directory, code):
+    """
+    Writes code into a content-addressed store keyed by its git blob SHA.
+    Contents already in the store are not written again.
+    """
+    if code is None:
+        return None
+
+    data = code.encode('utf-8')
+    blob_sha = git_blob_sha(data)
+    directory = os.path.join(store_directory, blob_sha[:2])
+    file_path = os.path.join(directory, f"{blob_sha}.py")
+    if os.path.exists(file_path):
+        profiler.count('blobs_reused')
+        return file_path
 
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # Write to a private temporary name first, parallel workers may store the same blob
+        temporary_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'wb') as file:
+            file.write(data)
+        os.replace(temporary_path, file_path)
+        profiler.count('bytes_written', len(data))
+        return file_path
+    except Exception as e:
+        logger.error(f"Failed to write blob {blob_sha} at {store_directory}: {e}")
+        return None
+
+def process_commit(commit, project_name, python_files_directory, csv_writer, author_email_writer, author_ids, blob_store_directory=None, manifest=None,
+                   attributes=PROFILES['sources'], path_filter=PYTHON_FILES):
+    """
+    Writes the Python files of a single commit and records them in the CSV.
+    With `blob_store_directory` the sources go to the content-addressed store
+    instead of one file per commit.
+    With a `manifest` (FileManifestWriter) the metadata of each file is recorded
+    there and the file is named <owner>.<name>.<file id>.py.
+    Only the sources and line counts in `attributes` (see ExtractionProfiles.py)
+    are read; the CSV columns of the others are left empty.
+    Only the files passing `path_filter` (see PathFilter.py) are recorded.
+    OldPath and NewPath record the lineage of each file across renames, so the
+    before snapshot of a row continues the after snapshot of the last row whose
+    NewPath is its OldPath.
+    """
+    logger.debug(f"Processing commit {commit.hash}...")
+    profiler.count('commits')
+
+    for index, modified_file in enumerate(commit.modified_files, start=1):
+        if path_filter.matches_file(modified_file):
+            logger.debug(f"  File #{index}: {modified_file.filename}")
+            profiler.count('files')
+
+            author_email = commit.author.email
+            author_id = hash_author_email(author_email)
+            if author_email not in author_ids:
+                author_ids[author_email] = author_id
+                author_email_writer.writerow([author_id, author_email])
+
+            source_code_before = modified_file.source_code_before if 'source_code_before' in attributes else None
+            source_code = modified_file.source_code if 'source_code' in attributes else None
+
+            commit_directory = os.path.join(python_files_directory, author_id, commit.hash)
+            before_filename = format_filename(commit.hash, project_name, author_id, commit.author_date, "before", index)
+            after_filename = format_filename(commit.hash, project_name, author_id, commit.author_date, "after", index)
+            if manifest is not None:
+                if source_code_before is not None:
+                    before_filename = manifest.file_name(manifest.add(commit.hash, author_id, commit.author_date, "before", index))
+                if source_code is not None:
+                    after_filename = manifest.file_name(manifest.add(commit.hash, author_id, commit.author_date, "after", index))
+
+            # Normalize the date to UTC; AuthorLocalOffset keeps the author's own offset, so the
+            # local date of the snapshot file names can be recovered from the CSV
+            normalized_date = commit.author_date.astimezone(pytz.timezone('UTC'))
+            author_local_offset = commit.author_date.strftime('%z') or '+0000'
+
+            if blob_store_directory is not None:
+                before_file_path = write_code_to_blob_store(blob_store_directory, source_code_before)
+                after_file_path = write_code_to_blob_store(blob_store_directory, source_code)
+            else:
+                before_file_path = write_code_to_file(commit_directory, before_filename, source_code_before)
+                after_file_path = write_code_to_file(commit_directory, after_filename, source_code)
+
+            csv_writer.writerow([
+                commit.hash,
+                project_name,
+                author_id,
+                normalized_date.strftime("%Y-%m-%d %H:%M:%S"),
+                normalized_date.strftime('%z'),
+                modified_file.filename,
+                modified_file.change_type.name,
+                modified_file.added_lines if 'added_lines' in attributes else None,
+                modified_file.deleted_lines if 'deleted_lines' in attributes else None,
+                before_file_path,
+                after_file_path,
+                modified_file.old_path,
+                modified_file.new_path,
+                author_local_offset
+            ])
+
+def repository_key(repo_url):
+    """
+    Names the outputs of a repository (CSV files, checkpoint, snapshot
+    directories) after its owner and name, e.g. 'ishepard.pydriller', so
+    that same-named repositories of different owners do not overwrite each
+    other. Local repositories are named after their directory.
+    """
+    parts = [part for part in urlparse(repo_url).path.split('/') if part]
+    if os.path.isdir(repo_url) or len(parts) < 2:
+        return os.path.basename(os.path.normpath(repo_url))
+    return f"{parts[-2]}.{parts[-1]}"
+
+def checkpoint_path(output_key):
+    """Returns the path of the mining checkpoint for a repository (see `repository_key`)."""
+    return os.path.join('PythonCommits_checkpoint', f"{output_key}_checkpoint.json")
+
+def load_checkpoint(output_key):
+    """Loads the mining checkpoint of a repository, or None if it was never mined."""
+    path = checkpoint_path(output_key)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as checkpoint_file:
+        return json.load(checkpoint_file)
+
+def checkpoint_frontier(checkpoint):
+    """The frontier of the commits mined up to a checkpoint (older checkpoints only record their last commit)."""
+    if checkpoint is None:
+        return MinedFrontier()
+    return MinedFrontier(checkpoint.get('mined_tips') or [checkpoint['last_commit']])
+
+def save_checkpoint(output_key, frontier, csv_file, author_email_file, manifest=None):
+    """
+    Records the tips of the fully written commits (see PathFilter.MinedFrontier)
+    together with the byte size of the output files at that point. The file is
+    replaced atomically so a crash never leaves a half-written checkpoint behind.
+    """
+    csv_file.flush()
+    author_email_file.flush()
+    checkpoint = {
+        'mined_tips': sorted(frontier.tips),
+        'csv_offset': csv_file.tell(),
+        'author_email_offset': author_email_file.tell(),
+        'updated_at': datetime.utcnow().isoformat()
+    }
+    if manifest is not None:
+        manifest.flush()
+        checkpoint['manifest_offset'] = manifest.tell()
+    path = checkpoint_path(output_key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as checkpoint_file:
+        json.dump(checkpoint, checkpoint_file, indent=4)
+    os.replace(f"{path}.tmp", path)
+
+def prepare_outputs(project_name, output_key, incremental):
+    """
+    Prepares the output locations of a repository, all named by `output_key`
+    (see `repository_key`), file manifest included.
+    Returns the CSV path, author email map path, the checkpoint to resume from
+    (None for a fresh run) and the author ids already recorded.
+    On resume, rows written after the checkpoint by an interrupted run are truncated.
+    """
     csv_directory = 'PythonCommits_data'
-    python_files_directory = os.path.join('PythonFiles', project_name)
+    python_files_directory = os.path.join('PythonFiles', output_key)
+    blob_store_directory = os.path.join('PythonBlobs', output_key)
     author_email_directory = 'PythonAuthorEmail_data'
 
     # Create directories if they don't exist
     os.makedirs(csv_directory, exist_ok=True)
     os.makedirs(author_email_directory, exist_ok=True)
 
-    # Delete directories with the same project name as the inputted repository URL
-    safe_delete_directory(python_files_directory)
+    csv_file_path = os.path.join(csv_directory, f"{output_key}_data.csv")
+    author_email_map_path = os.path.join(author_email_directory, f"{output_key}_AuthorEmail.csv")
+
+    checkpoint = load_checkpoint(output_key) if incremental else None
+    if checkpoint is not None and not (os.path.exists(csv_file_path) and os.path.exists(author_email_map_path)):
+        logger.warning(f"Checkpoint for {project_name} has no matching output files, mining from scratch.")
+        checkpoint = None
+    if checkpoint is not None:
+        with open(csv_file_path, newline='', encoding='utf-8') as csv_file:
+            if next(csv.reader(csv_file), None) != CSV_HEADER:
+                logger.warning(f"{csv_file_path} was written with other columns, mining {project_name} from scratch.")
+                checkpoint = None
+
+    author_ids = {}
+    if checkpoint is None:
+        # Delete directories with the same project name as the inputted repository URL
+        safe_delete_directory(python_files_directory)
+        safe_delete_directory(blob_store_directory)
+        if os.path.exists(manifest_path(output_key)):
+            os.remove(manifest_path(output_key))
+        if os.path.exists(checkpoint_path(output_key)):
+            os.remove(checkpoint_path(output_key))
+    else:
+        logger.info(f"Resuming {project_name} after commits {', '.join(checkpoint.get('mined_tips') or [checkpoint['last_commit']])}")
+        os.truncate(csv_file_path, checkpoint['csv_offset'])
+        os.truncate(author_email_map_path, checkpoint['author_email_offset'])
+        if 'manifest_offset' in checkpoint and os.path.exists(manifest_path(output_key)):
+            os.truncate(manifest_path(output_key), checkpoint['manifest_offset'])
+        with open(author_email_map_path, newline='', encoding='utf-8') as author_email_file:
+            reader = csv.reader(author_email_file)
+            next(reader, None)
+            for author_id, author_email in reader:
+                author_ids[author_email] = author_id
+
+    return csv_file_path, author_email_map_path, checkpoint, author_ids
+
+def extract_data(repo_url, workers=1, incremental=False, blob_store=False, manifest=False, profile='sources', path_filter=PYTHON_FILES):
+    """Extracts data from repository commits and writes to CSV.
+
+    With `workers` greater than 1 the commit history is split across that many
+    worker processes (see `extract_data_parallel`).
+    With `incremental` only the commits after the project's checkpoint are mined
+    and appended to the existing outputs.
+    With `blob_store` each distinct source is written once under PythonBlobs/<owner>.<name>
+    and the CSV file path columns point into that store.
+    With `manifest` the metadata of each snapshot file is written to
+    FileManifest/<owner>.<name>.manifest and the file is named by its id
+    (see FileManifest.py).
+    `profile` names the extraction profile deciding which attributes are read
+    (see ExtractionProfiles.py); 'metadata-only' writes the CSV without sources.
+    `path_filter` selects the files recorded; commits touching none of them
+    are skipped by git before PyDriller loads their diffs.
+    Returns the path of the CSV file.
+    """
+    attributes = profile_attributes(profile)
+    if manifest and (workers > 1 or blob_store):
+        raise ValueError("The file manifest is only written by serial mining without the blob store")
+    if workers > 1:
+        return extract_data_parallel(repo_url, workers, incremental, blob_store, profile, path_filter)
 
-    csv_file_path = os.path.join(csv_directory, f"{project_name}_data.csv")
-    author_email_map_path = os.path.join(author_email_directory, f"{project_name}_AuthorEmail.csv")
+    parsed_url = urlparse(repo_url)
+    project_name = parsed_url.path.split('/')[-1]
+    output_key = repository_key(repo_url)
+    python_files_directory = os.path.join('PythonFiles', output_key)
+    blob_store_directory = os.path.join('PythonBlobs', output_key) if blob_store else None
 
-    with open(csv_file_path, 'w', newline='', encoding='utf-8') as csv_file, \
-         open(author_email_map_path, 'w', newline='', encoding='utf-8') as author_email_file:
+    csv_file_path, author_email_map_path, checkpoint, author_ids = prepare_outputs(project_name, output_key, incremental)
+    mode = 'w' if checkpoint is None else 'a'
+    manifest_writer = FileManifestWriter(manifest_path(output_key), project_name) if manifest else None
+
+    with open(csv_file_path, mode, newline='', encoding='utf-8') as csv_file, \
+         open(author_email_map_path, mode, newline='', encoding='utf-8') as author_email_file:
 
         csv_writer = csv.writer(csv_file)
         author_email_writer = csv.writer(author_email_file)
 
-        csv_writer.writerow(["CommitHash", "ProjectName", "AuthorID", "AuthorDate", "AuthorTimezone", "ModifiedFilename", "ChangeType", "AddedLines", "DeletedLines", "SourceCodeBeforeFilePath", "SourceCodeFilePath"])
-        author_email_writer.writerow(["AuthorID", "AuthorEmail"])
+        if checkpoint is None:
+            csv_writer.writerow(CSV_HEADER)
+            author_email_writer.writerow(AUTHOR_EMAIL_HEADER)
+
+        frontier = checkpoint_frontier(checkpoint)
+        unsaved, saved_at = 0, time.monotonic()
+        with resolve_repository(repo_url) as source:
+            for commit in traverse_matching_commits(source, path_filter, frontier):
+                process_commit(commit, project_name, python_files_directory, csv_writer, author_email_writer, author_ids, blob_store_directory, manifest_writer,
+                               attributes, path_filter)
+                unsaved += 1
+                if unsaved >= checkpoint_every_commits or time.monotonic() - saved_at >= checkpoint_every_seconds:
+                    save_checkpoint(output_key, frontier, csv_file, author_email_file, manifest_writer)
+                    unsaved, saved_at = 0, time.monotonic()
+        if unsaved:
+            save_checkpoint(output_key, frontier, csv_file, author_email_file, manifest_writer)
+
+    if manifest_writer is not None:
+        manifest_writer.close()
+    return csv_file_path
+
+def resolve_repository(repo_url):
+    """
+    Context manager giving the path or URL to mine from: the local mirror when
+    the cache is enabled, kept from eviction by other jobs until the block exits.
+    """
+    return use_mirror(repo_url) if use_mirror_cache else nullcontext(repo_url)
+
+def clone_repository(repo_url, destination, shared=False):
+    """Clones a repository; `shared` borrows the objects of a local source clone."""
+    command = ['git', 'clone', '--quiet']
+    if shared:
+        command.append('--shared')
+    subprocess.run(command + [repo_url, destination], check=True)
+    return destination
+
+def split_commit_hashes(commit_hashes, chunks):
+    """Splits the commit list into contiguous chunks of near-equal size."""
+    chunk_size, remainder = divmod(len(commit_hashes), chunks)
+    result, start = [], 0
+    for chunk_index in range(chunks):
+        end = start + chunk_size + (1 if chunk_index < remainder else 0)
+        if end > start:
+            result.append(commit_hashes[start:end])
+        start = end
+    return result
+
+def extract_commit_chunk(chunk_index, source_path, commit_hashes, project_name, python_files_directory, work_directory, blob_store_directory=None,
+                         profile='sources', path_filter=PYTHON_FILES):
+    """
+    Worker entry point for `extract_data_parallel`.
+    Mines one chunk of commits from a private clone and writes partial CSV files.
+    The commits are processed in the order of `commit_hashes` (parents before
+    children, like the serial traversal), not in PyDriller's date order.
+    """
+    worker_clone = clone_repository(source_path, os.path.join(work_directory, f"clone_{chunk_index}"), shared=True)
+    part_csv_path = os.path.join(work_directory, f"part_{chunk_index}_data.csv")
+    part_author_path = os.path.join(work_directory, f"part_{chunk_index}_AuthorEmail.csv")
+
+    with open(part_csv_path, 'w', newline='', encoding='utf-8') as csv_file, \
+         open(part_author_path, 'w', newline='', encoding='utf-8') as author_email_file:
 
+        csv_writer = csv.writer(csv_file)
+        author_email_writer = csv.writer(author_email_file)
         author_ids = {}
+        attributes = profile_attributes(profile)
+
+        git = Git(worker_clone)
+        try:
+            for commit_hash in commit_hashes:
+                process_commit(git.get_commit(commit_hash), project_name, python_files_directory, csv_writer, author_email_writer, author_ids,
+                               blob_store_directory, attributes=attributes, path_filter=path_filter)
+        finally:
+            git.clear()
+
+    return part_csv_path, part_author_path
+
+def extract_data_parallel(repo_url, workers, incremental=False, blob_store=False, profile='sources', path_filter=PYTHON_FILES):
+    """
+    Extracts data like `extract_data`, splitting the commit history into
+    contiguous chunks that are mined by `workers` processes, each from its own clone.
+    Partial outputs are merged in commit order, so the CSV and the author email
+    map are identical to a serial run. The checkpoint is only advanced once the
+    merge is complete.
+    """
+    parsed_url = urlparse(repo_url)
+    project_name = parsed_url.path.split('/')[-1]
+    output_key = repository_key(repo_url)
+    python_files_directory = os.path.join('PythonFiles', output_key)
+    blob_store_directory = os.path.join('PythonBlobs', output_key) if blob_store else None
 
-        for commit in Repository(repo_url).traverse_commits():
-            print(f"Processing commit {commit.hash}...")
-
-            for index, modified_file in enumerate(commit.modified_files, start=1):
-                if modified_file.filename.endswith('.py'):
-                    print(f"  File #{index}: {modified_file.filename}")
-
-                    author_email = commit.author.email
-                    author_id = hash_author_email(author_email)
-                    if author_email not in author_ids:
-                        author_ids[author_email] = author_id
-                        author_email_writer.writerow([author_id, author_email])
-
-                    commit_directory = os.path.join(python_files_directory, author_id, commit.hash)
-                    before_filename = format_filename(commit.hash, project_name, author_id, commit.author_date, "before", index)
-                    after_filename = format_filename(commit.hash, project_name, author_id, commit.author_date, "after", index)
-
-                    # Normalize timezone
-                    normalized_date = commit.author_date.astimezone(pytz.timezone('UTC'))
-                    normalized_timezone = '+0000' if normalized_date.utcoffset() == timedelta(0) else normalized_date.strftime('%z')
-
-                    before_file_path = write_code_to_file(commit_directory, before_filename, modified_file.source_code_before)
-                    after_file_path = write_code_to_file(commit_directory, after_filename, modified_file.source_code)
-
-                    csv_writer.writerow([
-                        commit.hash,
-                        project_name,
-                        author_id,
-                        normalized_date.strftime("%Y-%m-%d %H:%M:%S"),
-                        normalized_timezone,
-                        modified_file.filename,
-                        modified_file.change_type.name,
-                        modified_file.added_lines,
-                        modified_file.deleted_lines,
-                        before_file_path,
-                        after_file_path
-                    ])
+    csv_file_path, author_email_map_path, checkpoint, author_ids = prepare_outputs(project_name, output_key, incremental)
+    mode = 'w' if checkpoint is None else 'a'
+
+    work_directory = tempfile.mkdtemp(prefix=f"{project_name}_mining_")
+    mirror = ExitStack()
+    try:
+        # A single clone to list the history; workers clone from it locally
+        if use_mirror_cache or os.path.isdir(repo_url):
+            source_path = mirror.enter_context(resolve_repository(repo_url))
+        else:
+            source_path = clone_repository(repo_url, os.path.join(work_directory, 'source'))
+
+        frontier = checkpoint_frontier(checkpoint)
+        # Only the commits touching a matching path are split across the workers
+        commit_graph = path_filter.commit_graph(source_path, frontier.tips)
+        commit_hashes = [commit_hash for commit_hash, _ in commit_graph]
+        if not commit_hashes:
+            logger.info(f"No new commits in {project_name}.")
+            return csv_file_path
+
+        chunks = split_commit_hashes(commit_hashes, workers)
+        logger.info(f"Mining {len(commit_hashes)} commits in {len(chunks)} chunks...")
+        # The workers count in their own processes; only the commit total reaches this run's report
+        profiler.count('commits', len(commit_hashes))
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(extract_commit_chunk, chunk_index, source_path, chunk,
+                                project_name, python_files_directory, work_directory, blob_store_directory, profile, path_filter)
+                for chunk_index, chunk in enumerate(chunks)
+            ]
+            # Collect in submission order so the merge is deterministic
+            parts = [future.result() for future in futures]
+
+        with open(csv_file_path, mode, newline='', encoding='utf-8') as csv_file, \
+             open(author_email_map_path, mode, newline='', encoding='utf-8') as author_email_file:
+
+            csv_writer = csv.writer(csv_file)
+            author_email_writer = csv.writer(author_email_file)
+
+            if checkpoint is None:
+                csv_writer.writerow(CSV_HEADER)
+                author_email_writer.writerow(AUTHOR_EMAIL_HEADER)
+
+            for part_csv_path, part_author_path in parts:
+                with open(part_csv_path, newline='', encoding='utf-8') as part_file:
+                    csv_writer.writerows(csv.reader(part_file))
+                with open(part_author_path, newline='', encoding='utf-8') as part_file:
+                    for author_id, author_email in csv.reader(part_file):
+                        if author_email not in author_ids:
+                            author_ids[author_email] = author_id
+                            author_email_writer.writerow([author_id, author_email])
+
+            for commit_hash, parents in commit_graph:
+                frontier.add(commit_hash, parents)
+            save_checkpoint(output_key, frontier, csv_file, author_email_file)
+    finally:
+        mirror.close()
+        safe_delete_directory(work_directory)
+
+    return csv_file_path
 
 # Main execution starts here
 repo_urls = [
     "https://github.com/ishepard/pydriller"
 ]
 
-for repo_url in repo_urls:
-    print(f"Processing repository: {repo_url}")
-    extract_data(repo_url)
-    print("Data extraction completed.")
+# Mine from a local bare mirror kept up to date with fetches (see RepoMirrorCache.py)
+use_mirror_cache = True
+
+# Number of worker processes per repository (1 mines serially)
+mining_workers = 1
+
+# Only mine commits added since the previous run
+incremental_mining = False
+
+# Serial mining saves its checkpoint after this many commits or seconds, whichever comes first
+checkpoint_every_commits = 100
+checkpoint_every_seconds = 60
+
+# Store each distinct source once in a content-addressed store (PythonBlobs)
+use_blob_store = False
+
+# Record file metadata in FileManifest/<owner>.<name>.manifest and name snapshots by id (serial mining only)
+use_file_manifest = False
+
+# Which PyDriller attributes are read: 'metadata-only', 'sources' or 'full' (see ExtractionProfiles.py)
+extraction_profile = 'sources'
+
+# Paths recorded by the miner (git pathspec rules, see PathFilter.py), e.g. exclude_globs = ['tests/', '*/migrations/*']
+include_globs = ['*.py']
+exclude_globs = []
+
+# Also export the commit table to the partitioned Parquet dataset (see ColumnarStore.py)
+export_columnar = False
+
+# Logging level ('DEBUG' lists every commit and file) and optional per-stage cProfile/tracemalloc capture.
+# Each run writes its timing report to RunReports (see RunProfiler.py).
+log_level = 'INFO'
+profile_functions = False
+trace_memory = False
+
+if __name__ == "__main__":
+    configure_logging(log_level)
+    profiler = RunProfiler('TrialPyDriller', cprofile=profile_functions, trace_memory=trace_memory)
+    try:
+        for repo_url in repo_urls:
+            logger.info(f"Processing repository: {repo_url}")
+            with profiler.stage('mine'):
+                csv_file_path = extract_data(repo_url, workers=mining_workers, incremental=incremental_mining, blob_store=use_blob_store,
+                                             manifest=use_file_manifest, profile=extraction_profile,
+                                             path_filter=PathFilter(include_globs, exclude_globs))
+            if export_columnar:
+                with profiler.stage('export_columnar'):
+                    export_commits_csv(csv_file_path)
+            logger.info("Data extraction completed.")
+    finally:
+        profiler.write_report()
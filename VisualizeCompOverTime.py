@@ -2,7 +2,13 @@ import plotly.express as px
 import pandas as pd
 import numpy as np
 import json
+import logging
 import os
+from collections import defaultdict
+from ColumnarStore import read_competency
+from CompetencyStore import RollupStore
+from CompetencyDashboard import serve
+from RunProfiler import RunProfiler, configure_logging
 
 # Get the current working directory
 current_directory = os.getcwd()
@@ -10,56 +16,117 @@ current_directory = os.getcwd()
 # Specify the directory containing JSON files
 directory_path = r"C:\Users\rujip\Desktop\SP2023-Greeedhub\CompetencyScore\JSON\pydriller"  # Update this path to your directory
 
-# Verify directory path and list all JSON files in the directory
-if os.path.exists(directory_path):
-    json_files = [f for f in os.listdir(directory_path) if f.endswith('.json')]
-    print(f"Found {len(json_files)} JSON files.")
-else:
-    print(f"Directory does not exist: {directory_path}")
-    json_files = []
-
-# Initialize an empty list to store DataFrames from each file
-dfs = []
-
-# Check if JSON files were found
-if not json_files:
-    print("No JSON files found. Exiting script.")
-    exit()
-
-# Iterate over each JSON file
-for file_name in json_files:
-    # Construct the full file path
-    file_path = os.path.join(directory_path, file_name)
-
-    try:
-        # Load JSON data
-        with open(file_path, "r") as f:
-            data = json.load(f)
-
-        # Extracting the Levels data for the initial date
-        initial_levels_data = data.get("Levels", {}).get("After", {})
-
-        # Constructing the DataFrame for the initial date
-        df = pd.DataFrame([
-            {
-                "Year": int(data["AuthorDateFormat"][:4]),
-                "Month": int(data["AuthorDateFormat"][4:6]),
-                "Day": int(data["AuthorDateFormat"][6:8]),
-                "Level": level,
-                "Value": initial_levels_data.get(level, 0)
-            }
-            for level in ["A1", "A2", "B1", "B2", "C1", "C2"]
-        ])
-
-        # Append the DataFrame to the list
-        dfs.append(df)
-    except Exception as e:
-        print(f"Error processing file {file_name}: {e}")
-
-# Proceed only if there are DataFrames to concatenate
-if dfs:
-    final_df = pd.concat(dfs, ignore_index=True)
-
+# Load the partitioned Parquet dataset (see ColumnarStore.py) instead of the JSON files
+use_columnar = False
+project_name = 'pydriller'
+
+# Load only the monthly rollups kept up to date by the aggregation scripts (see CompetencyStore.RollupStore)
+use_rollups = False
+rollup_store_path = r"C:\Users\rujip\Desktop\SP2023-Greeedhub\CompetencyScore\rollups.sqlite"
+
+competency_levels = ["A1", "A2", "B1", "B2", "C1", "C2"]
+
+# Serve an interactive dashboard instead of one figure with every data point (see CompetencyDashboard.py)
+dashboard_mode = False
+competency_store_path = r"C:\Users\rujip\Desktop\SP2023-Greeedhub\CompetencyScore\competency.sqlite"
+
+# Logging level and optional per-stage cProfile/tracemalloc capture; the run report goes to RunReports (see RunProfiler.py)
+log_level = 'INFO'
+profile_functions = False
+trace_memory = False
+
+logger = logging.getLogger('VisualizeCompOverTime')
+profiler = RunProfiler('VisualizeCompOverTime', cprofile=profile_functions, trace_memory=trace_memory)
+
+def load_rollups():
+    """Monthly After totals of the project from the rollup store, a handful of rows per month."""
+    if not os.path.exists(rollup_store_path):
+        # RollupStore would create an empty database at a misspelled path
+        raise FileNotFoundError(f"No rollup store at {rollup_store_path}")
+    rollup_store = RollupStore(rollup_store_path)
+    monthly = defaultdict(dict)
+    for period, level, after, before, difference, commits in rollup_store.rollups(project_name, period_type='month'):
+        monthly[period][level] = after
+    rollup_store.close()
+    return pd.DataFrame([
+        {
+            "Year": int(period[:4]),
+            "Month": int(period[5:7]),
+            "Level": level,
+            "Value": levels.get(level, 0)
+        }
+        for period, levels in monthly.items()
+        for level in competency_levels
+    ])
+
+def load_columnar():
+    """The project's After values from the columnar dataset; only the needed columns are read."""
+    competency = read_competency(columns=['AuthorDate', 'Level', 'After'],
+                                 filters=[('ProjectName', '=', project_name)])
+    author_dates = pd.to_datetime(competency['AuthorDate'])
+    return pd.DataFrame({
+        "Year": author_dates.dt.year,
+        "Month": author_dates.dt.month,
+        "Day": author_dates.dt.day,
+        "Level": competency['Level'].astype(str),
+        "Value": competency['After']
+    })
+
+def load_json_files():
+    """One DataFrame per summary JSON file of directory_path."""
+    dfs = []
+
+    # Verify directory path and list all JSON files in the directory
+    if os.path.exists(directory_path):
+        json_files = [f for f in os.listdir(directory_path) if f.endswith('.json')]
+        logger.info(f"Found {len(json_files)} JSON files.")
+    else:
+        logger.error(f"Directory does not exist: {directory_path}")
+        json_files = []
+
+    # Iterate over each JSON file
+    for file_name in json_files:
+        # Construct the full file path
+        file_path = os.path.join(directory_path, file_name)
+
+        try:
+            # Load JSON data
+            with open(file_path, "r") as f:
+                data = json.load(f)
+
+            # Extracting the Levels data for the initial date
+            initial_levels_data = data.get("Levels", {}).get("After", {})
+
+            # Constructing the DataFrame for the initial date
+            df = pd.DataFrame([
+                {
+                    "Year": int(data["AuthorDateFormat"][:4]),
+                    "Month": int(data["AuthorDateFormat"][4:6]),
+                    "Day": int(data["AuthorDateFormat"][6:8]),
+                    "Level": level,
+                    "Value": initial_levels_data.get(level, 0)
+                }
+                for level in ["A1", "A2", "B1", "B2", "C1", "C2"]
+            ])
+
+            # Append the DataFrame to the list
+            dfs.append(df)
+            profiler.count('files')
+        except Exception as e:
+            logger.warning(f"Error processing file {file_name}: {e}")
+    return dfs
+
+def load_data():
+    """The DataFrames to plot, from the source selected above; empty ones are left out."""
+    if use_rollups:
+        dfs = [load_rollups()]
+    elif use_columnar:
+        dfs = [load_columnar()]
+    else:
+        dfs = load_json_files()
+    return [df for df in dfs if not df.empty]
+
+def plot(final_df):
     # Sort the DataFrame by year and month
     final_df = final_df.sort_values(by=['Year', 'Month'])
 
@@ -97,5 +164,26 @@ if dfs:
     fig.update_traces(marker=dict(sizemode='area', sizeref=0.1, sizemin=4.0))
 
     fig.show()
-else:
-    print("No data to process. Please check the input files and directory path.")
+
+def main():
+    configure_logging(log_level)
+    try:
+        if dashboard_mode:
+            serve(competency_store_path, rollup_store_path)
+            return
+
+        with profiler.stage('load'):
+            dfs = load_data()
+
+        # Proceed only if there are DataFrames to concatenate
+        if not dfs:
+            logger.error("No data to process. Please check the input files and directory path.")
+            return
+
+        with profiler.stage('plot'):
+            plot(pd.concat(dfs, ignore_index=True))
+    finally:
+        profiler.write_report()
+
+if __name__ == '__main__':
+    main()
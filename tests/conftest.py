@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# The modules under test are scripts in the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+@pytest.fixture(scope='session')
+def pycefr_dir():
+    """PyCEFR checkout named by PYCEFR_DIR; tests that run PyCEFR are skipped without one."""
+    pycefr_dir = os.environ.get('PYCEFR_DIR')
+    if not pycefr_dir or not os.path.exists(os.path.join(pycefr_dir, 'pycerfl.py')):
+        pytest.skip('set PYCEFR_DIR to a PyCEFR checkout to run PyCEFR')
+    return pycefr_dir
+
+@pytest.fixture(scope='session')
+def stub_pycefr_dir():
+    """A stand-in PyCEFR checkout (dict.py and pycerfl.py) counting a level per AST node type, run by every test run."""
+    return os.path.join(os.path.dirname(__file__), 'fixtures', 'pycefr')
+
+class GitRepo:
+    """A repository built commit by commit, for the mining tests."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        os.makedirs(self.path, exist_ok=True)
+        self.git('init', '--quiet', '--initial-branch=main')
+
+    def git(self, *arguments, date='2023-01-01T00:00:00+00:00'):
+        environment = dict(os.environ, GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+        result = subprocess.run(['git', '-C', self.path, '-c', 'user.name=Dev', '-c', 'user.email=dev@example.com', *arguments],
+                                check=True, capture_output=True, text=True, env=environment)
+        return result.stdout.strip()
+
+    def commit(self, message, date, files):
+        """Writes `files` (path -> content) and commits them; returns the commit hash."""
+        for path, content in files.items():
+            os.makedirs(os.path.dirname(os.path.join(self.path, path)) or self.path, exist_ok=True)
+            with open(os.path.join(self.path, path), 'w', encoding='utf-8') as file:
+                file.write(content)
+        self.git('add', '--all')
+        self.git('commit', '--quiet', '-m', message, date=date)
+        return self.git('rev-parse', 'HEAD')
+
+@pytest.fixture
+def branched_repo(tmp_path):
+    """
+    A history whose side branch commits are older than the main branch
+    commits they are listed after, so date order is not topological order.
+    """
+    repo = GitRepo(tmp_path / 'demo')
+    repo.commit('base', '2023-01-01T00:00:00+00:00', {'base.py': 'x = 1\n'})
+    repo.git('branch', 'side')
+    repo.commit('m1', '2023-01-03T00:00:00+00:00', {'main.py': 'y = [1]\n'})
+    repo.commit('m2', '2023-01-04T00:00:00+00:00', {'main.py': 'y = [1, 2]\n'})
+    repo.git('checkout', '--quiet', 'side')
+    repo.commit('s1', '2023-01-02T00:00:00+00:00', {'side.py': 'z = 1\n'})
+    repo.commit('s2', '2023-01-05T00:00:00+00:00', {'side.py': 'z = 2\n', 'notes.txt': 'not Python\n'})
+    repo.git('checkout', '--quiet', 'main')
+    repo.git('merge', '--quiet', '--no-ff', '-m', 'merge side', 'side', date='2023-01-06T00:00:00+00:00')
+    repo.commit('m3', '2023-01-07T00:00:00+00:00', {'base.py': 'x = 2\n'})
+    return repo
@@ -0,0 +1,7 @@
+# Stand-in for PyCEFR's dict.py in the tests: writes the level of each node type to dicc.txt
+LEVELS = {'List': 'A1', 'Call': 'A1', 'Import': 'A1', 'ImportFrom': 'A2', 'For': 'A2', 'FunctionDef': 'B1',
+          'ListComp': 'B1', 'ClassDef': 'B2', 'DictComp': 'B2', 'Yield': 'C1'}
+
+with open('dicc.txt', 'w') as file:
+    for node_type, level in LEVELS.items():
+        file.write(f"{node_type} {level}\n")
@@ -0,0 +1,38 @@
+# Stand-in for PyCEFR's pycerfl.py in the tests: `python pycerfl.py directory <path>` counts a level
+# per node of the types in dicc.txt, for each Python file under <path>, and writes the counts to
+# DATA_JSON like PyCEFR. Files that do not parse get no result; a file containing BREAK_PYCEFR
+# makes the whole run fail.
+import ast
+import json
+import os
+import sys
+
+from levels import read_dictionary
+
+if len(sys.argv) != 3 or sys.argv[1] != 'directory':
+    sys.exit(2)
+
+dictionary = read_dictionary('dicc.txt')
+results = {}
+for root, _, file_names in os.walk(sys.argv[2]):
+    for file_name in sorted(file_names):
+        if not file_name.endswith('.py'):
+            continue
+        with open(os.path.join(root, file_name), encoding='utf-8') as file:
+            source = file.read()
+        if 'BREAK_PYCEFR' in source:
+            raise ValueError(f"cannot analyze {file_name}")
+        try:
+            tree = ast.parse(source)
+        except SyntaxError:
+            continue
+        levels = {}
+        for node in ast.walk(tree):
+            level = dictionary.get(type(node).__name__)
+            if level:
+                levels[level] = levels.get(level, 0) + 1
+        results[file_name] = {'Levels': levels}
+
+os.makedirs('DATA_JSON', exist_ok=True)
+with open(os.path.join('DATA_JSON', 'directory.json'), 'w') as file:
+    json.dump({os.path.basename(os.path.normpath(sys.argv[2])): results}, file)
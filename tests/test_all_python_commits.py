@@ -0,0 +1,94 @@
+import csv
+import importlib
+import logging
+
+import pytest
+
+pytest.importorskip('pydriller')
+
+from RepoMirrorCache import mirror_name, repository_name
+
+all_python_commits = importlib.import_module('1_AllPythonCommits')
+
+@pytest.fixture
+def export_script(branched_repo, tmp_path, monkeypatch):
+    """Runs the export in an empty directory, from a mirror of the fixture repository."""
+    work_dir = tmp_path / 'work'
+    work_dir.mkdir()
+    monkeypatch.chdir(work_dir)
+    monkeypatch.setattr(all_python_commits, 'repo_url', f"file://{branched_repo.path}")
+    monkeypatch.setattr(all_python_commits, 'output_folder', str(work_dir / 'output'))
+    return all_python_commits
+
+def read_rows(csv_path):
+    with open(csv_path, newline='', encoding='utf-8') as csv_file:
+        return list(csv.DictReader(csv_file))
+
+def test_repository_name_matches_pydriller_not_the_mirror():
+    assert repository_name('https://github.com/apache/airflow.git') == 'airflow'
+    assert repository_name('https://github.com/apache/airflow/') == 'airflow'
+    assert mirror_name('https://github.com/apache/airflow.git').startswith('airflow.git_')
+
+@pytest.mark.parametrize('bulk_export', [False, True])
+def test_rows_mined_from_a_mirror_name_the_repository(export_script, monkeypatch, bulk_export):
+    monkeypatch.setattr(export_script, 'bulk_export', bulk_export)
+    export_script.main()
+
+    rows = read_rows(f"{export_script.output_folder}/all_python_commits.csv")
+    assert sorted(row['filename'] for row in rows) == ['base.py', 'base.py', 'main.py', 'main.py', 'side.py', 'side.py']
+    assert {(row['project_name'], row['project_path']) for row in rows} == {('demo', export_script.repo_url)}
+
+def test_bulk_export_writes_the_same_rows_as_the_per_row_export(export_script, tmp_path, monkeypatch):
+    export_script.main()
+    per_row = read_rows(f"{export_script.output_folder}/all_python_commits.csv")
+
+    # By default without the expensive columns
+    monkeypatch.setattr(export_script, 'output_folder', str(tmp_path / 'bulk'))
+    monkeypatch.setattr(export_script, 'bulk_export', True)
+    export_script.main()
+    assert read_rows(f"{export_script.output_folder}/all_python_commits.csv") == \
+        [{field: row[field] for field in export_script.DEFAULT_EXPORT_FIELDS} for row in per_row]
+
+    monkeypatch.setattr(export_script, 'output_folder', str(tmp_path / 'full'))
+    monkeypatch.setattr(export_script, 'extraction_profile', 'full')
+    export_script.main()
+    assert read_rows(f"{export_script.output_folder}/all_python_commits.csv") == per_row
+
+def test_export_commits_writes_only_the_selected_fields_in_batches(branched_repo, tmp_path):
+    from pydriller import Repository
+
+    output = tmp_path / 'commits.csv'
+    commits = Repository(str(branched_repo.path)).traverse_commits()
+    written = all_python_commits.export_commits(commits, output, fields=['hash', 'filename', 'added_lines'], batch_size=2)
+
+    rows = read_rows(output)
+    assert written == len(rows) == 6
+    assert list(rows[0]) == ['hash', 'filename', 'added_lines']
+    assert all(row['filename'].endswith('.py') for row in rows)
+
+def test_export_commits_takes_the_fields_of_the_extraction_profile(branched_repo, tmp_path, monkeypatch):
+    from pydriller import Repository
+
+    monkeypatch.setattr(all_python_commits, 'extraction_profile', 'metadata-only')
+    output = tmp_path / 'commits.csv'
+    all_python_commits.export_commits(Repository(str(branched_repo.path)).traverse_commits(), output)
+
+    columns = list(read_rows(output)[0])
+    assert columns == all_python_commits.profile_fields('metadata-only')
+    assert 'source_code' not in columns and 'branches' not in columns
+
+def test_export_commits_leaves_out_the_expensive_fields_by_default(branched_repo, tmp_path, caplog):
+    from pydriller import Repository
+
+    output = tmp_path / 'commits.csv'
+    with caplog.at_level(logging.INFO, logger='AllPythonCommits'):
+        all_python_commits.export_commits(Repository(str(branched_repo.path)).traverse_commits(), output, progress_interval=2)
+
+    columns = list(read_rows(output)[0])
+    assert columns == all_python_commits.DEFAULT_EXPORT_FIELDS
+    assert not set(columns) & {'diff_parsed', 'methods', 'methods_before', 'changed_methods'}
+    assert 'Exported 6 rows from 7 commits to' in caplog.text
+
+def test_export_commits_rejects_unknown_fields(tmp_path):
+    with pytest.raises(ValueError, match='no_such_field'):
+        all_python_commits.export_commits([], tmp_path / 'commits.csv', fields=['hash', 'no_such_field'])
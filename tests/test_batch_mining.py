@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+pytest.importorskip('pydriller')
+pytest.importorskip('pandas')
+
+import BatchMining
+from conftest import GitRepo
+
+def write_manifest(path, rows):
+    path.write_text('URL,Commits\n' + ''.join(f"{url},{count}\n" for url, count in rows), encoding='utf-8')
+    return str(path)
+
+def test_manifest_urls_are_read_once_with_their_counts(tmp_path):
+    manifest = write_manifest(tmp_path / 'repos.csv', [
+        ('https://github.com/owner/a', 10), (' https://github.com/owner/b ', ''), ('https://github.com/owner/a', 3), ('', 5)])
+    assert BatchMining.read_manifest(manifest) == [('https://github.com/owner/a', 10), ('https://github.com/owner/b', None)]
+
+def test_batch_mines_each_repository_and_records_failures(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(BatchMining, 'poll_interval', 0.05)
+    repos = []
+    for name in ('alpha', 'beta'):
+        repo = GitRepo(tmp_path / 'repos' / name)
+        repo.commit('first', '2023-01-01T00:00:00+00:00', {f"{name}.py": 'x = 1\n'})
+        repos.append(repo)
+    missing = str(tmp_path / 'repos' / 'missing')
+    manifest = write_manifest(tmp_path / 'repos.csv', [(repos[0].path, 1), (repos[1].path, 5), (missing, 1)])
+
+    BatchMining.run_batch(manifest, status_path='status.json', max_jobs=2, retries=1, count_missing=False)
+
+    with open(tmp_path / 'status.json', encoding='utf-8') as status_file:
+        status = json.load(status_file)
+    assert {key: (entry['status'], entry['attempts']) for key, entry in status.items()} == \
+        {'alpha': ('done', 1), 'beta': ('done', 1), BatchMining.repository_key(missing): ('failed', 2)}
+    for name in ('alpha', 'beta'):
+        rows = (tmp_path / 'PythonCommits_data' / f"{name}_data.csv").read_text(encoding='utf-8').splitlines()
+        assert len(rows) == 2 and f",{name}.py," in rows[1]
+
+def test_finished_repositories_are_skipped_by_the_next_batch(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(BatchMining, 'poll_interval', 0.05)
+    repo = GitRepo(tmp_path / 'repos' / 'alpha')
+    repo.commit('first', '2023-01-01T00:00:00+00:00', {'alpha.py': 'x = 1\n'})
+    manifest = write_manifest(tmp_path / 'repos.csv', [(repo.path, 1)])
+    BatchMining.run_batch(manifest, status_path='status.json', count_missing=False)
+
+    started = []
+    monkeypatch.setattr(BatchMining.multiprocessing, 'Process', lambda *args, **kwargs: started.append(kwargs))
+    BatchMining.run_batch(manifest, status_path='status.json', count_missing=False)
+    assert started == []
@@ -0,0 +1,47 @@
+import csv
+
+import pytest
+
+pytest.importorskip('pyarrow')
+pytest.importorskip('pandas')
+
+from ColumnarStore import CompetencyParquetWriter, export_commits_csv, read_commits, read_competency
+
+def write_run(root, summaries, batch_rows=100_000):
+    writer = CompetencyParquetWriter(str(root), batch_rows=batch_rows)
+    for commit_hash, project_name, after in summaries:
+        writer.write_summary(commit_hash, project_name, 'author01', '20230105', '120000', after, {}, after)
+    writer.close()
+
+def rows(frame):
+    return sorted(zip(frame['CommitHash'], frame['Level'].astype(str), frame['After']))
+
+def test_competency_rows_are_read_back_per_project(tmp_path):
+    write_run(tmp_path, [('c1', 'demo', {'A1': 2, 'B1': 1}), ('c2', 'other', {'A2': 4}), ('c3', 'demo', {'A1': 1})], batch_rows=2)
+    demo = read_competency(filters=[('ProjectName', '=', 'demo')], root=str(tmp_path))
+    assert rows(demo) == [('c1', 'A1', 2), ('c1', 'B1', 1), ('c3', 'A1', 1)]
+    assert str(demo['AuthorDate'].iloc[0]) == '2023-01-05 12:00:00'
+
+def test_a_rerun_replaces_only_the_projects_it_writes(tmp_path):
+    write_run(tmp_path, [('c1', 'demo', {'A1': 2}), ('c2', 'other', {'A2': 4})])
+    write_run(tmp_path, [('c1', 'demo', {'A1': 5})])
+    assert rows(read_competency(root=str(tmp_path))) == [('c1', 'A1', 5), ('c2', 'A2', 4)]
+
+def test_commit_csv_export_is_typed_and_replaced_on_rerun(tmp_path):
+    csv_path = tmp_path / 'demo_data.csv'
+    header = ['CommitHash', 'ProjectName', 'AuthorID', 'AuthorDate', 'AuthorTimezone', 'ModifiedFilename', 'ChangeType',
+              'AddedLines', 'DeletedLines', 'SourceCodeBeforeFilePath', 'SourceCodeFilePath', 'OldPath', 'NewPath', 'AuthorLocalOffset']
+    with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(header)
+        writer.writerow(['c1', 'demo', 'author01', '2023-01-05 21:30:00', '+0000', 'a.py', 'ADD', 3, 0, '', 'x/a.py', '', 'a.py', '+0200'])
+        writer.writerow(['c2', 'demo', 'author01', '2023-01-06 06:15:00', '+0000', 'a.py', 'MODIFY', 1, 1, 'x/a.py', 'y/a.py', 'a.py', 'a.py', '-0500'])
+
+    root = str(tmp_path / 'commits')
+    export_commits_csv(str(csv_path), root)
+    export_commits_csv(str(csv_path), root)
+    commits = read_commits(root=root)
+    assert list(commits['CommitHash']) == ['c1', 'c2']
+    assert str(commits['AuthorDate'].dt.tz) == 'UTC'
+    assert commits['AddedLines'].tolist() == [3, 1]
+    assert commits['SourceCodeBeforeFilePath'].isna().tolist() == [True, False]
@@ -0,0 +1,105 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import HTTPServer
+
+import pytest
+
+from CompetencyDashboard import DashboardData, DashboardHandler, downsample
+from CompetencyStore import CompetencyStore, RollupStore
+
+def write_store(store_class, path, summaries):
+    store = store_class(str(path))
+    for commit_hash, author_id, date, after in summaries:
+        store.write_summary(commit_hash, 'demo', author_id, date, '120000', after, {}, after)
+    store.close()
+
+SUMMARIES = [
+    ('c1', 'author01', '20230105', {'A1': 3, 'B1': 1}),
+    ('c2', 'author02', '20230110', {'A1': 2}),
+    ('c3', 'author01', '20230301', {'B1': 4}),
+]
+
+@pytest.fixture
+def competency_data(tmp_path):
+    write_store(CompetencyStore, tmp_path / 'competency.sqlite', SUMMARIES)
+    data = DashboardData(str(tmp_path / 'competency.sqlite'), str(tmp_path / 'rollups.sqlite'))
+    yield data
+    data.close()
+
+def test_downsample_sums_consecutive_bins():
+    labels, values = downsample(['a', 'b', 'c', 'd', 'e'], {'A1': [1, 2, 3, 4, 5]}, 2)
+    assert labels == ['a', 'd']
+    assert values == {'A1': [6, 9]}
+    assert downsample(['a', 'b'], {'A1': [1, 2]}, 5) == (['a', 'b'], {'A1': [1, 2]})
+
+def test_series_aggregates_each_period(competency_data):
+    series = competency_data.series('demo')
+    assert series['labels'] == ['2023-01', '2023-03']
+    assert series['series']['A1'] == [5, 0]
+    assert series['series']['B1'] == [1, 4]
+    assert competency_data.series('demo', author_id='author02', metric='commits')['series']['A1'] == [1]
+    assert competency_data.series('demo', start='2023-02-01')['labels'] == ['2023-03']
+    assert competency_data.series('demo', max_points=1) == {
+        'period': 'month', 'metric': 'after', 'bins': 2, 'labels': ['2023-01'],
+        'series': {'A1': [5], 'A2': [0], 'B1': [5], 'B2': [0], 'C1': [0], 'C2': [0]}}
+
+def test_queries_are_cached_until_the_database_changes(competency_data, tmp_path):
+    assert competency_data.projects() == ['demo']
+    assert competency_data.authors('demo') == ['author01', 'author02']
+    competency_data.series('demo')
+    competency_data.series('demo')
+    assert competency_data._series.cache_info().hits == 1
+
+    write_store(CompetencyStore, tmp_path / 'competency.sqlite', [('c4', 'author03', '20230401', {'C1': 1})])
+    assert competency_data.authors('demo') == ['author01', 'author02', 'author03']
+    assert competency_data.series('demo')['labels'] == ['2023-01', '2023-03', '2023-04']
+
+def test_rollups_answer_when_there_is_no_competency_store(tmp_path):
+    write_store(RollupStore, tmp_path / 'rollups.sqlite', SUMMARIES)
+    data = DashboardData(str(tmp_path / 'competency.sqlite'), str(tmp_path / 'rollups.sqlite'))
+    try:
+        assert data.periods == ['month', 'week']
+        assert data.series('demo')['series']['A1'] == [5, 0]
+        with pytest.raises(ValueError, match='quarter'):
+            data.series('demo', period='quarter')
+    finally:
+        data.close()
+
+def test_missing_stores_are_reported(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        DashboardData(str(tmp_path / 'competency.sqlite'), str(tmp_path / 'rollups.sqlite'))
+
+@pytest.fixture
+def dashboard_url(tmp_path, monkeypatch):
+    """Serves the dashboard from a background thread, which opens the store like serve() does."""
+    write_store(CompetencyStore, tmp_path / 'competency.sqlite', SUMMARIES)
+    server = HTTPServer(('127.0.0.1', 0), DashboardHandler)
+
+    def run():
+        monkeypatch.setattr(DashboardHandler, 'data', DashboardData(str(tmp_path / 'competency.sqlite'), str(tmp_path / 'rollups.sqlite')))
+        server.serve_forever()
+        DashboardHandler.data.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+def get_json(url):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as error:
+        return error.code, json.load(error)
+
+def test_api_serves_series_and_reports_bad_requests(dashboard_url):
+    assert get_json(f"{dashboard_url}/api/projects") == (200, ['demo'])
+    status, series = get_json(f"{dashboard_url}/api/series?project=demo&period=quarter")
+    assert status == 200 and series['labels'] == ['2023-Q1']
+    assert get_json(f"{dashboard_url}/api/series")[0] == 400
+    assert get_json(f"{dashboard_url}/api/series?project=demo&period=fortnight")[0] == 400
+    assert get_json(f"{dashboard_url}/missing")[0] == 404
@@ -0,0 +1,67 @@
+import pytest
+
+from CompetencyStore import CompetencyStore, RollupStore
+
+@pytest.fixture
+def store():
+    store = RollupStore(':memory:')
+    yield store
+    store.close()
+
+@pytest.fixture
+def competency_store():
+    store = CompetencyStore(':memory:')
+    yield store
+    store.close()
+
+def write(store, commit_hash, date, after, before, author_id='author01', project_name='demo'):
+    diff = {level: after.get(level, 0) - before.get(level, 0) for level in set(after) | set(before)}
+    store.write_summary(commit_hash, project_name, author_id, date, '120000', after, before, diff)
+
+def test_rewritten_commit_replaces_its_contribution(store):
+    write(store, 'c1', '20230105', {'A1': 3, 'B1': 1}, {'A1': 1})
+    write(store, 'c2', '20230110', {'A1': 2}, {})
+    write(store, 'c1', '20230105', {'A1': 5}, {'A1': 1})
+    assert store.rollups('demo') == [('2023-01', 'A1', 7, 1, 6, 2)]
+
+def test_rewritten_commit_moves_to_its_new_period(store):
+    write(store, 'c1', '20230105', {'A1': 3}, {})
+    write(store, 'c1', '20230205', {'A1': 3}, {})
+    assert store.rollups('demo') == [('2023-02', 'A1', 3, 0, 3, 1)]
+
+def test_identical_rewrite_is_not_counted_twice(store):
+    for _ in range(3):
+        write(store, 'c1', '20230105', {'A1': 3}, {'A1': 1})
+    assert store.rollups('demo') == [('2023-01', 'A1', 3, 1, 2, 1)]
+
+def test_rollups_filter_by_author_and_period(store):
+    write(store, 'c1', '20230105', {'A1': 3}, {})
+    write(store, 'c2', '20230305', {'A1': 1}, {}, author_id='author02')
+    write(store, 'c3', '20230305', {'A2': 4}, {}, project_name='other')
+    assert store.rollups('demo', author_id='author02') == [('2023-03', 'A1', 1, 0, 1, 1)]
+    assert store.rollups('demo', start='2023-02-01') == [('2023-03', 'A1', 1, 0, 1, 1)]
+    assert store.rollups(None, start='2023-03-01') == [('2023-03', 'A1', 1, 0, 1, 1), ('2023-03', 'A2', 4, 0, 4, 1)]
+
+def test_competency_store_aggregates_per_period(competency_store):
+    write(competency_store, 'c1', '20230105', {'A1': 3, 'B1': 1}, {'A1': 1})
+    write(competency_store, 'c2', '20230220', {'A1': 2}, {}, author_id='author02')
+    assert competency_store.level_aggregates('demo') == [('2023-01', 'A1', 3, 1, 2, 1), ('2023-01', 'B1', 1, 0, 1, 1),
+                                                         ('2023-02', 'A1', 2, 0, 2, 1)]
+    assert competency_store.author_trend('demo', 'author02', 'A1') == [('2023-02', 'A1', 2, 0, 2, 1)]
+    assert competency_store.level_aggregates('demo', end='2023-01-05', period='year') == [
+        ('2023', 'A1', 3, 1, 2, 1), ('2023', 'B1', 1, 0, 1, 1)]
+
+def test_competency_store_rewrite_drops_levels_of_the_old_summary(competency_store):
+    write(competency_store, 'h1', '20230105', {'A1': 1}, {})
+    write(competency_store, 'h1', '20230105', {'B1': 2}, {})
+    assert competency_store.level_aggregates('demo') == [('2023-01', 'B1', 2, 0, 2, 1)]
+    assert [levels for *_, levels in competency_store.commit_levels('demo')] == [{'B1': (2, 0, 2)}]
+
+def test_competency_store_rewrite_replaces_the_files_of_the_commit(competency_store):
+    competency_store.write_files('h1', 'demo', 'author01', '20230105', '120000',
+                                 [('a_after.py', 'after', {'A1': 1}), ('b_after.py', 'after', {'A2': 2})])
+    competency_store.write_files('h1', 'demo', 'author01', '20230105', '120000', [('a_after.py', 'after', {'B1': 3})])
+    rows = competency_store.connection.execute(
+        "SELECT file_name, level, count FROM files JOIN file_levels USING (file_id) ORDER BY file_name, level").fetchall()
+    assert rows == [('a_after.py', 'B1', 3)]
+    assert competency_store.connection.execute("SELECT COUNT(*) FROM file_levels").fetchone() == (1,)
@@ -0,0 +1,19 @@
+import pytest
+
+from ExtractionProfiles import COMMIT_ATTRIBUTES, FILE_ATTRIBUTES, PROFILES, profile_attributes
+
+def test_profiles_widen_from_metadata_to_full():
+    assert profile_attributes('metadata-only') < profile_attributes('sources') < profile_attributes('full')
+    assert profile_attributes('full') == set(COMMIT_ATTRIBUTES) | set(FILE_ATTRIBUTES)
+
+def test_metadata_only_reads_no_sources_methods_or_branches():
+    metadata = profile_attributes('metadata-only')
+    assert not metadata & {'source_code', 'source_code_before', 'diff', 'methods', 'changed_methods', 'branches', 'in_main_branch'}
+
+def test_every_profile_attribute_has_an_extractor():
+    for attributes in PROFILES.values():
+        assert attributes <= set(COMMIT_ATTRIBUTES) | set(FILE_ATTRIBUTES)
+
+def test_unknown_profile_is_rejected_with_the_known_names():
+    with pytest.raises(ValueError, match='metadata-only'):
+        profile_attributes('everything')
@@ -0,0 +1,69 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from FileManifest import (HEADER, MAGIC, RECORD, VERSION, FileManifest, FileManifestWriter, FileRecord,
+                          ManifestIndex, manifest_file_name, manifest_path)
+
+COMMIT_HASH = '0123456789abcdef0123456789abcdef01234567'
+AUTHOR_DATE = datetime(2023, 1, 5, 9, 3, 7)
+
+@pytest.fixture
+def manifest_dir(tmp_path):
+    writer = FileManifestWriter(manifest_path('demo', tmp_path), 'demo')
+    assert writer.add(COMMIT_HASH, 'author01', AUTHOR_DATE, 'before', 0) == 0
+    assert writer.add(COMMIT_HASH, 'author01', AUTHOR_DATE, 'after', None) == 1
+    writer.close()
+    return tmp_path
+
+def test_header_and_record_layout(manifest_dir):
+    with open(manifest_path('demo', manifest_dir), 'rb') as manifest_file:
+        data = manifest_file.read()
+    assert RECORD.size == 41
+    assert HEADER.unpack_from(data, 0) == (MAGIC, VERSION, RECORD.size, len('demo'))
+    header_size = HEADER.size + len('demo')
+    assert data[HEADER.size:header_size] == b'demo'
+    assert len(data) == header_size + 2 * RECORD.size
+    assert RECORD.unpack_from(data, header_size + RECORD.size) == \
+        (bytes.fromhex(COMMIT_HASH), b'author01', 20230105, 90307, 1, 0)
+
+def test_records_read_back_by_id(manifest_dir):
+    manifest = FileManifest(manifest_path('demo', manifest_dir))
+    assert len(manifest) == 2
+    assert manifest[0] == FileRecord('demo', COMMIT_HASH, 'author01', '20230105', '090307', 'before', 0)
+    assert manifest[1].status == 'after'
+    with pytest.raises(IndexError):
+        manifest[2]
+    manifest.close()
+
+def test_reopened_writer_continues_numbering(manifest_dir):
+    writer = FileManifestWriter(manifest_path('demo', manifest_dir), 'demo')
+    assert writer.add(COMMIT_HASH, 'author02', AUTHOR_DATE, 'after', 3) == 2
+    writer.close()
+    assert os.path.getsize(manifest_path('demo', manifest_dir)) == HEADER.size + len('demo') + 3 * RECORD.size
+
+def test_index_resolves_manifest_and_legacy_names(manifest_dir):
+    index = ManifestIndex(manifest_dir)
+    assert index.metadata(manifest_file_name('demo', 1)) == ('demo', 'author01', '20230105', '090307', 'after')
+    assert index.metadata(f"{COMMIT_HASH}_demo_author01_20230105_090307_before_0.py") == \
+        ('demo', 'author01', '20230105', '090307', 'before')
+    index.close()
+
+def test_columns_match_records(manifest_dir):
+    pytest.importorskip('numpy')
+    manifest = FileManifest(manifest_path('demo', manifest_dir))
+    columns = manifest.columns([1, 0])
+    assert columns['CommitType'] == ['after', 'before']
+    assert columns['AuthorTime'] == ['090307', '090307']
+    assert columns['CommitHash'] == [COMMIT_HASH, COMMIT_HASH]
+    manifest.close()
+
+def test_index_finds_the_manifest_by_key_and_reports_the_project(tmp_path):
+    writer = FileManifestWriter(manifest_path('owner.demo', tmp_path), 'demo')
+    file_name = writer.file_name(writer.add(COMMIT_HASH, 'author01', AUTHOR_DATE, 'after', 1))
+    writer.close()
+    assert file_name == 'owner.demo.0.py'
+    index = ManifestIndex(tmp_path)
+    assert index.metadata(file_name) == ('demo', 'author01', '20230105', '090307', 'after')
+    index.close()
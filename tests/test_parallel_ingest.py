@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+
+from ParallelIngest import ingest_json_files, loads_json
+
+def total(stem, raw):
+    """Parses one file in a worker: the sum of its values, or None for an empty file."""
+    values = loads_json(raw)
+    return (stem, sum(values), 'read') if values else None
+
+def total_streamed(path):
+    with open(path, encoding='utf-8') as file:
+        return Path(path).stem, sum(json.load(file)), 'streamed'
+
+def write_files(directory, contents):
+    paths = []
+    for name, values in contents.items():
+        path = directory / f"{name}.json"
+        path.write_text(json.dumps(values), encoding='utf-8')
+        paths.append(path)
+    return paths
+
+def test_results_are_written_in_file_order_across_windows(tmp_path):
+    contents = {f"f{index:02d}": list(range(index)) for index in range(12)}
+    written = []
+    count = ingest_json_files(reversed(write_files(tmp_path, contents)), total, written.append,
+                              read_workers=3, parse_workers=2, window=5)
+    # f00 holds no values and yields no result
+    assert count == 11
+    assert written == [(name, sum(values), 'read') for name, values in sorted(contents.items()) if values]
+
+def test_large_files_are_parsed_from_their_path(tmp_path):
+    paths = write_files(tmp_path, {'small': [1, 2], 'large': list(range(1000))})
+    written = []
+    ingest_json_files(paths, total, written.append, parse_workers=2,
+                      stream_parse=total_streamed, streaming_threshold=100)
+    assert written == [('large', sum(range(1000)), 'streamed'), ('small', 3, 'read')]
+
+def test_no_files_start_no_workers(tmp_path):
+    assert ingest_json_files([], total, None) == 0
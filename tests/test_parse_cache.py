@@ -0,0 +1,208 @@
+import ast
+import difflib
+
+import pytest
+
+from ParseCache import ParseCache
+from PyCEFREngine import LEVELS, analyze_source, diff_hunks
+
+# Stands in for PyCEFR in the tests of the cache's bookkeeping: a level per
+# node type, so a file's counts are the sum of its statements' counts
+NODE_LEVELS = {ast.Import: 'A1', ast.ImportFrom: 'A2', ast.List: 'A1', ast.Call: 'A1', ast.For: 'A2',
+               ast.FunctionDef: 'B1', ast.ListComp: 'B1', ast.ClassDef: 'B2', ast.DictComp: 'B2', ast.Yield: 'C1'}
+
+def count_nodes(sources, pycefr_dir=None):
+    results = {}
+    for name, source in sources.items():
+        levels = dict.fromkeys(LEVELS, 0)
+        for node in ast.walk(ast.parse(source)):
+            if type(node) in NODE_LEVELS:
+                levels[NODE_LEVELS[type(node)]] += 1
+        results[name] = levels
+    return results
+
+def whole_file(source):
+    try:
+        return count_nodes({'file': source})['file']
+    except SyntaxError:
+        return None
+
+ORIGINAL = '''import os
+
+def first(values):
+    return [value * 2 for value in values]
+
+class Second:
+    def method(self):
+        for item in range(3):
+            print(item)
+
+def third():
+    return {key: key for key in "abc"}
+'''
+
+# Each edit is applied to the previous snapshot of the same file
+EDITS = [
+    # Body of a middle statement changed
+    ORIGINAL.replace('print(item)', 'print(item)\n            yield item'),
+    # Statement added at the top
+    'from sys import argv\n' + ORIGINAL,
+    # Edit spanning a statement boundary
+    ORIGINAL.replace('    return [value * 2 for value in values]\n\nclass Second:',
+                     '    return list(values)\n\n\n@staticmethod\nclass Second:'),
+    # Unchanged
+    ORIGINAL,
+    # Does not parse
+    ORIGINAL.replace('def third():', 'def third(:'),
+    # Parses again
+    ORIGINAL.replace('"abc"', '"abcd"'),
+]
+
+def test_incremental_parse_matches_full_parse():
+    cache = ParseCache(analyzer=count_nodes)
+    for source in [ORIGINAL] + EDITS:
+        assert cache.analyze(source, key='module.py') == ParseCache(analyzer=count_nodes).analyze(source) == whole_file(source)
+
+def test_unchanged_statements_are_reused():
+    cache = ParseCache(analyzer=count_nodes)
+    cache.analyze(ORIGINAL, key='module.py')
+    visited = cache.stats()['visited_statements']
+    cache.analyze(EDITS[0], key='module.py')
+    assert cache.stats()['visited_statements'] == visited + 1
+    assert cache.stats()['reused_statements'] >= 3
+
+def test_renamed_path_continues_from_the_previous_snapshot():
+    cache = ParseCache(analyzer=count_nodes)
+    cache.analyze(ORIGINAL, key='old.py')
+    assert cache.analyze(EDITS[0], key='new.py', previous_key='old.py') == whole_file(EDITS[0])
+    assert cache.stats()['reused_statements'] >= 3
+
+@pytest.mark.parametrize('source', ['x = 1\n\x0cy = [1]\n', 'a = (1,\n     2)\nb = 3\r\nc = [b]\n'])
+def test_line_separators_split_like_the_parser(source):
+    cache = ParseCache(analyzer=count_nodes)
+    cache.analyze(source.replace('1', '4'), key='module.py')
+    assert cache.analyze(source, key='module.py') == whole_file(source)
+
+ONE_LINE_COMPOUNDS = ['import os; from sys import argv\n', 'x = [[1]]; y = 1\n',
+                      'a = 1; b = [1,\n     [2]]\nc = "é"; d = {1: [2]}\n']
+
+@pytest.mark.parametrize('source', ONE_LINE_COMPOUNDS)
+def test_statements_sharing_a_line_are_counted_on_their_own(source):
+    assert ParseCache(analyzer=count_nodes).analyze(source) == whole_file(source)
+
+def test_each_new_statement_is_analyzed_once():
+    calls = []
+    def analyzer(sources, pycefr_dir=None):
+        calls.append(sorted(sources.values()))
+        return count_nodes(sources)
+    cache = ParseCache(analyzer=analyzer)
+    cache.analyze('import os\nx = [1]\nimport os\n')
+    cache.analyze('x = [1]\ny = [2]\n')
+    assert calls == [['import os', 'x = [1]'], ['y = [2]']]
+
+@pytest.fixture(params=['stub', 'checkout'])
+def pycefr_checkout(request):
+    """The stand-in PyCEFR on every run, and the real one when PYCEFR_DIR names a checkout."""
+    return request.getfixturevalue('stub_pycefr_dir' if request.param == 'stub' else 'pycefr_dir')
+
+@pytest.mark.parametrize('source', ONE_LINE_COMPOUNDS + [ORIGINAL] + EDITS)
+def test_statement_counts_add_up_to_pycefr_file_counts(source, pycefr_checkout):
+    assert ParseCache().analyze(source, pycefr_dir=pycefr_checkout) == analyze_source(source, pycefr_checkout)
+
+def diff_parsed(before, after):
+    """PyDriller's `diff_parsed` of two versions of a file."""
+    old, new = before.splitlines(), after.splitlines()
+    parsed = {'added': [], 'deleted': []}
+    for tag, old_start, old_end, new_start, new_end in difflib.SequenceMatcher(None, old, new).get_opcodes():
+        if tag != 'equal':
+            parsed['deleted'] += [(number + 1, old[number]) for number in range(old_start, old_end)]
+            parsed['added'] += [(number + 1, new[number]) for number in range(new_start, new_end)]
+    return parsed
+
+def difference(before, after):
+    if before is None or after is None:
+        return None
+    return {level: after[level] - before[level] for level in LEVELS}
+
+def test_diff_hunks_rebuild_insertions_deletions_and_replacements():
+    before = 'a\nb\nc\nd\ne\n'
+    after = 'a\nnew\nb\nd\nE\nf\n'
+    assert diff_hunks(diff_parsed(before, after)) == [(2, 1, 2, 2), (3, 3, 4, 3), (5, 5, 5, 6)]
+
+def test_changed_lines_count_only_their_top_level_statements():
+    calls = []
+    def analyzer(sources, pycefr_dir=None):
+        calls.append(sorted(sources.values()))
+        return count_nodes(sources)
+    cache = ParseCache(analyzer=analyzer)
+    edited = ORIGINAL.replace('print(item)', 'print(item, end="")')
+    second = ORIGINAL.split('\n\n')[2]
+    assert cache.analyze_change((ORIGINAL, None, None), (edited, None, None), diff_hunks(diff_parsed(ORIGINAL, edited))) == \
+        (whole_file(second), whole_file(edited.split('\n\n')[2]))
+    assert calls == [[second.rstrip('\n')], [edited.split('\n\n')[2].rstrip('\n')]]
+
+def test_changed_lines_without_code_are_ignored():
+    cache = ParseCache(analyzer=count_nodes)
+    before = 'def f():\n    # note\n\n    return [1]\ntext = """\n# not a comment\n"""\n'
+    after = before.replace('# note\n', '# other note\n\n')
+    assert cache.analyze_change((before, None, None), (after, None, None), diff_hunks(diff_parsed(before, after))) == \
+        (whole_file(''), whole_file(''))
+    after = before.replace('# not', '# still not')
+    assert cache.analyze_change((before, None, None), (after, None, None), diff_hunks(diff_parsed(before, after))) == \
+        (whole_file('text = ""'), whole_file('text = ""'))
+
+FUNCTION = 'def f(v):\n    a = [x for x in v]\n    b = [y for y in v]\n    return a\n'
+
+# (before, after) pairs; the hunk-scoped difference must be the whole-file one
+CHANGES = [
+    # Insertions only
+    (FUNCTION, FUNCTION.replace('    b =', '    c = 1\n    b =')),
+    (FUNCTION, FUNCTION + '    c = [1]\n'),
+    (FUNCTION, FUNCTION + '\nimport os\n'),
+    (FUNCTION, 'import os\n' + FUNCTION),
+    (ORIGINAL, ORIGINAL.replace('print(item)', 'print(item)\n            yield item')),
+    # Deletions only
+    (FUNCTION.replace('    b =', '    c = 1\n    b ='), FUNCTION),
+    (FUNCTION, FUNCTION.replace('    b = [y for y in v]\n', '')),
+    ('import os\n' + FUNCTION, FUNCTION),
+    (ORIGINAL, ORIGINAL.replace('class Second:\n    def method(self):\n', 'def method(self):\n')),
+    # Mixed
+    (FUNCTION, FUNCTION.replace('[x for x in v]', 'list(v)').replace('return a', 'return [a]\n\nclass C:\n    pass')),
+    (ORIGINAL, EDITS[2]),
+    (ORIGINAL, ORIGINAL.replace('import os\n', 'from sys import argv\n').replace('return {key', 'yield 1\n    return {key')),
+    # Added and deleted files
+    (None, ORIGINAL),
+    (ORIGINAL, None),
+]
+
+@pytest.mark.parametrize('before, after', CHANGES)
+def test_hunk_scoped_difference_is_the_whole_file_difference(before, after):
+    hunks = diff_hunks(diff_parsed(before or '', after or ''))
+    scoped = ParseCache(analyzer=count_nodes).analyze_change(before and (before, None, None), after and (after, None, None), hunks)
+    empty = dict.fromkeys(LEVELS, 0)
+    assert difference(scoped[0] or empty, scoped[1] or empty) == \
+        difference(whole_file(before) if before else empty, whole_file(after) if after else empty)
+
+def test_hunk_scoped_snapshots_are_parsed_only_around_the_edit():
+    cache = ParseCache(analyzer=count_nodes)
+    cache.analyze(ORIGINAL, key='module.py')
+    # The before version of the next commit is the snapshot just analyzed
+    assert cache.analyze_change((ORIGINAL, 'module.py', None), (EDITS[0], 'module.py', None),
+                                diff_hunks(diff_parsed(ORIGINAL, EDITS[0]))) == \
+        (whole_file(ORIGINAL.split('\n\n')[2]), whole_file(EDITS[0].split('\n\n')[2]))
+    assert cache.stats()['tree_misses'] == 1
+
+def test_changed_statement_counts_add_up_to_pycefr_counts(pycefr_checkout):
+    first, second = ORIGINAL.split('\n\n')[1:3]
+    edited = ORIGINAL.replace('value * 2', 'value * 3').replace('range(3)', 'range(4)')
+    assert ParseCache().analyze_change((edited, None, None), (ORIGINAL, None, None), diff_hunks(diff_parsed(edited, ORIGINAL)),
+                                       pycefr_dir=pycefr_checkout)[1] == analyze_source(first + '\n\n' + second, pycefr_checkout)
+
+@pytest.mark.parametrize('before, after', CHANGES)
+def test_hunk_scoped_pycefr_difference_is_the_whole_file_difference(before, after, pycefr_checkout):
+    hunks = diff_hunks(diff_parsed(before or '', after or ''))
+    scoped = ParseCache().analyze_change(before and (before, None, None), after and (after, None, None), hunks,
+                                         pycefr_dir=pycefr_checkout)
+    empty = dict.fromkeys(LEVELS, 0)
+    whole = [analyze_source(source, pycefr_checkout) if source else empty for source in (before, after)]
+    assert difference(scoped[0] or empty, scoped[1] or empty) == difference(*whole)
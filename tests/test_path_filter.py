@@ -0,0 +1,59 @@
+import pytest
+
+pytest.importorskip('pydriller')
+
+from PathFilter import MinedFrontier, PathFilter, traverse_matching_commits
+
+def subjects(repo, commit_hashes):
+    return [repo.git('log', '-1', '--format=%s', commit_hash) for commit_hash in commit_hashes]
+
+def test_patterns_follow_git_pathspec_rules():
+    path_filter = PathFilter(['*.py'], ['tests/', '*/migrations/*'])
+    assert path_filter.matches('setup.py')
+    assert path_filter.matches('airflow/models/dag.py')
+    assert path_filter.matches('airflow\\models\\dag.py')
+    assert not path_filter.matches('tests/test_dag.py')
+    assert not path_filter.matches('airflow/migrations/0001.py')
+    assert not path_filter.matches('README.md')
+    assert not path_filter.matches(None)
+
+def test_git_skips_commits_touching_no_matching_path(branched_repo):
+    assert subjects(branched_repo, PathFilter().commit_hashes(branched_repo.path)) == ['base', 'm1', 'm2', 's1', 's2', 'merge side', 'm3']
+    # --full-history also lists a merge differing from any parent in a matching path; PyDriller reports no files for it
+    assert subjects(branched_repo, PathFilter(['main.py']).commit_hashes(branched_repo.path)) == ['m1', 'm2', 'merge side']
+    assert subjects(branched_repo, PathFilter(['*.py'], ['side.py']).commit_hashes(branched_repo.path)) == ['base', 'm1', 'm2', 'merge side', 'm3']
+
+def test_traversal_resumes_from_the_frontier(branched_repo):
+    all_commits = PathFilter().commit_hashes(branched_repo.path)
+    frontier = MinedFrontier()
+    first = []
+    for commit in traverse_matching_commits(branched_repo.path, frontier=frontier):
+        first.append(commit.hash)
+        if len(first) == 4:
+            break
+
+    resumed = [commit.hash for commit in traverse_matching_commits(branched_repo.path, frontier=MinedFrontier(frontier.tips))]
+    assert first + resumed == all_commits
+
+def test_frontier_picks_up_a_branch_merged_after_the_run(tmp_path):
+    from conftest import GitRepo
+
+    repo = GitRepo(tmp_path / 'demo')
+    repo.commit('base', '2023-01-01T00:00:00+00:00', {'base.py': 'x = 1\n'})
+    repo.git('branch', 'side')
+    repo.commit('m1', '2023-01-03T00:00:00+00:00', {'main.py': 'y = 1\n'})
+    frontier = MinedFrontier()
+    assert subjects(repo, [commit.hash for commit in traverse_matching_commits(repo.path, frontier=frontier)]) == ['base', 'm1']
+
+    repo.git('checkout', '--quiet', 'side')
+    repo.commit('s1', '2023-01-02T00:00:00+00:00', {'side.py': 'z = 1\n'})
+    repo.git('checkout', '--quiet', 'main')
+    repo.git('merge', '--quiet', '--no-ff', '-m', 'merge side', 'side', date='2023-01-04T00:00:00+00:00')
+    resumed = [commit.hash for commit in traverse_matching_commits(repo.path, frontier=frontier)]
+    assert subjects(repo, resumed) == ['s1', 'merge side']
+    assert frontier.tips == {resumed[-1]}
+
+def test_remote_traversal_lists_the_same_commits(branched_repo):
+    local = [commit.hash for commit in traverse_matching_commits(branched_repo.path)]
+    remote = [commit.hash for commit in traverse_matching_commits(f"file://{branched_repo.path}")]
+    assert remote == local
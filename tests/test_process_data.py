@@ -0,0 +1,70 @@
+import json
+import os
+from collections import defaultdict
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+import ProcessData
+from SummaryWriter import read_summaries
+
+FIXTURE_CSV = os.path.join(os.path.dirname(__file__), 'fixtures', 'pycefr_data.csv')
+
+def iterrows_scores(data):
+    """The aggregation ProcessData ran before it was vectorized."""
+    scores = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+    for _, row in data.iterrows():
+        parts = row['File Name'].split('_')
+        scores[tuple(parts[:5])][parts[5]][row['Level']] += row['Displacement']
+    return scores
+
+def as_lists(scores):
+    """Scores as nested item lists, so that the comparison covers the emission order too."""
+    return [(key, [(commit_type, list(levels.items())) for commit_type, levels in value.items()])
+            for key, value in scores.items()]
+
+def test_vectorized_aggregation_matches_iterrows():
+    expected = iterrows_scores(pd.read_csv(FIXTURE_CSV))
+    actual = ProcessData.aggregate_scores(pd.read_csv(FIXTURE_CSV, usecols=['File Name', 'Level', 'Displacement']))
+    assert as_lists(actual) == as_lists(expected)
+
+def test_aggregation_sums_per_commit_type_and_level():
+    scores = ProcessData.aggregate_scores(pd.read_csv(FIXTURE_CSV))
+    commit = scores[('a1b2c3', 'demo', '0f1e2d3c', '20230105', '101500')]
+    assert commit['after'] == {'A1': 6, 'A2': 1}
+    assert commit['before'] == {'A1': 1, 'A2': 5}
+
+@pytest.fixture
+def process_data(tmp_path, monkeypatch):
+    """ProcessData run on the fixture CSV, writing under tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ProcessData, 'file_path', FIXTURE_CSV)
+    monkeypatch.setattr(ProcessData, 'base_dir', str(tmp_path))
+    monkeypatch.setattr(ProcessData, 'csv_dir', str(tmp_path / 'CSV'))
+    monkeypatch.setattr(ProcessData, 'json_dir', str(tmp_path / 'JSON'))
+    return ProcessData
+
+def test_main_writes_one_summary_per_commit(process_data, tmp_path):
+    process_data.main()
+    json_path = tmp_path / 'JSON' / 'demo' / '0f1e2d3c' / 'a1b2c3_summary_20230105_101500.json'
+    with open(json_path) as json_file:
+        summary = json.load(json_file)
+    assert summary['Levels'] == {'After': {'A1': 6, 'A2': 1}, 'Before': {'A1': 1, 'A2': 5},
+                                 'Difference': {'A1': 5, 'A2': -4}}
+    expected_commits = len(ProcessData.aggregate_scores(pd.read_csv(FIXTURE_CSV)))
+    assert len(list((tmp_path / 'JSON').rglob('*.json'))) == len(list((tmp_path / 'CSV').rglob('*.csv'))) == expected_commits
+
+def test_jsonl_output_holds_the_same_summaries(process_data, tmp_path, monkeypatch):
+    process_data.main()
+    legacy = {}
+    for json_path in (tmp_path / 'JSON').rglob('*.json'):
+        with open(json_path) as json_file:
+            summary = json.load(json_file)
+        legacy[summary['CommitHash']] = summary
+
+    monkeypatch.setattr(process_data, 'output_format', 'jsonl')
+    process_data.main()
+    records = {record['CommitHash']: record for jsonl_path in (tmp_path / 'JSONL').glob('*.jsonl')
+               for record in read_summaries(jsonl_path)}
+    assert records == legacy
@@ -0,0 +1,45 @@
+from PyCEFRCache import PyCEFRCache
+
+LEVELS = {'A1': 3, 'B2': 1}
+
+def test_results_persist_per_version(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = PyCEFRCache(path, version='v1')
+    assert cache.get('h1') is None
+    cache.put('h1', 'demo', LEVELS)
+    cache.close()
+
+    cache = PyCEFRCache(path, version='v1')
+    assert cache.get('h1') == LEVELS
+    assert (cache.hits, cache.misses) == (1, 0)
+    cache.close()
+    cache = PyCEFRCache(path, version='v2')
+    assert cache.get('h1') is None
+    cache.close()
+
+def test_pruning_keeps_contents_an_active_project_uses(tmp_path):
+    cache = PyCEFRCache(str(tmp_path / 'cache.sqlite'))
+    cache.put('shared', 'demo', LEVELS)
+    assert cache.get('shared', 'other') == LEVELS
+    cache.put('demo-only', 'demo', LEVELS)
+    cache.put('other-only', 'other', LEVELS)
+
+    assert cache.prune_projects(['other']) == 1
+    assert cache.get('shared') == LEVELS
+    assert cache.get('other-only') == LEVELS
+    assert cache.get('demo-only') is None
+    cache.close()
+
+def test_eviction_drops_least_recently_used_entries_first(tmp_path):
+    cache = PyCEFRCache(str(tmp_path / 'cache.sqlite'), budget=0)
+    for index in range(2000):
+        cache.put(f"hash{index:04d}", 'demo', {'A1': index, 'padding': 'x' * 100})
+    cache.commit()
+    assert cache.get('hash0000') is not None  # Now the most recently used entry
+    cache.budget = cache.size() // 2
+
+    assert cache.evict() > 0
+    assert cache.size() <= cache.budget
+    assert cache.get('hash0000') is not None
+    assert cache.get('hash0001') is None
+    cache.close()
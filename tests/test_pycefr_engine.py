@@ -0,0 +1,76 @@
+import logging
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from PyCEFREngine import LEVELS, analyze_sources, prepare_pycefr, read_levels, run_script
+
+SOURCES = {
+    'lists': 'values = [1, [2, 3]]\nprint(values)\n',
+    'functions': 'import os\n\ndef walk(path="."):\n    for entry in os.listdir(path):\n        yield entry\n',
+    'classes': 'class Point:\n    def __init__(self, x):\n        self.x = x\n',
+    'broken': 'def broken(:\n',
+}
+
+def test_in_process_levels_match_pycerfl_run_as_a_script(pycefr_dir, tmp_path):
+    checkout = tmp_path / 'pycefr'
+    shutil.copytree(pycefr_dir, checkout, ignore=shutil.ignore_patterns('.git', 'DATA_JSON', 'data.csv'))
+    sources_dir = tmp_path / 'sources'
+    sources_dir.mkdir()
+    for name, source in SOURCES.items():
+        (sources_dir / f"{name}.py").write_text(source, encoding='utf-8')
+    subprocess.run([sys.executable, 'dict.py'], check=True, cwd=checkout)
+    subprocess.run([sys.executable, 'pycerfl.py', 'directory', str(sources_dir)], check=True, cwd=checkout)
+
+    expected = read_levels(checkout / 'DATA_JSON')
+    assert analyze_sources(SOURCES, pycefr_dir) == {name: expected.get(name) for name in SOURCES}
+
+def zero_filled(**levels):
+    return {**dict.fromkeys(LEVELS, 0), **levels}
+
+# Levels the stand-in PyCEFR (tests/fixtures/pycefr) gives SOURCES
+STUB_LEVELS = {
+    'lists': zero_filled(A1=3),
+    'functions': zero_filled(A1=2, A2=1, B1=1, C1=1),
+    'classes': zero_filled(B1=1, B2=1),
+    'broken': None,
+}
+
+def test_run_script_runs_in_the_checkout_and_restores_the_interpreter(stub_pycefr_dir, tmp_path):
+    checkout = tmp_path / 'pycefr'
+    shutil.copytree(stub_pycefr_dir, checkout)
+    sources_dir = tmp_path / 'sources'
+    sources_dir.mkdir()
+    (sources_dir / 'lists.py').write_text(SOURCES['lists'], encoding='utf-8')
+    cwd, argv, path = os.getcwd(), sys.argv, list(sys.path)
+
+    run_script(checkout, 'dict.py')
+    run_script(checkout, 'pycerfl.py', 'directory', str(sources_dir))
+    assert read_levels(checkout / 'DATA_JSON') == {'lists': STUB_LEVELS['lists']}
+    assert (os.getcwd(), sys.argv, sys.path) == (cwd, argv, path)
+    assert 'levels' not in sys.modules
+
+    with pytest.raises(RuntimeError, match='status 2'):
+        run_script(checkout, 'pycerfl.py', 'repository')
+    assert (os.getcwd(), sys.argv, sys.path) == (cwd, argv, path)
+
+def test_prepare_pycefr_builds_the_dictionary_in_a_scratch_copy(stub_pycefr_dir):
+    working_dir = prepare_pycefr(stub_pycefr_dir)
+    assert working_dir != stub_pycefr_dir
+    assert os.path.exists(os.path.join(working_dir, 'dicc.txt'))
+    assert not os.path.exists(os.path.join(stub_pycefr_dir, 'dicc.txt'))
+    assert prepare_pycefr(stub_pycefr_dir) == working_dir
+
+def test_analyze_sources_reports_the_levels_of_each_source(stub_pycefr_dir):
+    assert analyze_sources(SOURCES, stub_pycefr_dir) == STUB_LEVELS
+    # Nothing is left over from the previous run
+    assert analyze_sources({'lists': SOURCES['lists']}, stub_pycefr_dir) == {'lists': STUB_LEVELS['lists']}
+
+def test_a_source_breaking_pycefr_only_loses_its_own_result(stub_pycefr_dir, caplog):
+    with caplog.at_level(logging.WARNING, logger='PyCEFREngine'):
+        results = analyze_sources({**SOURCES, 'crash': 'BREAK_PYCEFR = [1]\n'}, stub_pycefr_dir)
+    assert results == {**STUB_LEVELS, 'crash': None}
+    assert 'analyzing them one by one' in caplog.text
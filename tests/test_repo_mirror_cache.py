@@ -0,0 +1,66 @@
+import os
+import subprocess
+
+import pytest
+
+from conftest import GitRepo
+from RepoMirrorCache import cached_mirror, load_index, mirror_name, use_mirror
+
+@pytest.fixture
+def origin(tmp_path):
+    repo = GitRepo(tmp_path / 'origin' / 'demo')
+    repo.commit('first', '2023-01-01T00:00:00+00:00', {'a.py': 'x = 1\n'})
+    return repo
+
+def head(path):
+    return subprocess.run(['git', '-C', path, 'rev-parse', 'HEAD'], check=True, capture_output=True, text=True).stdout.strip()
+
+def test_mirror_is_cloned_once_and_fetched_afterwards(origin, tmp_path):
+    cache_dir = str(tmp_path / 'mirrors')
+    url = f"file://{origin.path}"
+    with use_mirror(url, cache_dir) as path:
+        assert path == cached_mirror(url, cache_dir) == os.path.join(cache_dir, mirror_name(url))
+        first_inode = os.stat(path).st_ino
+
+    second = origin.commit('second', '2023-01-02T00:00:00+00:00', {'a.py': 'x = 2\n'})
+    with use_mirror(url, cache_dir) as path:
+        assert os.stat(path).st_ino == first_inode
+        assert head(path) == second
+
+def test_offline_mode_uses_the_mirror_as_it_is(origin, tmp_path):
+    cache_dir = str(tmp_path / 'mirrors')
+    url = f"file://{origin.path}"
+    with pytest.raises(RuntimeError):
+        with use_mirror(url, cache_dir, offline=True):
+            pass
+
+    first = origin.git('rev-parse', 'HEAD')
+    with use_mirror(url, cache_dir):
+        pass
+    origin.commit('second', '2023-01-02T00:00:00+00:00', {'a.py': 'x = 2\n'})
+    with use_mirror(url, cache_dir, offline=True) as path:
+        assert head(path) == first
+
+def test_local_repositories_are_mined_in_place(origin, tmp_path):
+    with use_mirror(origin.path, str(tmp_path / 'mirrors')) as path:
+        assert path == origin.path
+    assert not os.path.exists(tmp_path / 'mirrors')
+
+def test_eviction_spares_mirrors_in_use(tmp_path):
+    cache_dir = str(tmp_path / 'mirrors')
+    urls = []
+    for name in ('one', 'two', 'three'):
+        repo = GitRepo(tmp_path / 'origin' / name)
+        repo.commit('first', '2023-01-01T00:00:00+00:00', {'a.py': f"{name} = 1\n"})
+        urls.append(f"file://{repo.path}")
+
+    with use_mirror(urls[0], cache_dir):
+        with use_mirror(urls[1], cache_dir):
+            pass
+        # The budget fits a single mirror: 'two' is evicted, 'one' is in use
+        with use_mirror(urls[2], cache_dir, budget=1):
+            pass
+        assert cached_mirror(urls[0], cache_dir) is not None
+        assert cached_mirror(urls[1], cache_dir) is None
+        assert cached_mirror(urls[2], cache_dir) is not None
+    assert set(load_index(cache_dir)) == {urls[0], urls[2]}
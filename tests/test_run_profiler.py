@@ -0,0 +1,58 @@
+import json
+import os
+import pstats
+import tracemalloc
+
+from RunProfiler import RunProfiler
+
+def busy(n):
+    return sum(i * i for i in range(n))
+
+def test_stages_accumulate_calls_and_counts_go_to_the_innermost_stage(tmp_path):
+    profiler = RunProfiler('demo', directory=str(tmp_path))
+    for _ in range(2):
+        with profiler.stage('mine'):
+            profiler.count('commits')
+            with profiler.stage('write'):
+                profiler.count('bytes_written', 10)
+    profiler.count('files', 3, stage='mine')
+    profiler.count('skipped')
+
+    report = profiler.report()
+    assert report['stages']['mine']['calls'] == 2
+    assert report['stages']['mine']['counters'] == {'commits': 2, 'files': 3}
+    assert report['stages']['write']['counters'] == {'bytes_written': 20}
+    assert report['stages']['run']['counters'] == {'skipped': 1}
+    assert report['stages']['mine']['seconds'] >= report['stages']['write']['seconds']
+
+def test_stage_time_is_recorded_when_it_raises(tmp_path):
+    profiler = RunProfiler('demo', directory=str(tmp_path))
+    try:
+        with profiler.stage('analyze'):
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert profiler.report()['stages']['analyze']['calls'] == 1
+
+def test_report_is_written_as_json_with_profiles_and_memory(tmp_path):
+    profiler = RunProfiler('demo', cprofile=True, trace_memory=True, directory=str(tmp_path))
+    try:
+        with profiler.stage('outer'):
+            with profiler.stage('inner'):
+                data = [bytes(1024) for _ in range(1024)]
+                busy(1000)
+            del data
+    finally:
+        tracemalloc.stop()
+
+    report_path = profiler.write_report()
+    assert os.path.dirname(report_path) == str(tmp_path)
+    with open(report_path, encoding='utf-8') as report_file:
+        report = json.load(report_file)
+    assert report['name'] == 'demo'
+    assert report['stages']['inner']['peak_memory_bytes'] >= 1024 * 1024
+    assert report['stages']['outer']['peak_memory_bytes'] >= report['stages']['inner']['peak_memory_bytes']
+    # Only the outermost stage is profiled, the inner one is part of its profile
+    assert 'profile' not in report['stages']['inner']
+    functions = {function for _, _, function in pstats.Stats(report['stages']['outer']['profile']).stats}
+    assert 'busy' in functions
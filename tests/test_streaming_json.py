@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+import StreamingJSON
+from StreamingJSON import iter_file_levels
+
+DOCUMENT = {
+    'c0ffee': {
+        'say_"hi"_after_0.py': {'Levels': {'A1': 12345, 'B2': 0}, 'Classes': [1, 2.5e-3, None, 'x\\y']},
+        'café_ _before_0.py': {'Levels': {'A2': -1}},
+        'nested': {'deeper': {'Levels': {'C1': 7}}},
+    },
+    'other': {'skipped_after_0.py': {'Levels': {'A1': 99}}},
+    'Levels': 'not a mapping',
+}
+
+EXPECTED = [
+    ('say_"hi"_after_0.py', {'A1': 12345, 'B2': 0}),
+    ('café_ _before_0.py', {'A2': -1}),
+    ('deeper', {'C1': 7}),
+    ('skipped_after_0.py', {'A1': 99}),
+]
+
+@pytest.fixture
+def result_file(tmp_path):
+    path = tmp_path / 'c0ffee.json'
+    path.write_text(json.dumps(DOCUMENT, indent=2), encoding='utf-8')
+    return path
+
+@pytest.mark.parametrize('read_size', [1, 2, 3, 5, 7, 64, 1024 * 1024])
+def test_chunk_boundaries_do_not_change_the_result(result_file, read_size, monkeypatch):
+    """Every token (strings, escapes, numbers) is split across reads at some chunk size."""
+    monkeypatch.setattr(StreamingJSON, 'read_size', read_size)
+    assert list(iter_file_levels(result_file)) == EXPECTED
+
+@pytest.mark.parametrize('read_size', [1, 4, 1024 * 1024])
+def test_root_key_limits_the_result(result_file, read_size, monkeypatch):
+    monkeypatch.setattr(StreamingJSON, 'read_size', read_size)
+    assert list(iter_file_levels(result_file, 'c0ffee')) == EXPECTED[:3]
+
+def test_number_at_the_end_of_a_chunk_is_not_truncated(tmp_path, monkeypatch):
+    path = tmp_path / 'numbers.json'
+    path.write_text('{"c": {"f.py": {"Levels": {"A1": 1234567}}}}', encoding='utf-8')
+    monkeypatch.setattr(StreamingJSON, 'read_size', len('{"c": {"f.py": {"Levels": {"A1": 123'))
+    assert list(iter_file_levels(path)) == [('f.py', {'A1': 1234567})]
@@ -0,0 +1,64 @@
+import importlib
+import os
+import time
+
+import pytest
+
+pytest.importorskip('pydriller')
+
+@pytest.fixture
+def streaming_pipeline(tmp_path, monkeypatch):
+    """The pipeline module, imported and run from an empty directory."""
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module('StreamingPipeline')
+
+def snapshot_tree(directory):
+    return {str(path.relative_to(directory)): path.read_text(encoding='utf-8') for path in directory.rglob('*.py')}
+
+def test_bounded_stage_keeps_order_and_blocks_the_producer(streaming_pipeline):
+    produced = []
+
+    def stage():
+        for item in range(10):
+            produced.append(item)
+            yield item
+
+    items = streaming_pipeline.bounded(stage(), maxsize=2)
+    assert next(items) == 0
+    time.sleep(0.2)
+    # One item consumed, two waiting in the queue and one blocked on put
+    assert len(produced) <= 4
+    assert list(items) == list(range(1, 10))
+
+def test_bounded_stage_raises_the_producer_error(streaming_pipeline):
+    def stage():
+        yield 1
+        raise ValueError('mining failed')
+
+    items = streaming_pipeline.bounded(stage())
+    assert next(items) == 1
+    with pytest.raises(ValueError, match='mining failed'):
+        next(items)
+
+def test_mined_records_match_the_snapshot_files_of_extract_data(streaming_pipeline, branched_repo, tmp_path, monkeypatch):
+    import TrialPyDriller
+    monkeypatch.setattr(TrialPyDriller, 'use_mirror_cache', False)
+    records = list(streaming_pipeline.mine_commits(branched_repo.path, write_snapshots=True))
+    streamed = snapshot_tree(tmp_path / 'PythonFiles')
+    assert {file_name: code for record in records for file_name, code, *_ in record['files']} == \
+        {os.path.basename(path): code for path, code in streamed.items()}
+
+    extract_dir = tmp_path / 'extract'
+    extract_dir.mkdir()
+    monkeypatch.chdir(extract_dir)
+    TrialPyDriller.extract_data(branched_repo.path)
+    assert snapshot_tree(extract_dir / 'PythonFiles') == streamed
+
+def test_hunk_scoped_records_carry_hunks_and_lineage_keys(streaming_pipeline, branched_repo):
+    records = {record['commit_hash']: record for record in streaming_pipeline.mine_commits(branched_repo.path, hunk_scoped=True)}
+    m3 = branched_repo.git('rev-parse', 'HEAD')
+    [before, after] = records[m3]['files']
+    key = f"{branched_repo.path}:base.py"
+    assert before[1:] == ('x = 1\n', [(1, 1, 1, 1)], key, key)
+    assert after[1:] == ('x = 2\n', [(1, 1, 1, 1)], key, key)
+    assert records[m3]['changes'] == [(before[0], after[0])]
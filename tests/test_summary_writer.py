@@ -0,0 +1,63 @@
+import json
+
+from SummaryWriter import JsonLinesSummaryWriter, export_legacy_layout, read_summaries
+
+def write(writer, commit_hash, after, project_name='demo'):
+    writer.write_summary(commit_hash, project_name, 'author01', '20230105', '120000', after, {}, after)
+
+def summaries(output_dir, project_name='demo'):
+    return [(record['CommitHash'], record['Levels']['After'])
+            for record in read_summaries(output_dir / 'JSONL' / f"{project_name}.jsonl")]
+
+def test_resumed_run_keeps_earlier_summaries(tmp_path):
+    writer = JsonLinesSummaryWriter(tmp_path)
+    write(writer, 'c1', {'A1': 1})
+    writer.close()
+
+    writer = JsonLinesSummaryWriter(tmp_path)
+    write(writer, 'c2', {'A1': 2})
+    writer.close()
+    assert summaries(tmp_path) == [('c1', {'A1': 1}), ('c2', {'A1': 2})]
+
+def test_rewritten_commit_replaces_its_summary(tmp_path):
+    writer = JsonLinesSummaryWriter(tmp_path)
+    write(writer, 'c1', {'A1': 1})
+    write(writer, 'c2', {'A1': 2})
+    writer.close()
+
+    writer = JsonLinesSummaryWriter(tmp_path)
+    write(writer, 'c1', {'A1': 5})
+    write(writer, 'c3', {'A1': 3})
+    writer.close()
+    assert summaries(tmp_path) == [('c1', {'A1': 5}), ('c2', {'A1': 2}), ('c3', {'A1': 3})]
+
+def test_without_append_a_run_starts_each_file_over(tmp_path):
+    writer = JsonLinesSummaryWriter(tmp_path)
+    write(writer, 'c1', {'A1': 1})
+    writer.close()
+
+    writer = JsonLinesSummaryWriter(tmp_path, append=False)
+    write(writer, 'c2', {'A1': 2})
+    writer.close()
+    assert summaries(tmp_path) == [('c2', {'A1': 2})]
+
+def test_files_closed_to_make_room_are_reopened_for_appending(tmp_path):
+    writer = JsonLinesSummaryWriter(tmp_path, append=False, max_open=1)
+    for commit in range(3):
+        for project_name in ('demo', 'other'):
+            write(writer, f"c{commit}", {'A1': commit}, project_name)
+    writer.close()
+    for project_name in ('demo', 'other'):
+        assert summaries(tmp_path, project_name) == [(f"c{commit}", {'A1': commit}) for commit in range(3)]
+
+def test_legacy_layout_is_recreated(tmp_path):
+    writer = JsonLinesSummaryWriter(tmp_path)
+    write(writer, 'c1', {'A1': 1, 'B1': 2})
+    writer.close()
+
+    export_legacy_layout(tmp_path / 'JSONL' / 'demo.jsonl', tmp_path / 'legacy')
+    summary_base = 'c1_summary_20230105_120000'
+    with open(tmp_path / 'legacy' / 'JSON' / 'demo' / 'author01' / f"{summary_base}.json") as json_file:
+        assert json.load(json_file)['Levels']['After'] == {'A1': 1, 'B1': 2}
+    csv_lines = (tmp_path / 'legacy' / 'CSV' / 'demo' / 'author01' / f"{summary_base}.csv").read_text().splitlines()
+    assert csv_lines[1:] == ['c1,demo,author01,20230105,120000,A1,1,0,1', 'c1,demo,author01,20230105,120000,B1,2,0,2']
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pytest
+
+from CompetencyStore import CompetencyStore
+from TrajectoryEngine import TrajectoryEngine
+
+def add(engine, commit_hash, date, after, diff=None, author_id='author01'):
+    return engine.add_commit(commit_hash, 'demo', author_id, datetime.fromisoformat(date), after, diff if diff is not None else after)
+
+def test_window_keeps_only_the_latest_days():
+    engine = TrajectoryEngine(window_days=30)
+    add(engine, 'c1', '2023-01-01', {'A1': 4})
+    add(engine, 'c2', '2023-01-20', {'A1': 1, 'B1': 1})
+    assert engine.window_distribution('demo', 'author01')['A1'] == pytest.approx(5 / 6)
+
+    add(engine, 'c3', '2023-02-15', {'B1': 2})
+    distribution = engine.window_distribution('demo', 'author01')
+    assert distribution['A1'] == pytest.approx(1 / 4)
+    assert distribution['B1'] == pytest.approx(3 / 4)
+
+def test_late_commit_inside_the_window_is_counted_outside_it_is_not():
+    engine = TrajectoryEngine(window_days=30)
+    add(engine, 'c1', '2023-03-01', {'A1': 1})
+    add(engine, 'c2', '2023-02-20', {'B1': 1})
+    add(engine, 'c3', '2023-01-01', {'C1': 1})
+    assert engine.window_distribution('demo', 'author01') == {'A1': 0.5, 'A2': 0.0, 'B1': 0.5, 'B2': 0.0, 'C1': 0.0, 'C2': 0.0}
+    assert engine.cumulative('demo', 'author01')['C1'] == 1
+    assert engine.first_appearance('demo', 'author01')['C1'] == datetime(2023, 1, 1)
+
+def test_cumulative_and_first_appearance():
+    engine = TrajectoryEngine()
+    add(engine, 'c1', '2023-01-05', {'A1': 3}, {'A1': 3})
+    add(engine, 'c2', '2023-01-10', {'A1': 1, 'B2': 1}, {'A1': -2, 'B2': 1})
+    assert engine.cumulative('demo', 'author01') == {'A1': 1, 'A2': 0, 'B1': 0, 'B2': 1, 'C1': 0, 'C2': 0}
+    assert engine.first_appearance('demo', 'author01') == {'A1': datetime(2023, 1, 5), 'B2': datetime(2023, 1, 10)}
+
+def test_commit_already_added_is_ignored():
+    engine = TrajectoryEngine()
+    assert add(engine, 'c1', '2023-01-05', {'A1': 3})
+    assert not add(engine, 'c1', '2023-01-05', {'A1': 9})
+    assert engine.summary('demo', 'author01')['Commits'] == 1
+    assert engine.cumulative('demo', 'author01')['A1'] == 3
+
+def test_unknown_author_is_a_key_error():
+    with pytest.raises(KeyError):
+        TrajectoryEngine().cumulative('demo', 'author01')
+
+def test_saved_state_resumes_with_the_next_commits(tmp_path):
+    path = str(tmp_path / 'trajectories.pickle')
+    engine = TrajectoryEngine.load(path)
+    add(engine, 'c1', '2023-01-05', {'A1': 3})
+    engine.close()
+
+    resumed = TrajectoryEngine.load(path)
+    assert not add(resumed, 'c1', '2023-01-05', {'A1': 3})
+    add(resumed, 'c2', '2023-01-06', {'B1': 1})
+    assert resumed.summary('demo', 'author01')['Cumulative']['A1'] == 3
+    assert resumed.summary('demo', 'author01')['Commits'] == 2
+    with pytest.raises(ValueError):
+        TrajectoryEngine.load(path, window_days=30)
+
+def test_store_commits_feed_the_engine_once(tmp_path):
+    store = CompetencyStore(':memory:')
+    store.write_summary('c1', 'demo', 'author01', '20230105', '120000', {'A1': 3}, {'A1': 1}, {'A1': 2})
+    store.write_summary('c2', 'demo', 'author02', '20230106', '120000', {'B1': 1}, {}, {'B1': 1})
+    engine = TrajectoryEngine()
+    assert engine.add_from_store(store) == 2
+    assert engine.add_from_store(store) == 0
+    store.close()
+    assert engine.author_ids('demo') == ['author01', 'author02']
+    assert engine.cumulative('demo', 'author01')['A1'] == 2
@@ -0,0 +1,166 @@
+import csv
+import importlib
+import json
+import shutil
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from conftest import GitRepo
+
+# Stands in for a PyCEFR checkout: records each run and writes one DATA_JSON
+# file per directory of Python files, grouped by the directory's name like PyCEFR
+STAND_IN_PYCERFL = textwrap.dedent('''
+    import json, os, sys
+    with open('runs.txt', 'a') as runs:
+        runs.write(sys.argv[2] + '\\n')
+    for root, _, file_names in os.walk(sys.argv[2]):
+        files = {name: {'Levels': {'A1': len(open(os.path.join(root, name)).read())}}
+                 for name in sorted(file_names) if name.endswith('.py')}
+        if files:
+            os.makedirs('DATA_JSON', exist_ok=True)
+            with open(os.path.join('DATA_JSON', os.path.basename(root) + '.json'), 'w') as out:
+                json.dump({os.path.basename(root): files}, out)
+''')
+
+@pytest.fixture
+def trial_pycefr(tmp_path, monkeypatch):
+    """TrialPyCEFR run from an empty directory, with its output paths inside it."""
+    monkeypatch.chdir(tmp_path)
+    module = importlib.import_module('TrialPyCEFR')
+    checkout = tmp_path / 'pycefr'
+    checkout.mkdir()
+    (checkout / 'dict.py').write_text('')
+    (checkout / 'pycerfl.py').write_text(STAND_IN_PYCERFL)
+    monkeypatch.setattr(module, 'pycefr_dir', str(checkout))
+    monkeypatch.setattr(module, 'json_data_dir', str(checkout / 'DATA_JSON'))
+    monkeypatch.setattr(module, 'error_log_file', str(tmp_path / 'error_log.txt'))
+    for commit in range(5):
+        commit_dir = tmp_path / 'PythonFiles' / 'demo' / f"author{commit % 2}" / f"commit{commit}"
+        commit_dir.mkdir(parents=True)
+        for index in range(commit + 1):
+            (commit_dir / f"file{index}.py").write_text('x = 1\n' * (index + 1))
+    return module
+
+def read_results(checkout):
+    results = {}
+    for json_file in sorted((checkout / 'DATA_JSON').glob('*.json')):
+        results[json_file.name] = json.loads(json_file.read_text())
+    return results
+
+def test_parallel_runs_batch_shards_and_match_a_single_run(trial_pycefr, tmp_path):
+    checkout = tmp_path / 'pycefr'
+    trial_pycefr.run_pycefr_analysis('../PythonFiles')
+    expected = read_results(checkout)
+    assert len(expected) == 5
+    shutil.rmtree(checkout / 'DATA_JSON')
+
+    trial_pycefr.run_pycefr_analysis('../PythonFiles', workers=2, batch_size=2)
+    assert read_results(checkout) == expected
+    assert not (tmp_path / 'PyCEFRScratch').exists()
+    assert not (tmp_path / 'error_log.txt').read_text()
+
+def test_batches_are_spread_over_the_workers(trial_pycefr, tmp_path, monkeypatch):
+    runs = []
+    monkeypatch.setattr(trial_pycefr, 'merge_pycefr_outputs',
+                        lambda scratch_dirs: runs.extend(
+                            len((scratch_dir / 'runs.txt').read_text().splitlines())
+                            for scratch_dir in scratch_dirs if (scratch_dir / 'runs.txt').exists()))
+
+    # 5 shards: batches of 3 would leave a worker idle, so they are cut to 2, 2 and 1
+    trial_pycefr.run_pycefr_analysis('../PythonFiles', workers=3, batch_size=64)
+    assert sum(runs) == 3
+
+class SummaryCollector:
+    def __init__(self):
+        self.summaries = []
+
+    def write_summary(self, *summary):
+        self.summaries.append(summary)
+
+def test_blob_summaries_are_dated_like_the_snapshot_files(trial_pycefr, tmp_path, monkeypatch):
+    TrialPyDriller = pytest.importorskip('TrialPyDriller')
+    monkeypatch.setattr(TrialPyDriller, 'use_mirror_cache', False)
+    repo = GitRepo(tmp_path / 'tzdemo')
+    east = repo.commit('east', '2023-01-05T23:30:00+02:00', {'a.py': 'x = 1\n'})
+    west = repo.commit('west', '2023-01-06T01:15:00-05:00', {'a.py': 'x = 2\n'})
+
+    TrialPyDriller.extract_data(repo.path)
+    snapshot_dates = {tuple(path.name.split('_')[i] for i in (0, 3, 4)) for path in (tmp_path / 'PythonFiles' / 'tzdemo').rglob('*.py')}
+    assert snapshot_dates == {(east, '20230105', '233000'), (west, '20230106', '011500')}
+
+    csv_path = TrialPyDriller.extract_data(repo.path, blob_store=True)
+    with open(csv_path, newline='', encoding='utf-8') as csv_file:
+        rows = list(csv.DictReader(csv_file))
+    assert [(row['AuthorDate'], row['AuthorTimezone'], row['AuthorLocalOffset']) for row in rows] == \
+        [('2023-01-05 21:30:00', '+0000', '+0200'), ('2023-01-06 06:15:00', '+0000', '-0500')]
+    blob_levels = {Path(row[column]).stem: {'A1': 1} for row in rows
+                   for column in ('SourceCodeFilePath', 'SourceCodeBeforeFilePath') if row[column]}
+
+    collector = SummaryCollector()
+    monkeypatch.setattr(trial_pycefr, 'summary_writer', collector)
+    trial_pycefr.process_blob_results(csv_path, blob_levels)
+    assert {(summary[0], summary[3], summary[4]) for summary in collector.summaries} == snapshot_dates
+
+def test_cached_analysis_only_runs_pycefr_on_new_contents(trial_pycefr, tmp_path):
+    checkout = tmp_path / 'pycefr'
+    trial_pycefr.run_pycefr_analysis_cached('../PythonFiles')
+    first_results = read_results(checkout)
+    assert len((checkout / 'runs.txt').read_text().splitlines()) == 1
+
+    trial_pycefr.run_pycefr_analysis_cached('../PythonFiles')
+    assert read_results(checkout) == first_results
+    assert len((checkout / 'runs.txt').read_text().splitlines()) == 1
+
+    # A copy of an analyzed file in a new commit is a cache hit too
+    new_commit = tmp_path / 'PythonFiles' / 'demo' / 'author0' / 'commit5'
+    new_commit.mkdir()
+    shutil.copyfile(tmp_path / 'PythonFiles' / 'demo' / 'author0' / 'commit0' / 'file0.py', new_commit / 'file0.py')
+    trial_pycefr.run_pycefr_analysis_cached('../PythonFiles')
+    assert len((checkout / 'runs.txt').read_text().splitlines()) == 1
+    assert read_results(checkout)['commit5.json'] == {'commit5': {'file0.py': first_results['commit0.json']['commit0']['file0.py']}}
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_cached_analysis_reads_only_the_staged_results(trial_pycefr, tmp_path, monkeypatch, workers):
+    checkout = tmp_path / 'pycefr'
+    other = checkout / 'DATA_JSON' / 'other.json'
+    other.parent.mkdir()
+    other.write_text(json.dumps({'other': {'0' * 40 + '.py': {'Levels': {'C2': 1}}}}))
+    run_pycefr_analysis = trial_pycefr.run_pycefr_analysis
+
+    def run_alongside_another_writer(target_directory, workers):
+        run_pycefr_analysis(target_directory, workers)
+        other.write_text(other.read_text())
+    monkeypatch.setattr(trial_pycefr, 'run_pycefr_analysis', run_alongside_another_writer)
+
+    trial_pycefr.run_pycefr_analysis_cached('../PythonFiles', workers=workers)
+    results = read_results(checkout)
+    assert sorted(results) == ['commit0.json', 'commit1.json', 'commit2.json', 'commit3.json', 'commit4.json', 'other.json']
+    assert results['commit0.json'] == {'commit0': {'file0.py': {'Levels': {'A1': 6}}}}
+
+def write_commit_results(json_dir, commit_count):
+    json_dir.mkdir(parents=True, exist_ok=True)
+    for commit in range(commit_count):
+        commit_hash = f"{commit:040x}"
+        files = {
+            f"{commit_hash}_demo_author01_202301{commit + 1:02d}_120000_{status}_{index}.py": {'Levels': {'A1': commit + index, 'B1': index}}
+            for status in ('before', 'after') for index in range(1, 3)
+        }
+        files['unexpected.py'] = {'Levels': {'A1': 100}}
+        (json_dir / f"{commit_hash}.json").write_text(json.dumps({commit_hash: files}))
+
+def collected_summaries(collector):
+    return sorted((summary[0], summary[3], dict(summary[5]), dict(summary[6]), summary[7]) for summary in collector.summaries)
+
+def test_parallel_ingestion_summarizes_like_the_serial_one(trial_pycefr, tmp_path, monkeypatch):
+    write_commit_results(tmp_path / 'pycefr' / 'DATA_JSON', 6)
+    serial, parallel = SummaryCollector(), SummaryCollector()
+    monkeypatch.setattr(trial_pycefr, 'summary_writer', serial)
+    trial_pycefr.process_json_files()
+    monkeypatch.setattr(trial_pycefr, 'summary_writer', parallel)
+    trial_pycefr.process_json_files_parallel(read_workers=2, parse_workers=2)
+
+    assert len(serial.summaries) == 6
+    assert collected_summaries(parallel) == collected_summaries(serial)
+    assert collected_summaries(serial)[1][2:] == ({'A1': 5, 'B1': 3}, {'A1': 5, 'B1': 3}, {'A1': 0, 'B1': 0})
@@ -0,0 +1,127 @@
+import csv
+import os
+
+import pytest
+
+pytest.importorskip('pydriller')
+
+import TrialPyDriller
+from conftest import GitRepo
+from FileManifest import ManifestIndex
+from PathFilter import PYTHON_FILES
+
+@pytest.fixture
+def mining_dir(tmp_path, monkeypatch):
+    """Runs the miner in an empty directory, on the local repository itself."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(TrialPyDriller, 'use_mirror_cache', False)
+    return tmp_path
+
+def read_rows(csv_path):
+    with open(csv_path, newline='', encoding='utf-8') as csv_file:
+        return list(csv.reader(csv_file))
+
+def test_parallel_mining_keeps_the_serial_commit_order(branched_repo, mining_dir):
+    serial_rows = read_rows(TrialPyDriller.extract_data(branched_repo.path))
+    parallel_rows = read_rows(TrialPyDriller.extract_data(branched_repo.path, workers=2))
+
+    commit_order = list(dict.fromkeys(row[0] for row in serial_rows[1:]))
+    # The merge commit is listed too, but PyDriller reports no modified files for it
+    assert commit_order == [commit_hash for commit_hash in PYTHON_FILES.commit_hashes(branched_repo.path) if commit_hash in commit_order]
+    assert [row[3] for row in serial_rows[1:]] != sorted(row[3] for row in serial_rows[1:])
+    assert parallel_rows == serial_rows
+
+def test_commits_are_recorded_with_their_python_files_only(branched_repo, mining_dir):
+    rows = read_rows(TrialPyDriller.extract_data(branched_repo.path))
+    assert rows[0] == TrialPyDriller.CSV_HEADER
+    assert sorted(row[5] for row in rows[1:]) == ['base.py', 'base.py', 'main.py', 'main.py', 'side.py', 'side.py']
+    assert {row[1] for row in rows[1:]} == {'demo'}
+
+def test_manifests_of_same_named_repositories_are_kept_apart(branched_repo, mining_dir):
+    other_repo = GitRepo(mining_dir / 'fork' / 'demo')
+    other_repo.commit('fork', '2023-02-01T00:00:00+00:00', {'fork.py': 'w = 1\n'})
+    repo_urls = [f"file://{branched_repo.path}", f"file://{other_repo.path}"]
+    for repo_url in repo_urls:
+        TrialPyDriller.extract_data(repo_url, manifest=True)
+
+    index = ManifestIndex(mining_dir / 'FileManifest')
+    for repo_url in repo_urls:
+        output_key = TrialPyDriller.repository_key(repo_url)
+        rows = read_rows(mining_dir / 'PythonCommits_data' / f"{output_key}_data.csv")
+        for row in rows[1:]:
+            file_name = os.path.basename(row[10])
+            assert file_name.startswith(f"{output_key}.")
+            assert index.metadata(file_name)[0] == 'demo'
+            assert index.manifest(output_key)[int(file_name.split('.')[-2])].commit_hash == row[0]
+    index.close()
+
+def mine_fresh(repo_path, directory, monkeypatch, **options):
+    """Mines the repository from scratch in `directory`; returns its CSV rows."""
+    monkeypatch.chdir(directory)
+    return read_rows(TrialPyDriller.extract_data(repo_path, **options))
+
+def test_resumed_mining_picks_up_new_and_merged_commits(mining_dir, tmp_path, monkeypatch):
+    repo = GitRepo(tmp_path / 'demo')
+    repo.commit('base', '2023-01-01T00:00:00+00:00', {'base.py': 'x = 1\n'})
+    repo.git('branch', 'side')
+    repo.commit('m1', '2023-01-03T00:00:00+00:00', {'main.py': 'y = 1\n'})
+    repo.git('checkout', '--quiet', 'side')
+    repo.commit('s1', '2023-01-02T00:00:00+00:00', {'side.py': 'z = 1\n'})
+    repo.git('checkout', '--quiet', 'main')
+    first_rows = read_rows(TrialPyDriller.extract_data(repo.path, incremental=True))
+    assert sorted(row[5] for row in first_rows[1:]) == ['base.py', 'main.py']
+
+    # The side branch, older than the mined tip, is merged after the first run
+    repo.git('merge', '--quiet', '--no-ff', '-m', 'merge side', 'side', date='2023-01-04T00:00:00+00:00')
+    repo.commit('m2', '2023-01-05T00:00:00+00:00', {'main.py': 'y = 2\n'})
+    resumed_rows = read_rows(TrialPyDriller.extract_data(repo.path, incremental=True))
+    assert resumed_rows[:len(first_rows)] == first_rows
+
+    fresh_dir = tmp_path / 'fresh'
+    fresh_dir.mkdir()
+    fresh_rows = mine_fresh(repo.path, fresh_dir, monkeypatch)
+    assert sorted(resumed_rows[1:]) == sorted(fresh_rows[1:])
+
+def test_resume_drops_rows_written_after_the_checkpoint(branched_repo, mining_dir, tmp_path, monkeypatch):
+    csv_path = TrialPyDriller.extract_data(branched_repo.path, incremental=True)
+    with open(csv_path, 'a', newline='', encoding='utf-8') as csv_file:
+        csv.writer(csv_file).writerow(['interrupted'] + [''] * (len(TrialPyDriller.CSV_HEADER) - 1))
+    branched_repo.commit('m4', '2023-01-08T00:00:00+00:00', {'main.py': 'y = [3]\n'})
+    resumed_rows = read_rows(TrialPyDriller.extract_data(branched_repo.path, incremental=True))
+
+    fresh_dir = tmp_path / 'fresh'
+    fresh_dir.mkdir()
+    assert resumed_rows == mine_fresh(branched_repo.path, fresh_dir, monkeypatch)
+
+def test_csv_without_the_local_offset_column_is_mined_again(branched_repo, mining_dir, tmp_path, monkeypatch):
+    csv_path = TrialPyDriller.extract_data(branched_repo.path, incremental=True)
+    # Written before AuthorLocalOffset, when AuthorTimezone held the local offset of some rows
+    old_rows = [row[:-1] for row in read_rows(csv_path)]
+    with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+        csv.writer(csv_file).writerows(old_rows)
+    branched_repo.commit('m4', '2023-01-08T00:00:00+00:00', {'main.py': 'y = [3]\n'})
+    resumed_rows = read_rows(TrialPyDriller.extract_data(branched_repo.path, incremental=True))
+
+    fresh_dir = tmp_path / 'fresh'
+    fresh_dir.mkdir()
+    assert resumed_rows == mine_fresh(branched_repo.path, fresh_dir, monkeypatch)
+
+def test_blob_store_keeps_each_content_once_under_its_git_blob_sha(branched_repo, mining_dir):
+    legacy_rows = read_rows(TrialPyDriller.extract_data(branched_repo.path))
+    blob_rows = read_rows(TrialPyDriller.extract_data(branched_repo.path, blob_store=True))
+    assert [row[:9] + row[11:] for row in blob_rows] == [row[:9] + row[11:] for row in legacy_rows]
+
+    blob_paths = {row[column] for row in blob_rows[1:] for column in (9, 10) if row[column]}
+    assert sorted(map(os.path.abspath, blob_paths)) == sorted(str(path) for path in (mining_dir / 'PythonBlobs').rglob('*.py'))
+    for row in blob_rows[1:]:
+        # The after snapshot of each file is the blob git stores for it
+        assert os.path.basename(row[10]) == f"{branched_repo.git('rev-parse', f'{row[0]}:{row[12]}')}.py"
+    # A before snapshot is the after snapshot of the file's previous change, stored once for both
+    snapshots = [row[column] for row in blob_rows[1:] for column in (9, 10) if row[column]]
+    assert len(snapshots) > len(blob_paths)
+
+def test_metadata_only_mining_writes_no_sources(branched_repo, mining_dir):
+    rows = read_rows(TrialPyDriller.extract_data(branched_repo.path, profile='metadata-only'))
+    assert sorted(row[5] for row in rows[1:]) == ['base.py', 'base.py', 'main.py', 'main.py', 'side.py', 'side.py']
+    assert {(row[7], row[9], row[10]) for row in rows[1:]} == {('', '', '')}
+    assert not (mining_dir / 'PythonFiles').exists()
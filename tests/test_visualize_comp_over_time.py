@@ -0,0 +1,55 @@
+import logging
+
+import pytest
+
+pytest.importorskip('plotly')
+
+import VisualizeCompOverTime
+from CompetencyStore import RollupStore
+
+@pytest.fixture
+def plotted(tmp_path, monkeypatch):
+    """Runs the script on rollups from an empty directory; returns what it plots instead of showing it."""
+    monkeypatch.chdir(tmp_path)
+    plotted = []
+    monkeypatch.setattr(VisualizeCompOverTime, 'plot', plotted.append)
+    monkeypatch.setattr(VisualizeCompOverTime, 'rollup_store_path', str(tmp_path / 'rollups.sqlite'))
+    monkeypatch.setattr(VisualizeCompOverTime, 'use_rollups', True)
+    return plotted
+
+def reports(tmp_path):
+    return list((tmp_path / 'RunReports').glob('VisualizeCompOverTime_*.json'))
+
+def write_rollups(path, project_name):
+    store = RollupStore(str(path))
+    store.write_summary('c1', project_name, 'author01', '20230105', '120000', {'A1': 3}, {}, {'A1': 3})
+    store.close()
+
+def test_rollups_are_plotted_per_month(plotted, tmp_path):
+    write_rollups(tmp_path / 'rollups.sqlite', VisualizeCompOverTime.project_name)
+    VisualizeCompOverTime.main()
+    [final_df] = plotted
+    assert final_df[final_df['Level'] == 'A1'][['Year', 'Month', 'Value']].values.tolist() == [[2023, 1, 3]]
+    assert len(reports(tmp_path)) == 1
+
+def test_no_matching_rollups_reports_no_data(plotted, tmp_path, caplog):
+    write_rollups(tmp_path / 'rollups.sqlite', 'another-project')
+    with caplog.at_level(logging.ERROR, logger='VisualizeCompOverTime'):
+        VisualizeCompOverTime.main()
+    assert plotted == []
+    assert 'No data to process' in caplog.text
+    assert len(reports(tmp_path)) == 1
+
+def test_missing_rollup_store_is_not_created(plotted, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        VisualizeCompOverTime.main()
+    assert not (tmp_path / 'rollups.sqlite').exists()
+    assert len(reports(tmp_path)) == 1
+
+def test_dashboard_mode_still_writes_the_report(plotted, tmp_path, monkeypatch):
+    served = []
+    monkeypatch.setattr(VisualizeCompOverTime, 'dashboard_mode', True)
+    monkeypatch.setattr(VisualizeCompOverTime, 'serve', lambda *paths: served.append(paths))
+    VisualizeCompOverTime.main()
+    assert served == [(VisualizeCompOverTime.competency_store_path, VisualizeCompOverTime.rollup_store_path)]
+    assert len(reports(tmp_path)) == 1